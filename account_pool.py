@@ -0,0 +1,209 @@
+"""
+MT5 Account Pool
+================
+Logs into every account in CONFIG["mt5_accounts"] once and keeps one warm
+MT5 page per account, so each level set is placed on all accounts at the
+same time instead of one after another.
+
+Each account gets a worker thread with its own Playwright connection to
+ONE shared Chromium and its own isolated context (same layout as
+scanner.py): sync Playwright objects must stay on the thread that created
+them. At most CONFIG["mt5_max_parallel"] accounts log in or place orders
+at once.
+
+Usage:
+    python main.py --accounts     # TradingView once, Buy Stop + Sell Stop on every account
+    python account_pool.py        # Log every account in and report (no orders)
+"""
+
+import queue
+import sys
+import threading
+import time
+from playwright.sync_api import sync_playwright
+
+from config import CONFIG
+from browser import launch_shared_browser, connect_browser
+from session_cache import load_session_state
+from mt5_login import login_to_mt5, is_mt5_logged_in
+from mt5_orders import place_orders, select_gold_symbol, open_sell_page, order_stamps
+from latency import LevelsMessage, record_handoff
+from tracing import set_workflow
+
+
+def get_accounts() -> list:
+    """
+    Accounts to trade: CONFIG["mt5_accounts"], or the single
+    mt5_login / mt5_password account if the list is empty.
+    """
+    accounts = CONFIG.get("mt5_accounts")
+    if not accounts:
+        return [{}]  # No name: the default session file and screenshots
+    return [{**a, "name": a.get("name") or str(a["login"])} for a in accounts]
+
+
+class AccountWorker(threading.Thread):
+    """Owns one account's context and page; places orders on request."""
+
+    def __init__(self, account: dict, cdp_endpoint: str, slots: threading.Semaphore):
+        self.label = account.get("name") or "default"
+        super().__init__(name=f"MT5-{self.label}", daemon=True)
+        self.account = account
+        self.cdp_endpoint = cdp_endpoint
+        self.slots = slots
+        self.jobs = queue.Queue()
+        self.ready = threading.Event()
+        self.logged_in = False
+        self.login_s = None
+        self.error = ""
+
+    def run(self) -> None:
+        set_workflow(self.name)
+        with sync_playwright() as playwright:
+            context = page = sell_page = None
+            try:
+                browser, context, page = connect_browser(
+                    playwright, self.cdp_endpoint, load_session_state(self.account.get("name")))
+                started = time.perf_counter()
+                with self.slots:
+                    self.logged_in = login_to_mt5(page, self.account)
+                    if self.logged_in:
+                        select_gold_symbol(page)
+                        if CONFIG["mt5_dual_page_orders"]:
+                            sell_page = open_sell_page(page, self.account)
+                self.login_s = time.perf_counter() - started
+                if not self.logged_in:
+                    self.error = "login failed"
+            except Exception as e:
+                self.error = str(e)[:80]
+            finally:
+                self.ready.set()
+
+            try:
+                while True:
+                    job = self.jobs.get()
+                    if job is None:
+                        break
+                    message, results = job
+                    results.put(self.place(page, sell_page, message))
+            finally:
+                if context is not None:
+                    context.close()
+
+    def place(self, page, sell_page, message: LevelsMessage) -> dict:
+        """Place Buy Stop + Sell Stop for this account. Returns: result row."""
+        row = {"account": self.label, "ok": False, "buy_stop": False, "sell_stop": False, "error": ""}
+        queued = time.perf_counter()
+        with self.slots:
+            started = time.perf_counter()
+            row["wait_s"] = started - queued
+            try:
+                if page is None:
+                    raise RuntimeError(self.error or "no MT5 page")
+                if not self.logged_in or not is_mt5_logged_in(page):
+                    print(f"[{self.name}] Session dropped, logging in again...")
+                    self.logged_in = login_to_mt5(page, self.account)
+                    if not self.logged_in:
+                        raise RuntimeError("re-login failed")
+                received = message.copy()
+                received.stamp("dequeued")
+                buy_ok, sell_ok = place_orders(page, received.levels, sell_page)
+                received.stamp_orders(order_stamps())
+                record_handoff(received)
+                row.update({"ok": buy_ok and sell_ok, "buy_stop": buy_ok, "sell_stop": sell_ok})
+            except Exception as e:
+                row["error"] = str(e)[:80]
+            row["elapsed_s"] = time.perf_counter() - started
+        return row
+
+
+class AccountPool:
+    """Warm MT5 pages for every account, driven concurrently."""
+
+    def __init__(self, accounts: list = None, max_parallel: int = None):
+        self.accounts = accounts or get_accounts()
+        self.max_parallel = max(1, max_parallel or CONFIG["mt5_max_parallel"])
+        self.slots = threading.Semaphore(self.max_parallel)
+        self.workers = []
+        self.browser = None
+
+    def start(self, playwright) -> int:
+        """
+        Launch the shared browser and log every account in (bounded parallelism).
+        Returns: number of accounts logged in.
+        """
+        started = time.perf_counter()
+        self.browser, cdp_endpoint = launch_shared_browser(playwright)
+        self.workers = [AccountWorker(account, cdp_endpoint, self.slots) for account in self.accounts]
+        for worker in self.workers:
+            worker.start()
+        for worker in self.workers:
+            worker.ready.wait()
+
+        ready = [w for w in self.workers if w.logged_in]
+        print(f"\n[POOL] {len(ready)}/{len(self.workers)} accounts logged in "
+              f"in {time.perf_counter() - started:.1f}s (max {self.max_parallel} at once)")
+        for worker in self.workers:
+            if not worker.logged_in:
+                print(f"[POOL] [FAIL] {worker.label}: {worker.error}")
+        return len(ready)
+
+    def place_orders(self, message: LevelsMessage) -> list:
+        """
+        Place the level set on every account concurrently.
+        Returns: one result row per account.
+        """
+        results = queue.Queue()
+        started = time.perf_counter()
+        for worker in self.workers:
+            worker.jobs.put((message, results))
+        rows = [results.get() for _ in self.workers]
+        print_account_summary(rows, time.perf_counter() - started, self.max_parallel)
+        return rows
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.jobs.put(None)
+        for worker in self.workers:
+            worker.join(timeout=30)
+        if self.browser is not None:
+            self.browser.close()
+
+
+def print_account_summary(rows: list, elapsed: float, max_parallel: int) -> None:
+    """Per-account order result and timing, plus the speedup over placing them one by one."""
+    print("\n" + "="*70)
+    print("         ORDERS PER ACCOUNT")
+    print("="*70)
+    print(f"  {'ACCOUNT':<16} {'BUY STOP':<9} {'SELL STOP':<10} {'WAIT s':>7} {'TIME s':>7}  STATUS")
+    for row in sorted(rows, key=lambda r: r["account"]):
+        status = "OK" if row["ok"] else f"FAIL {row['error']}".strip()
+        print(f"  {row['account']:<16} {'OK' if row['buy_stop'] else 'FAIL':<9} "
+              f"{'OK' if row['sell_stop'] else 'FAIL':<10} {row.get('wait_s', 0):>7.1f} "
+              f"{row.get('elapsed_s', 0):>7.1f}  {status}")
+    serial = sum(r.get("elapsed_s", 0) for r in rows)
+    speedup = serial / elapsed if elapsed > 0 else 0.0
+    print(f"\n  {len(rows)} accounts in {elapsed:.1f}s wall ({serial:.1f}s one by one, "
+          f"{speedup:.1f}x, max {max_parallel} at once)")
+    print("="*70)
+
+
+def main():
+    """Log every account in, report, and close."""
+    args = sys.argv[1:]
+    if args and args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    with sync_playwright() as playwright:
+        pool = AccountPool()
+        try:
+            ready = pool.start(playwright)
+        finally:
+            pool.close()
+    if ready < len(pool.accounts):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,596 @@
+"""
+Asyncio Orchestrator
+====================
+Runs the TradingView steps and the MT5 login/symbol/order steps as
+coroutines on ONE event loop with async_playwright. Both workflows share one
+browser (one context each), hand levels over through an asyncio.Event, and
+can be cancelled or timed out as a whole.
+
+The steps here are thin async adapters: selectors, JS, parsing and the
+decisions (saved session, form readback, order outcome) come from the sync
+modules, so both engines behave the same.
+
+Usage:
+    python main.py --async
+"""
+
+import asyncio
+import time
+from playwright.async_api import async_playwright, Page
+
+from config import CONFIG
+from waits import (
+    LEGEND_HAS_TEXT_JS,
+    LEGEND_HAS_INTERVAL_JS,
+    LEGEND_HAS_OHLC_JS,
+    INPUT_FOCUSED_JS,
+    INPUT_BLURRED_JS,
+    SEARCH_RESULT_LISTED_JS,
+    FRAME_RENDERED_JS,
+    get_timeout,
+)
+from utils import STATUS_OVERLAY_JS, status_script, overlay_enabled, get_viewport_center
+from browser import lean_enabled, launch_options, context_options, ResourceBlocker
+from session_cache import session_enabled, load_session_state, get_session_path
+from price_extractor import SCOPED_OHLC_JS, pick_scoped_candle, parse_page_scan, get_manual_input
+from chart_steps import FIB_TOOL_QUERY, fib_drag_points
+from fib_calculator import calculate_fib_levels, print_fib_results
+from mt5_login import (
+    LOGIN_INPUT,
+    PASSWORD_INPUT,
+    MARKET_WATCH_SEARCH,
+    LOGIN_OR_MARKET_WATCH,
+    account_settings,
+    reuse_saved_session,
+)
+from mt5_orders import (
+    ORDER_TYPE_VALUES,
+    CLOSE_DIALOG_SELECTORS,
+    NEW_ORDER_TRIGGERS,
+    VOLUME_LABELS,
+    SL_LABELS,
+    TP_LABELS,
+    OUTCOME_SELECTOR,
+    FILL_ORDER_FORM_JS,
+    order_form_payload,
+    check_form_readback,
+    order_button_selectors,
+    order_outcome,
+    buy_stop_prices,
+    sell_stop_prices,
+    order_stamps,
+)
+from latency import LevelsMessage, record_handoff
+from order_book import attach_order_book_async, wait_for_order_async
+
+
+class LevelsHandoff:
+    """One-shot handoff of a LevelsMessage (or an error) from TV to MT5."""
+
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.message = None
+        self.error = None
+
+    def publish(self, message: LevelsMessage) -> None:
+        message.stamp("enqueued")
+        self.message = message
+        self.ready.set()
+
+    def fail(self, error: str) -> None:
+        self.error = error
+        self.ready.set()
+
+    async def wait(self, timeout: float) -> LevelsMessage:
+        """Wait for levels; raises on timeout or upstream error."""
+        await asyncio.wait_for(self.ready.wait(), timeout=timeout)
+        if self.error:
+            raise RuntimeError(f"TradingView failed: {self.error}")
+        self.message.stamp("dequeued")
+        return self.message
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+async def wait_js(page: Page, expression: str, label: str, timeout: int, arg=None) -> bool:
+    """Async twin of waits.wait_for_js."""
+    started = time.perf_counter()
+    try:
+        await page.wait_for_function(expression, arg=arg, timeout=timeout)
+        ok = True
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        ok = False
+    print(f"  [WAIT] {label}: {'ready' if ok else 'TIMEOUT'} after {time.perf_counter() - started:.2f}s")
+    return ok
+
+
+async def update_status(page: Page, msg: str, step: str = "") -> None:
+    """Async twin of utils.update_status."""
+    if overlay_enabled():
+        try:
+            await page.evaluate(status_script(msg, step))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+    print(f"  {msg}")
+
+
+async def click_chart(page: Page, x: int = 500, y: int = 400) -> None:
+    """Click on the chart to ensure focus."""
+    await page.mouse.click(x, y)
+    await wait_js(page, INPUT_BLURRED_JS, "chart focused", get_timeout("dialog"))
+
+
+# =============================================================================
+# TRADINGVIEW STEPS
+# =============================================================================
+
+async def navigate_to_tradingview(page: Page) -> None:
+    print("[TV] [1/9] Navigating to TradingView...")
+    await page.goto(CONFIG["tradingview_url"], wait_until="domcontentloaded")
+    await page.wait_for_selector("div[data-name='legend']", state="attached",
+                                 timeout=get_timeout("chart_ready"))
+    try:
+        await page.get_by_role("button", name="Accept").click(timeout=2000)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        pass
+    if overlay_enabled():
+        await page.evaluate(STATUS_OVERLAY_JS)
+
+
+async def load_symbol(page: Page) -> bool:
+    symbol = CONFIG["symbol"]
+    print(f"[TV] [2/9] Loading {symbol} symbol...")
+    await update_status(page, f"Loading {symbol}...", "Step 2/9")
+
+    await click_chart(page)
+    await page.keyboard.type(symbol[0])
+    await wait_js(page, INPUT_FOCUSED_JS, "symbol search", get_timeout("dialog"))
+    await page.keyboard.type(symbol[1:], delay=CONFIG["typing_delay_ms"])
+    await page.keyboard.press("Enter")
+
+    if not await wait_js(page, LEGEND_HAS_TEXT_JS, f"legend shows {symbol}",
+                         get_timeout("symbol_change"), arg=symbol):
+        await update_status(page, "ERROR: Symbol not loaded!", "Step 2/9")
+        return False
+    await update_status(page, f"{symbol} loaded successfully!", "Step 2/9")
+    return True
+
+
+async def set_timeframe(page: Page) -> None:
+    tf = CONFIG["timeframe"]
+    print(f"[TV] [3/9] Setting timeframe to {tf} minutes...")
+    await click_chart(page)
+    await page.keyboard.press(",")
+    await wait_js(page, INPUT_FOCUSED_JS, "interval dialog", get_timeout("dialog"))
+    await page.keyboard.type(tf, delay=CONFIG["typing_delay_ms"])
+    await page.keyboard.press("Enter")
+    await wait_js(page, LEGEND_HAS_INTERVAL_JS, f"legend shows {tf}",
+                  get_timeout("symbol_change"), arg=tf)
+    await update_status(page, f"Timeframe set to {tf}m", "Step 3/9")
+
+
+async def select_current_candle(page: Page) -> None:
+    print("[TV] [4/9] Selecting CURRENT candle...")
+    await click_chart(page)
+    await page.keyboard.press("End")
+    await wait_js(page, FRAME_RENDERED_JS, "chart scrolled to latest", get_timeout("dialog"),
+                  arg=f"frame-{time.perf_counter()}")
+    await wait_js(page, LEGEND_HAS_OHLC_JS, "legend shows OHLC", get_timeout("symbol_change"))
+
+
+async def extract_prices(page: Page) -> tuple:
+    print("[TV] [5/9] Reading candle High/Low prices...")
+    cx, cy = get_viewport_center(page)
+    await page.mouse.move(cx, cy)
+    await asyncio.sleep(CONFIG["delays"]["long"])
+
+    # Legend / data window in one evaluate, validated like price_extractor.extract_scoped
+    try:
+        candle = pick_scoped_candle(await page.evaluate(SCOPED_OHLC_JS))
+        if candle:
+            high, low = candle["high"], candle["low"]
+            await update_status(page, f"Found H={high} L={low}", "Step 5/9")
+            return high, low
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        pass
+
+    try:
+        high, low = parse_page_scan(await page.locator("body").inner_text())
+        if high and low:
+            await update_status(page, f"Scanned H={high} L={low}", "Step 5/9")
+            return high, low
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        pass
+
+    # Blocking input() runs off the loop so MT5 keeps progressing
+    await update_status(page, "Auto-extraction failed. Check console.", "Step 5/9")
+    return await asyncio.get_running_loop().run_in_executor(None, get_manual_input)
+
+
+async def draw_fibonacci(page: Page) -> None:
+    print("[TV] [6-7/9] Drawing Fibonacci on candle...")
+    await click_chart(page)
+    await page.keyboard.press("/")
+    await wait_js(page, INPUT_FOCUSED_JS, "tool search", get_timeout("dialog"))
+    await page.keyboard.type(FIB_TOOL_QUERY, delay=CONFIG["typing_delay_ms"])
+    await wait_js(page, SEARCH_RESULT_LISTED_JS, f"search lists {FIB_TOOL_QUERY}",
+                  get_timeout("dialog"), arg=FIB_TOOL_QUERY)
+    await page.keyboard.press("Enter")
+    await wait_js(page, INPUT_BLURRED_JS, "chart focused", get_timeout("dialog"))
+
+    start, end = fib_drag_points(*get_viewport_center(page))
+    await page.mouse.move(*start)
+    await page.mouse.down()
+    await page.mouse.move(*end, steps=30)
+    await page.mouse.up()
+    await update_status(page, "Fib drawn on chart", "Step 7/9")
+
+
+async def tradingview_workflow(page: Page, handoff: LevelsHandoff) -> dict:
+    """TradingView steps 1-9; publishes levels (or the error) to the handoff."""
+    try:
+        await navigate_to_tradingview(page)
+        if not await load_symbol(page):
+            raise RuntimeError(f"{CONFIG['symbol']} not loaded on the chart")
+        await set_timeframe(page)
+        await select_current_candle(page)
+        high, low = await extract_prices(page)
+        extracted = time.monotonic()
+
+        print("[TV] [9/9] Calculating Fibonacci levels...")
+        levels = calculate_fib_levels(high, low)
+        print_fib_results(high, low, levels)
+        message = LevelsMessage(levels, high, low)
+        message.stamp("extracted", extracted)
+        handoff.publish(message)
+        print("[TV] [OK] Sent Fib levels to MT5!")
+
+        # Drawing is visual only, so it runs after the handoff
+        await draw_fibonacci(page)
+        return levels
+
+    except asyncio.CancelledError:
+        handoff.fail("cancelled")
+        raise
+    except Exception as e:
+        print(f"[TV] [FAIL] Error: {e}")
+        handoff.fail(str(e))
+        raise
+
+
+# =============================================================================
+# MT5 STEPS
+# =============================================================================
+
+async def is_mt5_logged_in(page: Page) -> bool:
+    """Async twin of mt5_login.is_mt5_logged_in."""
+    try:
+        await page.wait_for_selector(LOGIN_OR_MARKET_WATCH, state="visible",
+                                     timeout=get_timeout("login_form"))
+        return await page.locator(LOGIN_INPUT).count() == 0
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        return False
+
+
+async def login_to_mt5(page: Page, account: dict = None) -> bool:
+    """Async twin of mt5_login.login_to_mt5."""
+    settings = account_settings(account)
+    print("[MT5] Navigating to terminal...")
+    await page.goto(settings["url"], wait_until="domcontentloaded")
+
+    # Saved session: skip the login form, or clear it when it has expired
+    if session_enabled() and reuse_saved_session(await is_mt5_logged_in(page), settings["name"]):
+        return True
+
+    try:
+        await page.wait_for_selector(LOGIN_INPUT, state="visible", timeout=get_timeout("login_form"))
+        print("[MT5] Filling credentials...")
+        await page.fill(LOGIN_INPUT, settings["login"])
+        await page.fill(PASSWORD_INPUT, settings["password"])
+        await page.press(PASSWORD_INPUT, 'Enter')
+
+        await page.wait_for_selector(LOGIN_INPUT, state="detached",
+                                     timeout=get_timeout("login_complete"))
+        await page.wait_for_selector(MARKET_WATCH_SEARCH, state="visible",
+                                     timeout=get_timeout("login_complete"))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[MT5] [FAIL] Login error: {e}")
+        return False
+
+    if session_enabled():
+        # session_cache.save_session_state, with the async storage_state call
+        path = get_session_path(settings["name"])
+        try:
+            await page.context.storage_state(path=path)
+            print(f"[MT5] Session saved to {path}")
+        except Exception as e:
+            print(f"[MT5] [WARN] Could not save session: {str(e)[:60]}")
+    print("[MT5] [OK] Login completed!")
+    return True
+
+
+async def first_visible(page: Page, selectors: list, max_nth: int = 1):
+    """Return the first visible locator among the selector fallbacks."""
+    for selector in selectors:
+        loc = page.locator(selector)
+        count = await loc.count()
+        for i in range(min(count, max_nth)):
+            if await loc.nth(i).is_visible():
+                return loc.nth(i)
+    return None
+
+
+async def close_any_dialogs(page: Page) -> bool:
+    btn = await first_visible(page, CLOSE_DIALOG_SELECTORS)
+    if btn:
+        await btn.click()
+        await page.wait_for_timeout(500)
+        return True
+    return False
+
+
+async def select_gold_symbol(page: Page) -> bool:
+    symbol = CONFIG["mt5_symbol"]
+    print(f"[MT5] Selecting {symbol} symbol...")
+    search_box = page.locator(MARKET_WATCH_SEARCH).first
+    await search_box.wait_for(state="visible", timeout=get_timeout("login_complete"))
+    await search_box.fill(symbol)
+
+    match = page.locator(f"text='{symbol}'").first
+    try:
+        await match.wait_for(state="visible", timeout=get_timeout("dialog"))
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        print(f"[MT5] [WARN] Could not find {symbol}")
+        return False
+    await match.click()
+    print(f"[MT5] [OK] Selected {symbol}")
+    return True
+
+
+async def fill_by_label(page: Page, labels: list, value: float) -> bool:
+    value_str = str(round(value, 2))
+    for label in labels:
+        label_el = page.locator(f"text='{label}'")
+        if await label_el.count() == 0:
+            continue
+        input_el = label_el.first.locator("xpath=ancestor::*[1]").locator("input")
+        if await input_el.count() == 0:
+            input_el = label_el.first.locator("xpath=following::input[1]")
+        if await input_el.count() > 0:
+            await input_el.first.fill(value_str)
+            print(f"[MT5] [OK] Set {label} = {value_str}")
+            return True
+    return False
+
+
+async def fill_order_form_js(page: Page, order_type: str, volume: float,
+                             sl_price: float, tp_price: float) -> list:
+    """
+    Async twin of mt5_orders.fill_order_form_js.
+    Returns: fields still wrong after the fast fill (all of them if it failed).
+    """
+    try:
+        await page.locator("select").first.wait_for(state="visible", timeout=get_timeout("dialog"))
+        payload = order_form_payload(order_type, volume, sl_price, tp_price)
+        readback = await page.evaluate(FILL_ORDER_FORM_JS, payload)
+        wrong = check_form_readback(readback, payload)
+        print(f"[MT5] Form readback: type={readback['type_text']} volume={readback['volume']} "
+              f"SL={readback['sl']} TP={readback['tp']}")
+        if wrong:
+            print(f"[MT5] [WARN] Fast fill incomplete ({', '.join(wrong)}), using step-by-step fill")
+        return wrong
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[MT5] [WARN] Fast fill failed ({str(e)[:60]}), using step-by-step fill")
+        return ["type", "volume", "sl", "tp"]
+
+
+async def fill_order_form(page: Page, order_type: str, volume: float,
+                          sl_price: float, tp_price: float) -> None:
+    """Step-by-step fill (mt5_orders.select_order_type + fill_order_form)."""
+    try:
+        await page.locator("select").first.select_option(value=ORDER_TYPE_VALUES[order_type],
+                                                         timeout=get_timeout("dialog"))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"[MT5] [WARN] Could not select order type: {str(e)[:60]}")
+    for labels, value, name in ((VOLUME_LABELS, volume, "volume"), (SL_LABELS, sl_price, "SL"),
+                                (TP_LABELS, tp_price, "TP")):
+        if not await fill_by_label(page, labels, value):
+            print(f"[MT5] [WARN] Could not set {name}")
+
+
+async def verify_by_text(page: Page) -> bool:
+    """
+    Wait for the confirmation or error text (mt5_orders.order_outcome).
+    No text within the dialog timeout means the order is not confirmed.
+    """
+    outcome = page.locator(OUTCOME_SELECTOR).first
+    try:
+        await outcome.wait_for(state="visible", timeout=get_timeout("dialog"))
+        text = (await outcome.text_content() or "").strip()
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        print("[MT5] [FAIL] No order confirmation within the timeout")
+        return False
+    if order_outcome(text):
+        print(f"[MT5] [OK] Order confirmed: {text}")
+        return True
+    print(f"[MT5] [FAIL] Order error: {text}")
+    return False
+
+
+async def place_single_order(page: Page, order_type: str, tp_price: float,
+                             sl_price: float, volume: float) -> bool:
+    print(f"[MT5] PLACING {order_type.upper()} ORDER (TP {tp_price:.2f}, SL {sl_price:.2f})")
+    await close_any_dialogs(page)
+    book = None
+    if CONFIG["use_order_book"]:
+        book = await attach_order_book_async(page)
+        book.expect(order_type, volume, sl_price, tp_price)
+
+    trigger = await first_visible(page, NEW_ORDER_TRIGGERS)
+    if not trigger:
+        print("[MT5] [WARN] Could not open order form")
+        return False
+    await trigger.click()
+
+    # One round-trip for type, volume, SL and TP; step-by-step if it fails
+    wrong = ["type", "volume", "sl", "tp"]
+    if CONFIG["mt5_js_form_fill"]:
+        wrong = await fill_order_form_js(page, order_type, volume, sl_price, tp_price)
+    if wrong:
+        await fill_order_form(page, order_type, volume, sl_price, tp_price)
+    order_stamps()[(order_type, "form_filled")] = time.monotonic()
+
+    button = await first_visible(page, order_button_selectors(order_type), max_nth=3)
+    if not button:
+        print("[MT5] [WARN] Could not find order button")
+        return False
+    await button.click()
+
+    if book is not None and book.live:
+        # The order must show up in the orders table index
+        row = await wait_for_order_async(page, book, order_type)
+        success = row is not None
+        if success:
+            print(f"[MT5] {order_type} in orders table: #{row['ticket']}")
+        else:
+            print(f"[MT5] [FAIL] {order_type} not in the orders table")
+    else:
+        success = await verify_by_text(page)
+    if success:
+        order_stamps()[(order_type, "order_confirmed")] = time.monotonic()
+    await close_any_dialogs(page)
+    print(f"[MT5] {order_type}: {'[OK] Placed' if success else '[FAIL]'}")
+    return success
+
+
+async def open_sell_page(page: Page) -> Page:
+    """Second page in the same MT5 context, with its own GOLD focus."""
+    sell_page = await page.context.new_page()
+    if not await login_to_mt5(sell_page):
+        raise RuntimeError("MT5 login failed on second page")
+    await select_gold_symbol(sell_page)
+    return sell_page
+
+
+async def place_orders(page: Page, fib_levels: dict, sell_page: Page = None) -> tuple:
+    """
+    Place Buy Stop + Sell Stop. With a sell_page, both orders are driven
+    concurrently on their own pages; otherwise one after the other.
+    """
+    volume = CONFIG["mt5_lot_size"]
+    buy_tp, buy_sl = buy_stop_prices(fib_levels)
+    sell_tp, sell_sl = sell_stop_prices(fib_levels)
+
+    if sell_page is not None:
+        buy_ok, sell_ok = await asyncio.gather(
+            place_single_order(page, "Buy Stop", buy_tp, buy_sl, volume),
+            place_single_order(sell_page, "Sell Stop", sell_tp, sell_sl, volume),
+        )
+        return buy_ok, sell_ok
+
+    buy_ok = await place_single_order(page, "Buy Stop", buy_tp, buy_sl, volume)
+    await select_gold_symbol(page)
+    sell_ok = await place_single_order(page, "Sell Stop", sell_tp, sell_sl, volume)
+    return buy_ok, sell_ok
+
+
+async def mt5_workflow(page: Page, handoff: LevelsHandoff) -> tuple:
+    """MT5 login + symbol while TV runs, then orders once levels arrive."""
+    if not await login_to_mt5(page):
+        raise RuntimeError("MT5 login failed")
+    await select_gold_symbol(page)
+    sell_page = await open_sell_page(page) if CONFIG["mt5_dual_page_orders"] else None
+
+    print("[MT5] Waiting for Fib levels from TradingView...")
+    message = await handoff.wait(CONFIG["async_levels_timeout"])
+    print("[MT5] [OK] Received Fib levels!")
+    result = await place_orders(page, message.levels, sell_page)
+    message.stamp_orders(order_stamps())
+    record_handoff(message)
+    return result
+
+
+# =============================================================================
+# ORCHESTRATOR
+# =============================================================================
+
+async def run_async_engine() -> None:
+    """Run both workflows on one loop with a global deadline."""
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch(channel="chrome", **launch_options())
+        except Exception:
+            # Fallback if Chrome channel not available
+            browser = await playwright.chromium.launch(**launch_options())
+        mt5_context = await browser.new_context(**context_options(load_session_state()))
+        tv_context = await browser.new_context(**context_options())
+        if lean_enabled():
+            for context in (mt5_context, tv_context):
+                blocker = ResourceBlocker()
+                await context.route(blocker.route_re, blocker.handle_async)
+        mt5_page = await mt5_context.new_page()
+        tv_page = await tv_context.new_page()
+
+        handoff = LevelsHandoff()
+        tasks = [
+            asyncio.create_task(tradingview_workflow(tv_page, handoff), name="TV"),
+            asyncio.create_task(mt5_workflow(mt5_page, handoff), name="MT5"),
+        ]
+
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=CONFIG["async_run_timeout"])
+            for task in pending:
+                print(f"[MAIN] [FAIL] {task.get_name()} exceeded run timeout, cancelling")
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            for task in done:
+                if task.cancelled():
+                    print(f"[MAIN] [FAIL] {task.get_name()}: cancelled")
+                elif task.exception():
+                    print(f"[MAIN] [FAIL] {task.get_name()}: {task.exception()}")
+                else:
+                    print(f"[MAIN] [OK] {task.get_name()}: {task.result()}")
+
+            if CONFIG["interactive"]:
+                print("\n[MAIN] Browsers will stay open for trading...")
+                await mt5_page.pause()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await browser.close()
+
+
+def run_async():
+    """Entry point for --async."""
+    print("="*60)
+    print("     GOLD TRADING RPA - ASYNC MODE")
+    print("="*60)
+    try:
+        asyncio.run(run_async_engine())
+    except KeyboardInterrupt:
+        print("\n[MAIN] Cancelled")
@@ -0,0 +1,275 @@
+"""
+Fibonacci Buy Stop / Sell Stop Backtester
+=========================================
+Replays historical OHLC bars and simulates the strategy that
+place_buy_stop / place_sell_stop run live:
+
+    Buy Stop:  Entry @ buy_stop.entry_level,  SL @ buy_stop.sl_level,  TP @ buy_stop.tp_level
+    Sell Stop: Entry @ sell_stop.entry_level, SL @ sell_stop.sl_level, TP @ sell_stop.tp_level
+
+Each closed bar is a signal candle. Its levels come from
+fib_calculator.calculate_trade_arrays (same maths as the live path). Both
+pending stops are live for the next `expiry_bars` bars; a filled trade runs
+until SL, TP or `max_hold_bars`, then closes at that bar's close.
+
+Same-bar ambiguity (OHLC bars hide the intrabar path):
+    "sl_first" - if SL and TP are both touched in one bar, SL wins (conservative)
+    "tp_first" - TP wins (optimistic)
+The entry bar itself can also hit SL/TP, under the same rule.
+
+Everything is vectorized over sliding windows of (expiry + hold) bars and
+processed in chunks, so cost is O(n × window) with a small constant.
+
+Usage:
+    python backtest.py XAUUSD_M30.csv
+    python backtest.py XAUUSD_M30.csv --trades trades.csv
+    python backtest.py --store XAUUSD 30 [--from 2024-01-01] [--to 2025-01-01]
+"""
+
+import sys
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import CONFIG
+from fib_calculator import calculate_trade_arrays
+from ohlc_csv import load_ohlc_csv
+from candle_store import CandleStore
+
+
+# Exit reasons
+EXIT_TP, EXIT_SL, EXIT_TIMEOUT = 1, -1, 0
+EXIT_NAMES = {EXIT_TP: "TP", EXIT_SL: "SL", EXIT_TIMEOUT: "TIMEOUT"}
+
+
+def first_true(mask: np.ndarray) -> tuple:
+    """Index of the first True per row, and whether any True exists."""
+    found = mask.any(axis=1)
+    return np.where(found, mask.argmax(axis=1), -1), found
+
+
+def build_window_views(bars: dict, window: int) -> dict:
+    """
+    Zero-copy (n, window) views of future bars, NaN-padded at the end.
+    Row i of a view holds bars i .. i + window - 1.
+    """
+    pad = np.full(window, np.nan)
+    return {name: sliding_window_view(np.concatenate([bars[name], pad]), window)
+            for name in ("open", "high", "low", "close")}
+
+
+def simulate_side(views: dict, n_bars: int, signal_idx: np.ndarray, entry: np.ndarray,
+                  sl: np.ndarray, tp: np.ndarray, is_buy: bool, params: dict) -> dict:
+    """
+    Simulate one pending-stop side for a chunk of signal candles.
+    Returns: dict of arrays for the trades that filled.
+    """
+    expiry = params["expiry_bars"]
+    hold = params["max_hold_bars"]
+    window = expiry + hold
+
+    # Future windows starting at the bar after each signal
+    windows = {name: view[signal_idx + 1] for name, view in views.items()}
+
+    high_w, low_w = windows["high"], windows["low"]
+    cols = np.arange(window)[None, :]
+
+    # Entry: first bar within expiry that trades through the stop
+    if is_buy:
+        triggered = high_w[:, :expiry] >= entry[:, None]
+    else:
+        triggered = low_w[:, :expiry] <= entry[:, None]
+    fill_k, filled = first_true(triggered)
+
+    keep = filled
+    fill_k, entry, sl, tp = fill_k[keep], entry[keep], sl[keep], tp[keep]
+    signal_idx = signal_idx[keep]
+    high_w, low_w = high_w[keep], low_w[keep]
+    open_w, close_w = windows["open"][keep], windows["close"][keep]
+    rows = np.arange(len(fill_k))
+
+    # Gapped opens fill at the open, not the stop price
+    fill_open = open_w[rows, fill_k]
+    fill_price = np.maximum(entry, fill_open) if is_buy else np.minimum(entry, fill_open)
+
+    # Exit search from the fill bar up to max_hold bars later
+    active = (cols >= fill_k[:, None]) & (cols <= fill_k[:, None] + hold)
+    if is_buy:
+        sl_hit = active & (low_w <= sl[:, None])
+        tp_hit = active & (high_w >= tp[:, None])
+    else:
+        sl_hit = active & (high_w >= sl[:, None])
+        tp_hit = active & (low_w <= tp[:, None])
+    sl_k, sl_found = first_true(sl_hit)
+    tp_k, tp_found = first_true(tp_hit)
+
+    big = window + 1
+    sl_k = np.where(sl_found, sl_k, big)
+    tp_k = np.where(tp_found, tp_k, big)
+    if params["ambiguity"] == "tp_first":
+        tp_wins = tp_k <= sl_k
+    else:
+        tp_wins = tp_k < sl_k
+
+    timeout_k = np.minimum(fill_k + hold, window - 1)
+    exit_k = np.where(tp_wins, tp_k, sl_k)
+    reason = np.where(tp_wins, EXIT_TP, EXIT_SL)
+    timed_out = exit_k >= big
+    exit_k = np.where(timed_out, timeout_k, exit_k)
+    reason = np.where(timed_out, EXIT_TIMEOUT, reason)
+
+    exit_price = np.where(reason == EXIT_TP, tp, sl)
+    exit_price = np.where(timed_out, close_w[rows, exit_k], exit_price)
+
+    # Trades whose exit bar runs past the data are still open: drop them
+    exit_bar = signal_idx + 1 + exit_k
+    complete = (exit_bar < n_bars) & ~np.isnan(exit_price)
+
+    direction = 1.0 if is_buy else -1.0
+    pnl = direction * (exit_price - fill_price) * params["lot_size"] * params["contract_size"]
+    risk = np.abs(fill_price - sl)
+    r_multiple = np.where(risk > 0, direction * (exit_price - fill_price) / np.where(risk > 0, risk, 1), 0.0)
+
+    return {
+        "signal_bar": signal_idx[complete],
+        "entry_bar": (signal_idx + 1 + fill_k)[complete],
+        "exit_bar": exit_bar[complete],
+        "side": np.full(int(complete.sum()), direction),
+        "entry": fill_price[complete],
+        "sl": sl[complete],
+        "tp": tp[complete],
+        "exit": exit_price[complete],
+        "reason": reason[complete],
+        "pnl": pnl[complete],
+        "r": r_multiple[complete],
+    }
+
+
+def run_backtest(bars: dict, params: dict = None) -> dict:
+    """
+    Run the strategy over a bar set.
+    bars: dict of arrays (time, open, high, low, close), oldest first.
+    Returns: trades dict of arrays, sorted by exit bar.
+    """
+    params = {**CONFIG["backtest"], **(params or {})}
+    params.setdefault("lot_size", CONFIG["mt5_lot_size"])
+
+    n = len(bars["high"])
+    signals = np.arange(0, max(n - 1, 0), params["signal_every"])
+    chunk = params["chunk_size"]
+    views = build_window_views(bars, params["expiry_bars"] + params["max_hold_bars"])
+
+    parts = []
+    for start in range(0, len(signals), chunk):
+        idx = signals[start:start + chunk]
+        levels = calculate_trade_arrays(bars["high"][idx], bars["low"][idx])
+        parts.append(simulate_side(views, n, idx, levels["buy_entry"], levels["buy_sl"],
+                                   levels["buy_tp"], True, params))
+        parts.append(simulate_side(views, n, idx, levels["sell_entry"], levels["sell_sl"],
+                                   levels["sell_tp"], False, params))
+
+    if not parts:
+        return {}
+    trades = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    order = np.lexsort((trades["entry_bar"], trades["exit_bar"]))
+    trades = {key: arr[order] for key, arr in trades.items()}
+    trades["time"] = bars["time"][trades["exit_bar"]]
+    return trades
+
+
+def compute_stats(trades: dict, starting_equity: float = None) -> dict:
+    """Equity curve and summary statistics for a trade set."""
+    starting_equity = starting_equity if starting_equity is not None else CONFIG["backtest"]["starting_equity"]
+    pnl = trades.get("pnl", np.array([]))
+    if len(pnl) == 0:
+        return {"trades": 0}
+
+    equity = starting_equity + np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate([[starting_equity], equity]))[1:]
+    drawdown = peak - equity
+    gross_win = pnl[pnl > 0].sum()
+    gross_loss = -pnl[pnl < 0].sum()
+
+    stats = {
+        "trades": len(pnl),
+        "buy_trades": int((trades["side"] > 0).sum()),
+        "sell_trades": int((trades["side"] < 0).sum()),
+        "win_rate": float((pnl > 0).mean()),
+        "net_pnl": float(pnl.sum()),
+        "avg_pnl": float(pnl.mean()),
+        "avg_r": float(trades["r"].mean()),
+        "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else float("inf"),
+        "max_drawdown": float(drawdown.max()),
+        "final_equity": float(equity[-1]),
+    }
+    for code, name in EXIT_NAMES.items():
+        stats[f"exits_{name.lower()}"] = int((trades["reason"] == code).sum())
+    stats["equity"] = equity
+    return stats
+
+
+def print_stats(stats: dict) -> None:
+    """Print a backtest summary."""
+    print("\n" + "="*60)
+    print("         BACKTEST RESULTS")
+    print("="*60)
+    if stats["trades"] == 0:
+        print("  No trades.")
+        print("="*60)
+        return
+    print(f"  Trades:         {stats['trades']} (buy {stats['buy_trades']}, sell {stats['sell_trades']})")
+    print(f"  Exits:          TP {stats['exits_tp']}, SL {stats['exits_sl']}, timeout {stats['exits_timeout']}")
+    print(f"  Win rate:       {stats['win_rate']:.1%}")
+    print(f"  Net P&L:        {stats['net_pnl']:.2f}")
+    print(f"  Avg P&L:        {stats['avg_pnl']:.2f}  (avg R {stats['avg_r']:.2f})")
+    print(f"  Profit factor:  {stats['profit_factor']:.2f}")
+    print(f"  Max drawdown:   {stats['max_drawdown']:.2f}")
+    print(f"  Final equity:   {stats['final_equity']:.2f}")
+    print("="*60)
+
+
+def write_trades_csv(trades: dict, path: str) -> None:
+    """Write the trade list to CSV."""
+    columns = ["time", "signal_bar", "entry_bar", "exit_bar", "side", "entry", "sl", "tp", "exit", "reason", "pnl", "r"]
+    with open(path, "w") as f:
+        f.write(",".join(columns) + "\n")
+        times = trades["time"].astype("datetime64[s]").astype(str)
+        for i in range(len(trades["pnl"])):
+            side = "BUY" if trades["side"][i] > 0 else "SELL"
+            f.write(f"{times[i]},{trades['signal_bar'][i]},{trades['entry_bar'][i]},{trades['exit_bar'][i]},"
+                    f"{side},{trades['entry'][i]:.2f},{trades['sl'][i]:.2f},{trades['tp'][i]:.2f},"
+                    f"{trades['exit'][i]:.2f},{EXIT_NAMES[trades['reason'][i]]},{trades['pnl'][i]:.2f},"
+                    f"{trades['r'][i]:.3f}\n")
+    print(f"Trades written to {path}")
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    if not args or args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    def option(flag):
+        return args[args.index(flag) + 1] if flag in args else None
+
+    started = time.perf_counter()
+    if args[0] == "--store":
+        series = CandleStore().series(args[1], args[2])
+        bars = series.range(option("--from"), option("--to"))
+    else:
+        bars = load_ohlc_csv(args[0])
+    loaded = time.perf_counter()
+    trades = run_backtest(bars)
+    done = time.perf_counter()
+
+    print(f"Loaded {len(bars['close'])} bars in {loaded - started:.2f}s, "
+          f"simulated in {done - loaded:.2f}s")
+    print_stats(compute_stats(trades))
+
+    if "--trades" in args:
+        write_trades_csv(trades, option("--trades"))
+
+
+if __name__ == "__main__":
+    main()
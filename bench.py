@@ -0,0 +1,300 @@
+"""
+Offline Latency Benchmark
+=========================
+Runs the real workflows end to end against local stand-ins of TradingView
+and the MT5 Web Terminal (standins/*.html, served from disk on 127.0.0.1),
+so timings are reproducible and need no accounts or network.
+
+Scenarios:
+    steps       - every TradingView and MT5 step once, in order, on two pages
+    sequential  - main.run_sequential (one page, MT5 -> TV -> orders)
+    parallel    - main.run_parallel (two browsers, levels handed over a queue)
+
+Each run's wall time is appended to CONFIG["bench_results_file"] with a
+label, and per-step p50/p95 come from the tracing spans of the runs.
+
+Usage:
+    python bench.py                                 # all scenarios, 3 runs each
+    python bench.py steps parallel --runs 5 --label my-change
+    python bench.py steps --lean                    # same, with CONFIG["lean_profile"]
+    python bench.py --report                        # p50/p95 per label/scenario from the results file
+    python bench.py --pageload [--live]             # load time / bytes: normal vs lean profile
+"""
+
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+from playwright.sync_api import sync_playwright
+
+from config import CONFIG
+import tracing
+import main as workflows
+from browser import setup_browser, launch_browser, create_context, get_resource_blocker, read_page_load
+from chart_steps import (
+    navigate_to_tradingview,
+    load_symbol,
+    set_timeframe,
+    select_current_candle,
+    select_fib_tool,
+    draw_fibonacci,
+    configure_fib_levels,
+)
+from price_extractor import extract_prices
+from legend_observer import start_legend_observer
+from fib_calculator import calculate_fib_levels
+from mt5_login import login_to_mt5
+from mt5_orders import select_gold_symbol, place_orders
+
+
+STANDINS_DIR = os.path.join(os.path.dirname(__file__), "standins")
+
+# Settings the stand-ins need: no websocket feed, no prompts, no pauses
+BENCH_CONFIG = {
+    "interactive": False,
+    "use_network_capture": False,
+    "mt5_session_cache": False,
+    "selector_cache": False,
+    "tracing": True,
+}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_standins() -> tuple:
+    """
+    Serve standins/ on a free local port from a background thread.
+    Returns: (server, base_url)
+    """
+    handler = partial(QuietHandler, directory=STANDINS_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, name="standin-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def use_standins(base_url: str) -> None:
+    """Point the workflows at the stand-ins."""
+    CONFIG.update(BENCH_CONFIG)
+    CONFIG["tradingview_url"] = f"{base_url}/tradingview.html"
+    CONFIG["mt5_url"] = f"{base_url}/mt5.html"
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+def run_steps() -> bool:
+    """
+    Every step once: TradingView on one page, then MT5 on another.
+    Returns: True if both orders were confirmed.
+    """
+    with sync_playwright() as playwright:
+        browser, context, tv_page = setup_browser(playwright)
+        try:
+            legend_cell = start_legend_observer(tv_page)
+            navigate_to_tradingview(tv_page)
+            if not load_symbol(tv_page):
+                raise RuntimeError("stand-in symbol not loaded")
+            set_timeframe(tv_page)
+            select_current_candle(tv_page)
+            high, low = extract_prices(tv_page, legend_cell=legend_cell, allow_manual=False)
+            if high is None or low is None:
+                raise RuntimeError("stand-in candle not read")
+            select_fib_tool(tv_page)
+            draw_fibonacci(tv_page)
+            configure_fib_levels(tv_page)
+            levels = calculate_fib_levels(high, low)
+
+            mt5_page = context.new_page()
+            if not login_to_mt5(mt5_page):
+                raise RuntimeError("stand-in login failed")
+            select_gold_symbol(mt5_page)
+            buy_success, sell_success = place_orders(mt5_page, levels)
+            return buy_success and sell_success
+        finally:
+            browser.close()
+
+
+SCENARIOS = {
+    "steps": run_steps,
+    "sequential": workflows.run_sequential,
+    "parallel": workflows.run_parallel,
+}
+
+
+def run_scenario(name: str, runs: int, label: str) -> list:
+    """
+    Run one scenario `runs` times; returns the result rows.
+    A run is ok only if the scenario returned True (login, prices and both
+    orders went through), so failed runs stay out of p50/p95.
+    """
+    rows = []
+    for i in range(runs):
+        print(f"\n[BENCH] {name} run {i + 1}/{runs}")
+        started = time.perf_counter()
+        ok, error = True, ""
+        with tracing.span(f"bench.{name}"):
+            try:
+                if not SCENARIOS[name]():
+                    ok, error = False, "workflow reported failure"
+            except Exception as e:
+                ok, error = False, str(e)[:80]
+        rows.append({
+            "ts": time.time(),
+            "label": label,
+            "scenario": name,
+            "run": i + 1,
+            "wall_s": round(time.perf_counter() - started, 3),
+            "ok": ok,
+            "error": error,
+        })
+    return rows
+
+
+# =============================================================================
+# RESULTS
+# =============================================================================
+
+def get_results_path() -> str:
+    path = CONFIG["bench_results_file"]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return path
+
+
+def save_results(rows: list) -> None:
+    with open(get_results_path(), "a") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def load_results() -> list:
+    with open(get_results_path()) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_results(rows: list) -> None:
+    """p50/p95 wall time per label and scenario."""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["label"], row["scenario"]), []).append(row)
+
+    print("\n" + "="*78)
+    print("         BENCHMARK RESULTS (wall time per run)")
+    print("="*78)
+    print(f"  {'LABEL':<20} {'SCENARIO':<12} {'RUNS':>5} {'FAIL':>5} {'P50 s':>8} {'P95 s':>8} {'MIN s':>8}")
+    for (label, scenario), group in groups.items():
+        walls = np.array([r["wall_s"] for r in group if r["ok"]])
+        failed = sum(1 for r in group if not r["ok"])
+        if len(walls):
+            print(f"  {label:<20} {scenario:<12} {len(group):>5} {failed:>5} {np.percentile(walls, 50):>8.2f} "
+                  f"{np.percentile(walls, 95):>8.2f} {walls.min():>8.2f}")
+        else:
+            print(f"  {label:<20} {scenario:<12} {len(group):>5} {failed:>5} {'-':>8} {'-':>8} {'-':>8}")
+    print("="*78)
+
+
+def measure_page_load(playwright, url: str, lean: bool) -> dict:
+    """Load one URL in a fresh browser with or without the lean profile."""
+    browser = launch_browser(playwright, lean=lean)
+    try:
+        context = create_context(browser, lean=lean)
+        page = context.new_page()
+        started = time.perf_counter()
+        page.goto(url, wait_until="load")
+        stats = read_page_load(page)
+        stats["wall_ms"] = (time.perf_counter() - started) * 1000
+        blocker = get_resource_blocker(context)
+        stats["blocked"] = sum(blocker.blocked.values()) if blocker else 0
+        return stats
+    finally:
+        browser.close()
+
+
+def compare_page_loads(urls: dict) -> None:
+    """Print load time and bytes for each URL, normal vs lean, and the bytes saved."""
+    print("\n" + "="*78)
+    print("         PAGE LOAD: NORMAL vs LEAN")
+    print("="*78)
+    print(f"  {'PAGE':<12} {'PROFILE':<8} {'LOAD ms':>9} {'DCL ms':>9} {'MB':>8} {'BLOCKED':>8}")
+    with sync_playwright() as playwright:
+        for name, url in urls.items():
+            results = {}
+            for lean in (False, True):
+                stats = measure_page_load(playwright, url, lean)
+                results[lean] = stats
+                print(f"  {name:<12} {'lean' if lean else 'normal':<8} {stats['wall_ms']:>9.0f} "
+                      f"{stats['dom_content_loaded_ms'] or 0:>9.0f} {stats['bytes'] / 1e6:>8.2f} {stats['blocked']:>8}")
+            saved = results[False]["bytes"] - results[True]["bytes"]
+            faster = results[False]["wall_ms"] - results[True]["wall_ms"]
+            print(f"  {name:<12} {'saved':<8} {faster:>9.0f} {'':>9} {saved / 1e6:>8.2f}")
+    print("="*78)
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    if args and args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    if "--report" in args:
+        try:
+            print_results(load_results())
+        except OSError as e:
+            print(f"Could not read results: {e}")
+            sys.exit(1)
+        return
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    if "--pageload" in args:
+        if "--live" in args:
+            compare_page_loads({"TradingView": CONFIG["tradingview_url"], "MT5": CONFIG["mt5_url"]})
+            return
+        server, base_url = serve_standins()
+        try:
+            compare_page_loads({"TradingView": f"{base_url}/tradingview.html", "MT5": f"{base_url}/mt5.html"})
+        finally:
+            server.shutdown()
+        return
+
+    runs = int(option("--runs", 3))
+    label = option("--label", time.strftime("%Y%m%d-%H%M%S"))
+    values = {option("--runs", None), option("--label", None)}
+    names = [a for a in args if not a.startswith("--") and a not in values] or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+        sys.exit(1)
+
+    server, base_url = serve_standins()
+    use_standins(base_url)
+    if "--lean" in args:
+        CONFIG["lean_profile"]["enabled"] = True
+    print(f"[BENCH] Stand-ins served at {base_url}")
+
+    rows = []
+    try:
+        for name in names:
+            rows.extend(run_scenario(name, runs, label))
+    finally:
+        server.shutdown()
+
+    save_results(rows)
+    print_results(rows)
+    tracing.print_summary(tracing.get_spans(), f"STEP TIMINGS ({label})")
+    tracing.export_trace()
+    print(f"[BENCH] Results appended to {get_results_path()}")
+
+
+if __name__ == "__main__":
+    main()
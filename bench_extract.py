@@ -0,0 +1,54 @@
+"""
+Price Extraction Benchmark
+==========================
+Loads the chart once, then compares the scoped legend/data-window evaluate
+with the full-body text scan: bytes transferred, fetch time, parse time.
+
+Usage:
+    python bench_extract.py [SYMBOL] [TIMEFRAME] [--runs N]
+"""
+
+import sys
+from playwright.sync_api import sync_playwright
+
+from config import CONFIG
+from browser import setup_browser
+from chart_steps import navigate_to_tradingview, load_symbol, set_timeframe, select_current_candle
+from price_extractor import benchmark_extractors, print_benchmark
+from utils import get_viewport_center
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    if args and args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 10
+    positional = [a for i, a in enumerate(args)
+                  if not a.startswith("--") and (i == 0 or args[i - 1] != "--runs")]
+    symbol = positional[0] if len(positional) > 0 else CONFIG["symbol"]
+    timeframe = positional[1] if len(positional) > 1 else CONFIG["timeframe"]
+
+    with sync_playwright() as playwright:
+        browser, context, page = setup_browser(playwright)
+        try:
+            navigate_to_tradingview(page)
+            if not load_symbol(page, symbol):
+                print(f"[FAIL] {symbol} not loaded on the chart")
+                return
+            set_timeframe(page, timeframe)
+            select_current_candle(page)
+            cx, cy = get_viewport_center(page)
+            page.mouse.move(cx, cy)
+            page.wait_for_timeout(1000)
+
+            print(f"\nExtraction benchmark: {symbol} {timeframe}, {runs} runs each")
+            print_benchmark(benchmark_extractors(page, symbol, runs))
+        finally:
+            browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,225 @@ Handles browser launch and context creation.
 """
 
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
+from urllib.parse import urlsplit
+import os
+import re
+import time
+import weakref
+
 from config import CONFIG
 
 
-def launch_browser(playwright) -> Browser:
+# Navigation timing + bytes transferred, from the page's own performance entries
+PAGE_LOAD_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const resources = performance.getEntriesByType('resource');
+    return {
+        dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : null,
+        load_ms: nav ? nav.loadEventEnd : null,
+        bytes: (nav ? nav.transferSize : 0) + resources.reduce((n, r) => n + (r.transferSize || 0), 0),
+        resources: resources.length,
+    };
+}
+"""
+
+_blockers = weakref.WeakKeyDictionary()  # context -> ResourceBlocker
+
+
+def lean_enabled() -> bool:
+    """Lean profile: headless, fixed viewport, blocked resources, no overlay."""
+    return CONFIG["lean_profile"]["enabled"]
+
+
+def launch_options(extra_args: list = None, lean: bool = None) -> dict:
+    """chromium.launch() keyword arguments for the normal or lean profile."""
+    lean = lean_enabled() if lean is None else lean
+    if lean:
+        profile = CONFIG["lean_profile"]
+        return {"headless": profile["headless"], "args": profile["browser_args"] + (extra_args or [])}
+    return {"headless": False, "args": CONFIG["browser_args"] + (extra_args or [])}
+
+
+def context_options(storage_state=None, lean: bool = None) -> dict:
+    """browser.new_context() keyword arguments for the normal or lean profile."""
+    lean = lean_enabled() if lean is None else lean
+    viewport = CONFIG["lean_profile"]["viewport"] if lean else None
+    return {"viewport": viewport, "storage_state": storage_state}
+
+
+def launch_browser(playwright, extra_args: list = None, lean: bool = None) -> Browser:
     """Launch a Chromium browser with configured settings."""
+    options = launch_options(extra_args, lean)
     try:
-        browser = playwright.chromium.launch(
-            headless=False,
-            channel="chrome",
-            args=CONFIG["browser_args"]
-        )
+        browser = playwright.chromium.launch(channel="chrome", **options)
     except:
         # Fallback if Chrome channel not available
-        browser = playwright.chromium.launch(
-            headless=False,
-            args=CONFIG["browser_args"]
-        )
+        browser = playwright.chromium.launch(**options)
     return browser
 
 
-def create_context(browser: Browser) -> BrowserContext:
-    """Create a browser context with no viewport restrictions."""
-    return browser.new_context(viewport=None)
+class ResourceBlocker:
+    """
+    context.route() rules for the lean profile.
+    Only URLs that might be blocked (third-party hosts, blocked domains, asset
+    extensions) are routed through Python; everything else loads untouched.
+    """
+
+    def __init__(self, rules: dict = None):
+        rules = rules or CONFIG["lean_profile"]
+        first_party = list(rules["allow_domains"])
+        for url in (CONFIG["tradingview_url"], CONFIG["mt5_url"]):
+            host = urlsplit(url).hostname
+            if host:
+                first_party.append(host)
+
+        self.block_types = set(rules["block_resource_types"])
+        self.block_third_party = rules["block_third_party"]
+        self.blocked = {}
+
+        def hosts(domains):
+            return "|".join(re.escape(d) for d in domains)
+
+        self.first_party_re = re.compile(rf"^[a-z]+://(?:[\w-]+\.)*(?:{hosts(first_party)})(?:[:/?#]|$)", re.I)
+        self.blocked_domain_re = None
+        patterns = [rf"\.(?:{'|'.join(rules['block_extensions'])})(?:[?#]|$)"]
+        if rules["block_domains"]:
+            self.blocked_domain_re = re.compile(
+                rf"^[a-z]+://(?:[\w-]+\.)*(?:{hosts(rules['block_domains'])})(?:[:/?#]|$)", re.I)
+            patterns.append(self.blocked_domain_re.pattern)
+        if self.block_third_party:
+            patterns.append(rf"^https?://(?!(?:[\w-]+\.)*(?:{hosts(first_party)})(?:[:/?#]|$))")
+        self.route_re = re.compile("|".join(f"(?:{p})" for p in patterns), re.I)
+
+    def block_reason(self, url: str, resource_type: str) -> str:
+        """Why a request should be blocked, or None to let it through."""
+        if resource_type == "document":
+            return None
+        if self.blocked_domain_re and self.blocked_domain_re.match(url):
+            return "domain"
+        if self.block_third_party and not self.first_party_re.match(url):
+            return "third-party"
+        if resource_type in self.block_types:
+            return resource_type
+        return None
+
+    def count(self, reason: str) -> None:
+        self.blocked[reason] = self.blocked.get(reason, 0) + 1
+
+    def handle(self, route) -> None:
+        reason = self.block_reason(route.request.url, route.request.resource_type)
+        if reason:
+            self.count(reason)
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    async def handle_async(self, route) -> None:
+        reason = self.block_reason(route.request.url, route.request.resource_type)
+        if reason:
+            self.count(reason)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def summary(self) -> str:
+        total = sum(self.blocked.values())
+        detail = ", ".join(f"{k} {v}" for k, v in sorted(self.blocked.items()))
+        return f"{total} requests blocked" + (f" ({detail})" if detail else "")
+
+
+def apply_resource_blocking(context: BrowserContext) -> ResourceBlocker:
+    """Install the lean profile's block rules on a context."""
+    blocker = ResourceBlocker()
+    context.route(blocker.route_re, blocker.handle)
+    _blockers[context] = blocker
+    return blocker
+
+
+def get_resource_blocker(context) -> ResourceBlocker:
+    return _blockers.get(context)
+
+
+def read_page_load(page: Page) -> dict:
+    """Navigation timing and bytes transferred for the current document."""
+    return page.evaluate(PAGE_LOAD_JS)
+
+
+def report_page_load(page: Page, label: str) -> dict:
+    """Print load time, bytes transferred and blocked requests (lean profile only)."""
+    if not lean_enabled():
+        return None
+    try:
+        stats = read_page_load(page)
+    except Exception:
+        return None
+    blocker = get_resource_blocker(page.context)
+    blocked = f", {blocker.summary()}" if blocker else ""
+    print(f"  [LEAN] {label}: DOMContentLoaded {stats['dom_content_loaded_ms'] or 0:.0f} ms, "
+          f"load {stats['load_ms'] or 0:.0f} ms, {stats['bytes'] / 1e6:.2f} MB transferred{blocked}")
+    return stats
+
+
+def read_devtools_port(browser: Browser, timeout: float = 5.0) -> int:
+    """
+    Port a browser launched with --remote-debugging-port=0 actually bound.
+    Chromium writes it to DevToolsActivePort in its profile directory, which
+    Browser.getBrowserCommandLine reports (available under --enable-automation).
+    """
+    session = browser.new_browser_cdp_session()
+    try:
+        arguments = session.send("Browser.getBrowserCommandLine")["arguments"]
+    finally:
+        session.detach()
+    user_data_dir = next((a.split("=", 1)[1].strip('"') for a in arguments
+                          if a.startswith("--user-data-dir=")), None)
+    if not user_data_dir:
+        raise RuntimeError("Browser command line has no --user-data-dir")
+
+    path = os.path.join(user_data_dir, "DevToolsActivePort")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with open(path) as f:
+                return int(f.readline())
+        except (OSError, ValueError):
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"No DevTools port in {path}")
+            time.sleep(0.05)
+
+
+def launch_shared_browser(playwright) -> tuple:
+    """
+    Launch ONE Chromium that other threads attach to over CDP.
+    The debugging port is picked by the OS (CONFIG["shared_browser_port"] = 0)
+    and bound to localhost, so concurrent modes never collide and the
+    endpoint is not at a well-known address.
+    Returns: (browser, cdp_endpoint)
+    """
+    port = CONFIG["shared_browser_port"]
+    browser = launch_browser(playwright, [f"--remote-debugging-port={port}",
+                                          "--remote-debugging-address=127.0.0.1"])
+    if not port:
+        try:
+            port = read_devtools_port(browser)
+        except Exception:
+            browser.close()
+            raise
+    return browser, f"http://127.0.0.1:{port}"
+
+
+def create_context(browser: Browser, storage_state=None, lean: bool = None) -> BrowserContext:
+    """
+    Create a browser context (no viewport restrictions unless lean).
+    storage_state: optional saved session (path or dict) to restore.
+    lean: override CONFIG["lean_profile"]["enabled"].
+    """
+    lean = lean_enabled() if lean is None else lean
+    context = browser.new_context(**context_options(storage_state, lean))
+    if lean:
+        apply_resource_blocking(context)
+    return context
 
 
 def create_page(context: BrowserContext) -> Page:
@@ -34,12 +230,25 @@ def create_page(context: BrowserContext) -> Page:
     return context.new_page()
 
 
-def setup_browser(playwright) -> tuple:
+def setup_browser(playwright, storage_state=None) -> tuple:
     """
     Complete browser setup.
     Returns: (browser, context, page)
     """
     browser = launch_browser(playwright)
-    context = create_context(browser)
+    context = create_context(browser, storage_state)
+    page = create_page(context)
+    return browser, context, page
+
+
+def connect_browser(playwright, cdp_endpoint: str, storage_state=None) -> tuple:
+    """
+    Attach to a shared browser and open an isolated context in it.
+    Each thread needs its own connection: sync Playwright objects
+    must stay on the thread that created them.
+    Returns: (browser, context, page)
+    """
+    browser = playwright.chromium.connect_over_cdp(cdp_endpoint)
+    context = create_context(browser, storage_state)
     page = create_page(context)
     return browser, context, page
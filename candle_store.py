@@ -0,0 +1,218 @@
+"""
+Memory-Mapped Candle Store
+==========================
+Local columnar storage for OHLCV bars, keyed by symbol and timeframe.
+
+Layout on disk (one raw little-endian file per column):
+    <candle_store_dir>/<SYMBOL>/<TIMEFRAME>/time.i8     int64 epoch seconds
+    <candle_store_dir>/<SYMBOL>/<TIMEFRAME>/open.f8     float64
+    ... high.f8, low.f8, close.f8, volume.f8
+
+- Writes are append-only; bars at or before the last stored time are dropped.
+  Columns are written time-last, and rows left by an interrupted append are
+  truncated before the next one.
+- Reads are zero-copy NumPy memmap views.
+- Time-range lookup is a binary search on the time column (O(log n)).
+
+Usage:
+    python candle_store.py import XAUUSD_M30.csv XAUUSD 30
+    python candle_store.py info
+"""
+
+import os
+import re
+import sys
+import numpy as np
+
+from config import CONFIG
+from ohlc_csv import iter_ohlc_chunks
+
+
+COLUMNS = {
+    "time": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+}
+
+# Time is written last, so a crash mid-append never exposes a partial bar
+WRITE_ORDER = ["open", "high", "low", "close", "volume", "time"]
+
+
+def safe_name(name: str) -> str:
+    """Make a symbol/timeframe safe for use as a directory name (GOLD.i# -> GOLD.i_)."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(name))
+
+
+def to_epoch(value) -> int:
+    """Accept epoch seconds, numpy datetime64 or an ISO string."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return int(np.datetime64(value.replace(" ", "T"), "s").astype(np.int64))
+    if isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[s]").astype(np.int64))
+    return int(value)
+
+
+class CandleSeries:
+    """One symbol/timeframe: append-only column files + memmap views."""
+
+    def __init__(self, root: str, symbol: str, timeframe: str):
+        self.symbol = symbol
+        self.timeframe = str(timeframe)
+        self.path = os.path.join(root, safe_name(symbol), safe_name(timeframe))
+        os.makedirs(self.path, exist_ok=True)
+        self._views = None
+
+    def column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.{COLUMNS[name].kind}{COLUMNS[name].itemsize}")
+
+    def __len__(self) -> int:
+        # Shortest column wins: bars of a half-written append are not visible
+        # (append() truncates them away before writing)
+        sizes = []
+        for name, dtype in COLUMNS.items():
+            path = self.column_path(name)
+            sizes.append(os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0)
+        return min(sizes)
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def columns(self) -> dict:
+        """Zero-copy memmap views of every column."""
+        if self._views is None:
+            n = len(self)
+            views = {}
+            for name, dtype in COLUMNS.items():
+                if n == 0:
+                    views[name] = np.empty(0, dtype=dtype)
+                else:
+                    views[name] = np.memmap(self.column_path(name), dtype=dtype, mode="r", shape=(n,))
+            self._views = views
+        return self._views
+
+    def last_time(self) -> int:
+        times = self.columns()["time"]
+        return int(times[-1]) if len(times) else None
+
+    def range(self, start=None, end=None) -> dict:
+        """
+        Bars with start <= time < end, as zero-copy views.
+        start/end: epoch seconds, datetime64 or ISO strings (None = open-ended).
+        """
+        cols = self.columns()
+        times = cols["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, to_epoch(start), side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, to_epoch(end), side="left"))
+        return {name: arr[lo:hi] for name, arr in cols.items()}
+
+    def tail(self, count: int) -> dict:
+        """Last `count` bars as zero-copy views."""
+        return {name: arr[-count:] for name, arr in self.columns().items()}
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def append(self, bars: dict) -> int:
+        """
+        Append bars (dict of arrays with COLUMNS keys), sorted by time.
+        Bars at or before the last stored time are skipped.
+        Returns: number of bars written.
+        """
+        times = np.asarray(bars["time"], dtype=np.int64)
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+
+        last = self.last_time()
+        keep = np.ones(len(times), dtype=bool)
+        if last is not None:
+            keep &= times > last
+        # Drop duplicate timestamps inside the chunk (keep the first)
+        keep[1:] &= times[1:] != times[:-1]
+
+        count = int(keep.sum())
+        if count == 0:
+            return 0
+
+        self._views = None
+        stored = len(self)
+        for name in WRITE_ORDER:
+            data = times if name == "time" else np.asarray(bars[name])[order]
+            with open(self.column_path(name), "ab") as f:
+                # Drop rows left by an interrupted append so the columns stay aligned
+                f.truncate(stored * COLUMNS[name].itemsize)
+                f.write(np.ascontiguousarray(data[keep], dtype=COLUMNS[name]).tobytes())
+        return count
+
+
+class CandleStore:
+    """Root directory of candle series."""
+
+    def __init__(self, root: str = None):
+        root = root or CONFIG["candle_store_dir"]
+        if not os.path.isabs(root):
+            root = os.path.join(os.path.dirname(__file__), root)
+        self.root = root
+        self._series = {}
+
+    def series(self, symbol: str, timeframe: str) -> CandleSeries:
+        key = (symbol, str(timeframe))
+        if key not in self._series:
+            self._series[key] = CandleSeries(self.root, symbol, timeframe)
+        return self._series[key]
+
+    def list_series(self) -> list:
+        """All stored (symbol_dir, timeframe_dir) pairs."""
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for symbol in sorted(os.listdir(self.root)):
+            sym_path = os.path.join(self.root, symbol)
+            if os.path.isdir(sym_path):
+                found.extend((symbol, tf) for tf in sorted(os.listdir(sym_path))
+                             if os.path.isdir(os.path.join(sym_path, tf)))
+        return found
+
+    def import_csv(self, path: str, symbol: str, timeframe: str, chunk_size: int = 100_000) -> int:
+        """
+        Stream a broker/MT5 CSV into the store, one chunk at a time.
+        Returns: number of bars appended.
+        """
+        series = self.series(symbol, timeframe)
+        total = 0
+        for chunk in iter_ohlc_chunks(path, chunk_size):
+            total += series.append(chunk)
+        return total
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    store = CandleStore()
+
+    if len(args) == 4 and args[0] == "import":
+        _, path, symbol, timeframe = args
+        added = store.import_csv(path, symbol, timeframe)
+        series = store.series(symbol, timeframe)
+        print(f"Imported {added} bars into {series.path} ({len(series)} total)")
+    elif args and args[0] == "info":
+        for symbol, timeframe in store.list_series():
+            series = store.series(symbol, timeframe)
+            cols = series.columns()
+            if len(series):
+                first, last = cols["time"][[0, -1]].astype("datetime64[s]")
+                print(f"  {symbol:<12} {timeframe:>4}  {len(series):>10} bars  {first} -> {last}")
+            else:
+                print(f"  {symbol:<12} {timeframe:>4}  empty")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
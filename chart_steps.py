@@ -3,19 +3,44 @@ TradingView chart interaction steps.
 """
 
 from playwright.sync_api import Page
-import time
 
 from config import CONFIG
+from tracing import traced
+from browser import report_page_load
 from utils import update_status, click_chart, create_status_overlay, get_viewport_center
+from waits import (
+    wait_for_chart_ready,
+    wait_for_input_focus,
+    wait_for_chart_focus,
+    wait_for_legend_symbol,
+    wait_for_legend_interval,
+    wait_for_legend_ohlc,
+    wait_for_search_result,
+    wait_for_frame,
+    wait_for_fib_settings,
+    wait_for_goto_dialog,
+    FIB_SETTINGS,
+)
 
 
+# Shared with the async engine (async_engine.py)
+FIB_TOOL_QUERY = "Fib Retracement"
+FIB_DRAG_OFFSET = 100
+
+
+def fib_drag_points(cx: int, cy: int) -> tuple:
+    """Start and end of the Fib drag: bottom to top through the viewport center."""
+    return (cx, cy + FIB_DRAG_OFFSET), (cx, cy - FIB_DRAG_OFFSET)
+
+
+@traced()
 def navigate_to_tradingview(page: Page) -> None:
     """Step 1: Navigate to TradingView and setup."""
     print("[1/9] Navigating to TradingView...")
     
-    page.goto(CONFIG["tradingview_url"])
-    page.wait_for_load_state('networkidle')
-    time.sleep(CONFIG["delays"]["long"])
+    page.goto(CONFIG["tradingview_url"], wait_until="domcontentloaded")
+    wait_for_chart_ready(page)
+    report_page_load(page, "TradingView")
     
     # Accept cookies if present
     try:
@@ -26,21 +51,22 @@ def navigate_to_tradingview(page: Page) -> None:
     create_status_overlay(page)
 
 
-def load_symbol(page: Page) -> bool:
-    """Step 2: Load the trading symbol."""
-    symbol = CONFIG["symbol"]
+@traced()
+def load_symbol(page: Page, symbol: str = None) -> bool:
+    """Step 2: Load the trading symbol (defaults to CONFIG["symbol"])."""
+    symbol = symbol or CONFIG["symbol"]
     print(f"\n[2/9] Loading {symbol} symbol...")
     update_status(page, f"Loading {symbol}...", "Step 2/9")
     
     click_chart(page)
-    time.sleep(CONFIG["delays"]["short"])
     
-    page.keyboard.type(symbol, delay=100)
-    time.sleep(1.5)
+    # First keystroke opens the symbol search dialog
+    page.keyboard.type(symbol[0])
+    wait_for_input_focus(page, "symbol search")
+    page.keyboard.type(symbol[1:], delay=CONFIG["typing_delay_ms"])
     page.keyboard.press("Enter")
-    time.sleep(CONFIG["delays"]["page_load"])
     
-    if symbol not in page.content():
+    if not wait_for_legend_symbol(page, symbol):
         update_status(page, "ERROR: Symbol not loaded!", "Step 2/9")
         return False
     
@@ -49,23 +75,27 @@ def load_symbol(page: Page) -> bool:
     return True
 
 
-def set_timeframe(page: Page) -> None:
-    """Step 3: Set the chart timeframe."""
-    tf = CONFIG["timeframe"]
+@traced()
+def set_timeframe(page: Page, timeframe: str = None) -> None:
+    """Step 3: Set the chart timeframe (defaults to CONFIG["timeframe"])."""
+    tf = str(timeframe or CONFIG["timeframe"])
     print(f"\n[3/9] Setting timeframe to {tf} minutes...")
     update_status(page, f"Changing to {tf}m timeframe...", "Step 3/9")
     
     click_chart(page)
     page.keyboard.press(",")
-    time.sleep(CONFIG["delays"]["medium"])
-    page.keyboard.type(tf, delay=100)
-    time.sleep(CONFIG["delays"]["short"])
+    wait_for_input_focus(page, "interval dialog")
+    page.keyboard.type(tf, delay=CONFIG["typing_delay_ms"])
     page.keyboard.press("Enter")
-    time.sleep(4)
+    
+    if not wait_for_legend_interval(page, tf):
+        update_status(page, f"WARN: {tf}m not confirmed in legend", "Step 3/9")
+        return
     
     update_status(page, f"Timeframe set to {tf}m", "Step 3/9")
 
 
+@traced()
 def select_current_candle(page: Page) -> bool:
     """
     Step 4: Select target candle for Fibonacci calculation.
@@ -81,11 +111,11 @@ def select_current_candle(page: Page) -> bool:
         
         # Ensure chart is focused and scroll to latest
         click_chart(page)
-        time.sleep(CONFIG["delays"]["short"])
         
         # Press End key to ensure we're at the latest candle
         page.keyboard.press("End")
-        time.sleep(CONFIG["delays"]["medium"])
+        wait_for_frame(page, "chart scrolled to latest")
+        wait_for_legend_ohlc(page)
         
         update_status(page, "Current candle selected", "Step 4/9")
         print("  [OK] Current/active candle selected")
@@ -98,7 +128,7 @@ def select_current_candle(page: Page) -> bool:
     
     click_chart(page)
     page.keyboard.press("Alt+g")
-    time.sleep(CONFIG["delays"]["long"])
+    wait_for_goto_dialog(page)
     
     try:
         time_inputs = page.locator("input:visible").all()
@@ -113,15 +143,15 @@ def select_current_candle(page: Page) -> bool:
             time_field = time_inputs[1] if len(time_inputs) >= 2 else time_inputs[0]
         
         time_field.click()
-        time.sleep(CONFIG["delays"]["short"])
         page.keyboard.press("Control+a")
-        time.sleep(0.3)
-        page.keyboard.type(target, delay=100)
-        time.sleep(CONFIG["delays"]["medium"])
+        page.keyboard.type(target, delay=CONFIG["typing_delay_ms"])
         page.keyboard.press("Enter")
-        time.sleep(CONFIG["delays"]["medium"])
         page.keyboard.press("Enter")
-        time.sleep(4)
+        
+        # Dialog closed and the chart redrawn at the target time
+        wait_for_chart_focus(page)
+        wait_for_frame(page, f"chart jumped to {target}")
+        wait_for_legend_ohlc(page)
         
         update_status(page, f"Jumped to {target}", "Step 4/9")
         return True
@@ -132,6 +162,7 @@ def select_current_candle(page: Page) -> bool:
         return False
 
 
+@traced()
 def select_fib_tool(page: Page) -> bool:
     """Step 6: Select Fibonacci Retracement tool."""
     print("\n[6/9] Selecting Fibonacci Retracement tool...")
@@ -141,11 +172,11 @@ def select_fib_tool(page: Page) -> bool:
     try:
         click_chart(page)
         page.keyboard.press("/")
-        time.sleep(1.5)
-        page.keyboard.type("Fib Retracement", delay=80)
-        time.sleep(2)
+        wait_for_input_focus(page, "tool search")
+        page.keyboard.type(FIB_TOOL_QUERY, delay=CONFIG["typing_delay_ms"])
+        wait_for_search_result(page, FIB_TOOL_QUERY)
         page.keyboard.press("Enter")
-        time.sleep(1)
+        wait_for_chart_focus(page)
         update_status(page, "Fib tool selected!", "Step 6/9")
         return True
     except Exception as e:
@@ -155,11 +186,11 @@ def select_fib_tool(page: Page) -> bool:
     try:
         click_chart(page)
         page.keyboard.press("Control+k")
-        time.sleep(1.5)
-        page.keyboard.type("Fib Retracement", delay=80)
-        time.sleep(2)
+        wait_for_input_focus(page, "tool search")
+        page.keyboard.type(FIB_TOOL_QUERY, delay=CONFIG["typing_delay_ms"])
+        wait_for_search_result(page, FIB_TOOL_QUERY)
         page.keyboard.press("Enter")
-        time.sleep(1)
+        wait_for_chart_focus(page)
         update_status(page, "Fib tool selected (Ctrl+K)!", "Step 6/9")
         return True
     except Exception as e:
@@ -176,26 +207,24 @@ def select_fib_tool(page: Page) -> bool:
         return False
 
 
+@traced()
 def draw_fibonacci(page: Page) -> None:
     """Step 7: Draw Fibonacci on the chart."""
     print("\n[7/9] Drawing Fibonacci on candle...")
     update_status(page, "Drawing Fibonacci...", "Step 7/9")
     
-    cx, cy = get_viewport_center(page)
-    offset = 100
+    start, end = fib_drag_points(*get_viewport_center(page))
     
-    page.mouse.move(cx, cy + offset)
-    time.sleep(CONFIG["delays"]["short"])
+    page.mouse.move(*start)
     page.mouse.down()
-    time.sleep(0.3)
-    page.mouse.move(cx, cy - offset, steps=30)
-    time.sleep(CONFIG["delays"]["short"])
+    page.mouse.move(*end, steps=30)
     page.mouse.up()
-    time.sleep(2)
+    wait_for_frame(page, "Fib drawn")
     
     update_status(page, "Fib drawn on chart", "Step 7/9")
 
 
+@traced()
 def configure_fib_levels(page: Page) -> bool:
     """
     Step 8: Configure Fibonacci levels in settings.
@@ -212,18 +241,18 @@ def configure_fib_levels(page: Page) -> bool:
     
     # Try to select the Fib drawing
     page.mouse.click(cx, cy)
-    time.sleep(1)
+    wait_for_frame(page, "Fib selected")
     
     # Double-click to open settings dialog
     page.mouse.dblclick(cx, cy)
-    time.sleep(2.5)
     
     try:
         # Wait for settings dialog
-        page.wait_for_selector("div[data-name='tab-content-style']", timeout=4000)
+        if not wait_for_fib_settings(page):
+            raise RuntimeError("Fib settings dialog did not open")
         update_status(page, "Configuring levels...", "Step 8/9")
         
-        style_tab = page.locator("div[data-name='tab-content-style']")
+        style_tab = page.locator(FIB_SETTINGS)
         inputs = style_tab.locator("input[type='text']").all()
         checkboxes = style_tab.locator("input[type='checkbox']").all()
         
@@ -244,9 +273,8 @@ def configure_fib_levels(page: Page) -> bool:
                     checkboxes[i].click()
                     print(f"  ✗ Disabled level {level_val}")
         
-        time.sleep(1)
         page.keyboard.press("Enter")
-        time.sleep(2)
+        wait_for_fib_settings(page, state="detached")
         update_status(page, "Levels configured!", "Step 8/9")
         return True
         
@@ -12,14 +12,57 @@ CONFIG = {
     "mt5_symbol": "GOLD.i#",
     "mt5_lot_size": 0.01,
     
+    # Accounts that all receive the same orders (main.py --accounts).
+    # Empty = the single mt5_login / mt5_password account above.
+    # "url" is optional (defaults to mt5_url).
+    "mt5_accounts": [
+        # {"name": "main", "login": "309693342", "password": "...", "url": "https://mt5-6.xm-bz.com/terminal"},
+    ],
+    "mt5_max_parallel": 4,   # Accounts logging in / placing orders at the same time
+    
+    # Place Buy Stop and Sell Stop from two pages of the same MT5 session,
+    # submitted back to back (no symbol re-selection between orders)
+    "mt5_dual_page_orders": False,
+    
+    # Fill order type, volume, SL and TP with one page.evaluate and read the
+    # form back (falls back to the step-by-step fill if anything is off)
+    "mt5_js_form_fill": True,
+    
+    # Confirm orders from a live index of the Trade table (order_book.py)
+    # instead of looking for "Done" / "Error" texts
+    "use_order_book": True,
+    
+    # Session cache: reuse cookies/localStorage to skip the login form
+    "mt5_session_cache": False,
+    "mt5_session_file": "mt5_session.json",
+    
+    # Debug screenshots: last `frames` kept in memory, written to `dir`
+    # by a background thread only when an order fails or on demand
+    # mode: "ring" (default; no frames between levels and the last submit),
+    # "always" (write every frame) or "off"
+    "debug_screenshots": {
+        "mode": "ring",
+        "frames": 20,
+        "format": "jpeg",
+        "quality": 50,
+        "dir": "debug_screenshots",
+    },
+    
+    # Selector cache: remember which fallback selector worked per terminal
+    # and try it first next time (re-learned automatically on a miss)
+    "selector_cache": False,
+    "selector_cache_file": "selector_cache.json",
+    
     # Order settings
     "buy_stop": {
         "type": "Buy Stop",
+        "entry_level": "1",  # Entry at 1 (High)
         "tp_level": "1.5",   # Take Profit at 1.5 (Above High)
         "sl_level": "0.5",   # Stop Loss at 0.5 (Entry)
     },
     "sell_stop": {
         "type": "Sell Stop",
+        "entry_level": "0",  # Entry at 0 (Low)
         "tp_level": "-0.5",  # Take Profit at -0.5 (Below Low)
         "sl_level": "0.5",   # Stop Loss at 0.5 (Entry)
     },
@@ -36,19 +79,159 @@ CONFIG = {
     # Fibonacci levels to enable
     "desired_fib_levels": {"0", "-0.5", "0.5", "1.5", "1"},
     
-    # Valid gold price range for validation
-    "gold_price_range": (2000, 8000),
+    # Multi-symbol scanner (scanner.py / main.py --scan)
+    "scanner": {
+        "symbols": ["XAUUSD", "XAGUSD", "EURUSD", "GBPUSD"],
+        "timeframes": ["30"],
+        "pool_size": 2,           # Concurrent TradingView pages
+    },
+    
+    # Read the current candle from the chart websocket (legend is the fallback)
+    "use_network_capture": True,
+    "capture_max_bars": 5000,     # Bars kept in memory per series
+    
+    # Legend observer: MutationObserver pushes legend O/H/L/C to Python
+    "use_legend_observer": True,
+    
+    # Valid price range per symbol for validation (default used for unknown
+    # symbols; the scanner skips symbols that have no range of their own)
+    "price_ranges": {
+        "XAUUSD": (2000, 8000),
+        "XAGUSD": (10, 200),
+        "EURUSD": (0.8, 1.6),
+        "GBPUSD": (1.0, 2.0),
+        "default": (0, float("inf")),
+    },
+    
+    # Decimal places each symbol is quoted with (scanner output)
+    "price_digits": {
+        "XAUUSD": 2,
+        "XAGUSD": 3,
+        "EURUSD": 5,
+        "GBPUSD": 5,
+        "default": 2,
+    },
+    
+    # Local candle store (candle_store.py), relative to the project folder
+    "candle_store_dir": "data/candles",
+    
+    # =========================================================================
+    # BACKTEST SETTINGS (backtest.py)
+    # =========================================================================
+    "backtest": {
+        "expiry_bars": 4,          # Pending stops live this many bars after the signal candle
+        "max_hold_bars": 48,       # Filled trades close at market after this many bars
+        "ambiguity": "sl_first",   # "sl_first" or "tp_first" when both are touched in one bar
+        "signal_every": 1,         # Use every Nth closed bar as a signal candle
+        "contract_size": 100,      # Units per lot (100 oz for gold)
+        "starting_equity": 10000.0,
+        "chunk_size": 50000,       # Signal candles simulated per vectorized batch
+    },
     
     # =========================================================================
     # BROWSER SETTINGS
     # =========================================================================
     "browser_args": ["--start-maximized", "--force-device-scale-factor=0.85"],
     
+    # CDP port for --shared-browser, --scan and --accounts (one Chromium, one
+    # context per workflow). 0 = free port picked per launch (localhost only);
+    # a fixed port lets any local process find and drive the logged-in browser
+    "shared_browser_port": 0,
+    
+    # Lean profile: headless with a fixed viewport, non-essential resources
+    # and third-party domains blocked via context.route, no status overlay.
+    # The tradingview_url / mt5_url hosts are always first-party.
+    "lean_profile": {
+        "enabled": False,
+        "headless": True,
+        "viewport": {"width": 1600, "height": 900},
+        "browser_args": ["--disable-extensions", "--mute-audio", "--disable-background-networking"],
+        "block_resource_types": ["image", "media", "font"],
+        "block_extensions": ["png", "jpe?g", "gif", "webp", "svg", "ico", "woff2?", "ttf", "otf", "eot",
+                             "mp4", "webm", "mp3", "wav"],
+        "block_third_party": True,
+        "allow_domains": ["tradingview.com", "tradingview-widget.com", "xm-bz.com", "127.0.0.1", "localhost"],
+        "block_domains": ["google-analytics.com", "googletagmanager.com", "doubleclick.net",
+                          "googlesyndication.com", "facebook.net", "hotjar.com", "yandex.ru",
+                          "criteo.com", "amplitude.com", "sentry.io"],
+        "skip_overlay": True,
+    },
+    
+    # Interactive runs keep the browsers open (page.pause) and wait for Enter
+    # between sequential phases; bench.py turns this off
+    "interactive": True,
+    
+    # Offline benchmark (bench.py): results appended here
+    "bench_results_file": "bench_results.jsonl",
+    
     # Timing (in seconds)
     "delays": {
         "short": 0.5,
         "medium": 1.0,
         "long": 3.0,
         "page_load": 6.0,
+    },
+    
+    # Signal-to-order latency histograms, merged after every handoff (python latency.py)
+    "latency_file": "latency_histograms.json",
+    
+    # Level bus (level_bus.py): events buffered per subscriber before the oldest are dropped
+    "level_bus": {
+        "max_pending": 64,
+    },
+    
+    # Candle-close scheduler (scheduler.py / main.py --schedule)
+    "schedule": {
+        "prewarm_s": 45,            # Re-check MT5 session, symbol and chart this long before the close
+        "fire_delay_ms": 150,       # Start reading the closed candle this long after the close
+        "new_bar_wait_ms": 3000,    # Wait this long for the next bar on the websocket
+        "clock_url": None,          # Server whose Date header is the reference clock (None = mt5_url)
+        "clock_samples": 6,
+        "clock_offset_ms": None,    # Fixed server-minus-local offset instead of measuring
+        "utc_offset_hours": 0,      # Broker day start, for 4H/daily candles
+        "max_cycles": 0,            # 0 = run until Ctrl+C
+        "log_file": "schedule_log.jsonl",
+    },
+    
+    # MT5-only signal source (mt5_signal.py / main.py --mt5-signal): candle built from Market Watch quotes
+    "signal_source": "tradingview",  # "mt5" = default run uses one MT5 browser, no TradingView
+    "mt5_signal": {
+        # "last_closed" / "current" (None = follow use_current_candle). A forming
+        # candle is only complete when the feed ran since its open (daemon/scheduler)
+        "candle": "last_closed",
+        "price": "bid",         # "bid" (MT5 charts are Bid charts) or "mid"
+        "min_quotes": 2,        # Quotes to see before reading the candle
+        "max_wait_s": None,     # Cap on the wait for a closed candle seen from its open (None = up to 2 timeframes)
+        "allow_partial": False, # True = trade a candle seen only since the run started (not its real range)
+        "max_bars": 16,         # Bars kept in memory
+        "server_clock": True,   # Align bars to the server clock (scheduler.measure_clock_offset)
+    },
+    
+    # Unix socket used by the warm-browser daemon (daemon.py)
+    "daemon_socket": "/tmp/gold_rpa.sock",
+    
+    # Step timing spans, appended per run to trace_file (python tracing.py)
+    "tracing": True,
+    "trace_file": "traces.jsonl",
+    "trace_max_spans": 10000,  # Buffered until exported; oldest dropped first
+    
+    # --async engine deadlines (in seconds)
+    "async_levels_timeout": 120,  # MT5 waits this long for TV levels
+    "async_run_timeout": 300,     # Whole run is cancelled after this
+    
+    # Keystroke delay (ms) when typing into TradingView/MT5 inputs
+    "typing_delay_ms": 0,
+    
+    # Readiness wait deadlines (in milliseconds)
+    "timeouts": {
+        "chart_ready": 30000,     # TradingView legend rendered
+        "dialog": 5000,           # Search/interval dialog input focused
+        "symbol_change": 15000,   # Legend shows new symbol/interval
+        "login_form": 30000,      # MT5 login form visible
+        "login_complete": 30000,  # MT5 login form gone + Market Watch rendered
+        "bar_capture": 5000,      # Current candle seen on the chart websocket
+        "quote_feed": 10000,      # First Market Watch quotes (mt5_signal.py)
+        "order_confirm": 10000,   # Submitted order appears in the orders table
+        "levels_wait": 120000,    # MT5 (parallel/--accounts) waits for TradingView's Fib levels
     }
 }
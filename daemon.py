@@ -0,0 +1,291 @@
+"""
+Warm-Browser Daemon
+===================
+Keeps a logged-in MT5 page and a loaded TradingView chart resident and
+serves commands over a local Unix socket, so signal-to-order time is
+bounded by DOM work instead of browser startup and login.
+
+Usage:
+    python main.py --daemon     # Start the daemon (keeps both browsers open)
+    python daemon.py status     # Report page state and last levels
+    python daemon.py levels     # Read the current candle and compute Fib levels
+    python daemon.py orders     # Compute levels and place Buy Stop + Sell Stop
+    python daemon.py screenshots  # Write the buffered debug screenshots to disk
+    python daemon.py stop       # Shut the daemon down
+
+Protocol: one JSON object per line, e.g. {"cmd": "levels"}, answered
+with one JSON object per line.
+"""
+
+import sys
+import os
+import json
+import socket
+import time
+from playwright.sync_api import sync_playwright
+
+from config import CONFIG
+from tracing import finish_trace
+from browser import setup_browser
+from session_cache import load_session_state
+from mt5_login import login_to_mt5, is_mt5_logged_in
+from mt5_orders import place_orders, select_gold_symbol, open_sell_page
+from screenshots import flush_screenshots
+from chart_steps import navigate_to_tradingview, load_symbol, set_timeframe, select_current_candle
+from price_extractor import extract_prices
+from network_capture import start_bar_capture
+from legend_observer import start_legend_observer
+from level_bus import LevelBus, follow_legend
+from fib_calculator import calculate_fib_levels, print_fib_results
+
+
+class WarmSession:
+    """Resident MT5 + TradingView pages and the commands that drive them."""
+
+    def __init__(self, mt5_page, tv_page):
+        self.mt5_page = mt5_page
+        self.tv_page = tv_page
+        self.started = time.time()
+        self.last_levels = None
+        self.last_levels_at = None
+        self.commands_served = 0
+        self.bar_feed = None
+        self.legend_cell = None
+        self.quote_feed = None  # mt5_signal.QuoteBars when CONFIG["signal_source"] is "mt5"
+        self.sell_page = None
+        self.live_levels = LevelBus()  # Levels of the live candle, republished on every legend update
+
+    def warm_up(self) -> bool:
+        """Login to MT5 and load the chart once."""
+        if not login_to_mt5(self.mt5_page):
+            print("[DAEMON] [FAIL] MT5 login failed")
+            return False
+        select_gold_symbol(self.mt5_page)
+        if CONFIG["mt5_dual_page_orders"]:
+            self.sell_page = open_sell_page(self.mt5_page)
+        if CONFIG["signal_source"] == "mt5":
+            # Resident feed: candles are seen from their open once it has run a full bar
+            # (imported here: mt5_signal -> scheduler -> daemon)
+            from mt5_signal import attach_quote_feed
+            self.quote_feed = attach_quote_feed(self.mt5_page)
+
+        self.bar_feed = start_bar_capture(self.tv_page)
+        self.legend_cell = start_legend_observer(self.tv_page)
+        if self.legend_cell is not None:
+            follow_legend(self.live_levels, self.legend_cell)
+        navigate_to_tradingview(self.tv_page)
+        if not load_symbol(self.tv_page):
+            print(f"[DAEMON] [FAIL] {CONFIG['symbol']} not loaded on the chart")
+            return False
+        set_timeframe(self.tv_page)
+        print("[DAEMON] [OK] Pages warm")
+        return True
+
+    def compute_levels(self) -> dict:
+        """Read the current candle from the resident chart (or MT5 quote feed)."""
+        if self.quote_feed is not None:
+            from mt5_signal import read_mt5_levels
+            message = read_mt5_levels(self.mt5_page, self.quote_feed)
+            if message is None:
+                return {"ok": False, "error": "No complete MT5 candle"}
+            self.last_levels = message.levels
+            self.last_levels_at = time.time()
+            return {"ok": True, "high": message.high, "low": message.low, "levels": message.levels}
+
+        select_current_candle(self.tv_page)
+        # Nobody is at the terminal: never prompt for (or fall back to) manual prices
+        high, low = extract_prices(self.tv_page, self.bar_feed, legend_cell=self.legend_cell,
+                                   allow_manual=False)
+        if high is None or low is None:
+            print("[DAEMON] [FAIL] Could not read the candle High/Low")
+            return {"ok": False, "error": "Could not read candle High/Low"}
+        levels = calculate_fib_levels(high, low)
+        print_fib_results(high, low, levels)
+        self.last_levels = levels
+        self.last_levels_at = time.time()
+        return {"ok": True, "high": high, "low": low, "levels": levels}
+
+    def place(self) -> dict:
+        """Compute fresh levels and place both pending orders."""
+        result = self.compute_levels()
+        if not result["ok"]:
+            return result
+
+        # Re-login only if the resident session dropped
+        if not is_mt5_logged_in(self.mt5_page):
+            print("[DAEMON] MT5 session dropped, logging in again...")
+            if not login_to_mt5(self.mt5_page):
+                return {"ok": False, "error": "MT5 re-login failed", "levels": result["levels"]}
+
+        buy_ok, sell_ok = place_orders(self.mt5_page, result["levels"], self.sell_page)
+        result.update({"ok": buy_ok and sell_ok, "buy_stop": buy_ok, "sell_stop": sell_ok})
+        return result
+
+    def status(self) -> dict:
+        """Report resident page state."""
+        live = self.live_levels.latest_levels()
+        return {
+            "ok": True,
+            "uptime_s": round(time.time() - self.started, 1),
+            "commands_served": self.commands_served,
+            "mt5_url": None if self.mt5_page.is_closed() else self.mt5_page.url,
+            "tv_url": None if self.tv_page.is_closed() else self.tv_page.url,
+            "last_levels": self.last_levels,
+            "last_levels_at": self.last_levels_at,
+            "live_levels": live.levels if live else None,
+            "live_bus": self.live_levels.stats(),
+        }
+
+    def screenshots(self) -> dict:
+        """Write the buffered debug screenshots to disk."""
+        return {"ok": True, "flushed": flush_screenshots("on demand")}
+
+    def handle(self, request: dict) -> dict:
+        """Dispatch one command."""
+        handlers = {
+            "status": self.status,
+            "levels": self.compute_levels,
+            "orders": self.place,
+            "screenshots": self.screenshots,
+        }
+        cmd = request.get("cmd", "")
+        handler = handlers.get(cmd) if isinstance(cmd, str) else None
+        if not handler:
+            return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+        self.commands_served += 1
+        started = time.perf_counter()
+        try:
+            response = handler()
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        response["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        # Export per command, as the scheduler does per cycle, so the daemon
+        # never accumulates spans
+        finish_trace(summary=False)
+        return response
+
+
+def open_server_socket(path: str) -> socket.socket:
+    """Bind the daemon's Unix socket, replacing a stale one."""
+    if os.path.exists(path):
+        os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(1)
+    return server
+
+
+def serve_connection(session: WarmSession, conn: socket.socket) -> bool:
+    """
+    Read one JSON request from a client and write the response.
+    Returns: True if the client asked the daemon to stop.
+    """
+    conn.settimeout(10.0)  # A client that never sends its line must not block the daemon
+    with conn, conn.makefile("rw") as stream:
+        line = stream.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            stream.write(json.dumps({"ok": False, "error": "Request must be a JSON object"}) + "\n")
+            stream.flush()
+            return False
+
+        if request.get("cmd") == "stop":
+            stream.write(json.dumps({"ok": True, "stopping": True}) + "\n")
+            stream.flush()
+            return True
+
+        print(f"\n[DAEMON] Command: {request.get('cmd')}")
+        response = session.handle(request)
+        stream.write(json.dumps(response, default=str) + "\n")
+        stream.flush()
+        return False
+
+
+def serve(session: WarmSession, path: str) -> None:
+    """
+    Serve commands one at a time on the calling thread.
+    Playwright's sync API is bound to the thread that created the pages,
+    so commands are handled inline rather than in worker threads.
+    """
+    server = open_server_socket(path)
+    print(f"[DAEMON] Listening on {path}")
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            try:
+                if serve_connection(session, conn):
+                    print("[DAEMON] Stop requested")
+                    return
+            except Exception as e:
+                # One bad client must not take the warm session down
+                print(f"[DAEMON] [WARN] Connection error: {e}")
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def run_daemon() -> None:
+    """Start both browsers, warm them up and serve commands until stopped."""
+    print("="*60)
+    print("     GOLD TRADING RPA - DAEMON MODE")
+    print("="*60)
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("[DAEMON] [FAIL] Unix sockets are not available on this platform")
+        return
+
+    with sync_playwright() as playwright:
+        mt5_browser, mt5_context, mt5_page = setup_browser(playwright, load_session_state())
+        tv_browser, tv_context, tv_page = setup_browser(playwright)
+
+        try:
+            session = WarmSession(mt5_page, tv_page)
+            if not session.warm_up():
+                return
+            serve(session, CONFIG["daemon_socket"])
+        finally:
+            mt5_browser.close()
+            tv_browser.close()
+
+
+def send_command(cmd: str, timeout: float = 300.0) -> dict:
+    """Send one command to a running daemon and return its reply."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(CONFIG["daemon_socket"])
+        with client.makefile("rw") as stream:
+            stream.write(json.dumps({"cmd": cmd}) + "\n")
+            stream.flush()
+            return json.loads(stream.readline())
+    finally:
+        client.close()
+
+
+def main():
+    """Thin CLI client for a running daemon."""
+    args = sys.argv[1:]
+    if not args or args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    try:
+        response = send_command(args[0])
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No daemon listening on {CONFIG['daemon_socket']} (start it with: python main.py --daemon)")
+        sys.exit(1)
+
+    print(json.dumps(response, indent=2))
+    if not response.get("ok"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
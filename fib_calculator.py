@@ -1,8 +1,100 @@
 """
 Fibonacci calculation functions.
 Calculates Fibonacci levels from High/Low prices.
+
+The batch functions work on NumPy arrays (many candles or symbols at once);
+the single-candle functions are thin wrappers over them so the live and
+batch paths share one formula.
 """
 
+import numpy as np
+
+from config import CONFIG
+
+
+# Display names used by the live path (ordered highest price to lowest)
+LEVEL_NAMES = {
+    "1.5": "1.5 (Above/Green)",
+    "1": "1 (High/Blue)",
+    "0.5": "0.5 (Entry/Red)",
+    "0": "0 (Low/Blue)",
+    "-0.5": "-0.5 (Below/Green)",
+}
+
+
+def level_name(ratio) -> str:
+    """Map a ratio ("0.5" or 0.5) to its display key, e.g. "0.5 (Entry/Red)"."""
+    key = f"{float(ratio):g}"
+    return LEVEL_NAMES.get(key, key)
+
+
+def parse_ratios(ratios=None) -> np.ndarray:
+    """
+    Normalise a ratio set (strings or floats) to a float array, highest first.
+    Defaults to CONFIG["desired_fib_levels"].
+    """
+    if ratios is None:
+        ratios = CONFIG["desired_fib_levels"]
+    return np.array(sorted((float(r) for r in ratios), reverse=True))
+
+
+def calculate_fib_matrix(highs, lows, ratios=None) -> tuple:
+    """
+    Calculate Fibonacci levels for many candles in one vectorized pass.
+    
+    Formula (per row): Level = Low + (ratio × (High - Low)),
+    with High/Low swapped where needed so High >= Low.
+    
+    Returns: (ratios, matrix) where ratios has shape (k,) and matrix has
+    shape (n, k): one row per candle, one column per ratio.
+    """
+    highs = np.atleast_1d(np.asarray(highs, dtype=float))
+    lows = np.atleast_1d(np.asarray(lows, dtype=float))
+    ratio_arr = parse_ratios(ratios)
+    
+    hi = np.maximum(highs, lows)
+    lo = np.minimum(highs, lows)
+    diff = hi - lo
+    
+    matrix = lo[:, None] + ratio_arr[None, :] * diff[:, None]
+    return ratio_arr, matrix
+
+
+def calculate_bar_levels(bars: dict, ratios=None) -> tuple:
+    """
+    Fibonacci matrix for a bar set, e.g. a candle_store range or tail view.
+    Returns: (ratios, matrix) as calculate_fib_matrix.
+    """
+    return calculate_fib_matrix(bars["high"], bars["low"], ratios)
+
+
+def calculate_trade_arrays(highs, lows) -> dict:
+    """
+    Derive Buy Stop / Sell Stop prices for many candles.
+    Entry, SL and TP ratios come from CONFIG["buy_stop"] / CONFIG["sell_stop"].
+    
+    Returns: dict of arrays, each shape (n,):
+        buy_entry, buy_sl, buy_tp, sell_entry, sell_sl, sell_tp
+    """
+    buy, sell = CONFIG["buy_stop"], CONFIG["sell_stop"]
+    wanted = {buy["entry_level"], buy["sl_level"], buy["tp_level"],
+              sell["entry_level"], sell["sl_level"], sell["tp_level"]}
+    
+    ratio_arr, matrix = calculate_fib_matrix(highs, lows, wanted)
+    column = {f"{r:g}": i for i, r in enumerate(ratio_arr)}
+    
+    def col(ratio: str) -> np.ndarray:
+        return matrix[:, column[f"{float(ratio):g}"]]
+    
+    return {
+        "buy_entry": col(buy["entry_level"]),
+        "buy_sl": col(buy["sl_level"]),
+        "buy_tp": col(buy["tp_level"]),
+        "sell_entry": col(sell["entry_level"]),
+        "sell_sl": col(sell["sl_level"]),
+        "sell_tp": col(sell["tp_level"]),
+    }
+
 
 def calculate_fib_levels(high_price: float, low_price: float) -> dict:
     """
@@ -19,22 +111,18 @@ def calculate_fib_levels(high_price: float, low_price: float) -> dict:
     
     Returns: dict of level names to prices
     """
-    # Validate and swap if needed (ensure high > low)
-    if high_price <= low_price:
-        high_price, low_price = low_price, high_price
-    
-    diff = high_price - low_price
-    
-    # Calculate using formula: Level = Low + (level × diff)
-    levels = {
-        "1.5 (Above/Green)": low_price + (1.5 * diff),   # Above High
-        "1 (High/Blue)": low_price + (1.0 * diff),       # = High
-        "0.5 (Entry/Red)": low_price + (0.5 * diff),     # Midpoint
-        "0 (Low/Blue)": low_price + (0.0 * diff),        # = Low
-        "-0.5 (Below/Green)": low_price + (-0.5 * diff), # Below Low
-    }
-    
-    return levels
+    ratio_arr, matrix = calculate_fib_matrix([high_price], [low_price], LEVEL_NAMES.keys())
+    return {level_name(r): float(price) for r, price in zip(ratio_arr, matrix[0])}
+
+
+def calculate_trade_prices(levels: dict) -> dict:
+    """
+    Buy Stop / Sell Stop prices for one candle, from its calculate_fib_levels
+    dict (single-candle wrapper of calculate_trade_arrays).
+    Returns: {"buy_entry", "buy_sl", "buy_tp", "sell_entry", "sell_sl", "sell_tp"}
+    """
+    arrays = calculate_trade_arrays([levels[level_name("1")]], [levels[level_name("0")]])
+    return {name: float(values[0]) for name, values in arrays.items()}
 
 
 def get_trade_levels(levels: dict) -> dict:
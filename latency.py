@@ -0,0 +1,259 @@
+"""
+Signal-to-Order Latency
+=======================
+Every Fib levels message handed from TradingView to MT5 carries monotonic
+timestamps for each stage:
+
+    candle_close     the reference candle closed (scheduler runs only;
+                     a live candle has not closed yet)
+    extracted        High/Low read from the chart
+    enqueued         levels handed to the MT5 side
+    dequeued         MT5 side picked them up
+    <order>.form_filled       order form filled (per order type)
+    <order>.order_confirmed   order confirmed by the terminal (per order type)
+
+The intervals between stages are recorded into log-linear histograms
+(HdrHistogram layout, 3 significant digits) that are merged into
+CONFIG["latency_file"] after every handoff, so percentiles accumulate
+across runs.
+
+Usage:
+    python latency.py            # p50/p90/p99/p99.9/max per interval, all runs
+    python latency.py --reset    # Delete the stored histograms
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from config import CONFIG
+
+
+# name -> (from stage, to stage); "{order}" expands to each order type
+INTERVALS = {
+    "close_to_extract": ("candle_close", "extracted"),
+    "extract_to_enqueue": ("extracted", "enqueued"),
+    "queue_wait": ("enqueued", "dequeued"),
+    "dequeue_to_filled": ("dequeued", "{order}.form_filled"),
+    "filled_to_confirmed": ("{order}.form_filled", "{order}.order_confirmed"),
+    "signal_to_order": ("extracted", "{order}.order_confirmed"),
+    "close_to_order": ("candle_close", "{order}.order_confirmed"),
+}
+
+ORDER_TYPES = ("Buy Stop", "Sell Stop")
+PERCENTILES = (50, 90, 99, 99.9)
+
+_file_lock = threading.Lock()
+
+
+def order_key(order_type: str) -> str:
+    """Stage prefix for an order type: "Buy Stop" -> "buy_stop"."""
+    return order_type.lower().replace(" ", "_")
+
+
+class LevelsMessage:
+    """Fib levels plus the monotonic time each handoff stage was reached."""
+
+    def __init__(self, levels: dict, high: float = None, low: float = None, candle_close: float = None):
+        self.levels = levels
+        self.high = high
+        self.low = low
+        self.stamps = {}
+        if candle_close is not None:
+            self.stamp_wall("candle_close", candle_close)
+
+    def copy(self) -> "LevelsMessage":
+        """Same levels, own stamps (each subscriber stamps its own dequeue / orders)."""
+        message = LevelsMessage(self.levels, self.high, self.low)
+        message.stamps = dict(self.stamps)
+        return message
+
+    def stamp(self, stage: str, at: float = None) -> None:
+        """Record a stage at time.monotonic() (or a monotonic time taken earlier)."""
+        self.stamps[stage] = at if at is not None else time.monotonic()
+
+    def stamp_wall(self, stage: str, epoch: float) -> None:
+        """Record a stage known as wall-clock time, mapped onto the monotonic clock."""
+        self.stamps[stage] = time.monotonic() - (time.time() - epoch)
+
+    def stamp_orders(self, marks: dict) -> None:
+        """
+        Copy per-order stages from {(order_type, stage): monotonic} (mt5_orders.order_stamps()),
+        keeping only those reached after this message was dequeued.
+        """
+        since = self.stamps.get("dequeued", self.stamps.get("extracted", 0))
+        for (order_type, stage), at in marks.items():
+            if at >= since:
+                self.stamps[f"{order_key(order_type)}.{stage}"] = at
+
+    def intervals(self) -> dict:
+        """
+        Milliseconds between stages that were both reached.
+        Returns: {interval name: [ms, ...]} (one value per order for per-order intervals).
+        """
+        result = {}
+        for name, (start, end) in INTERVALS.items():
+            orders = ORDER_TYPES if "{order}" in start + end else (None,)
+            for order_type in orders:
+                key = order_key(order_type) if order_type else ""
+                a = self.stamps.get(start.format(order=key))
+                b = self.stamps.get(end.format(order=key))
+                if a is not None and b is not None:
+                    result.setdefault(name, []).append((b - a) * 1000)
+        return result
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in microseconds (HdrHistogram bucket layout).
+    Values below 2^SUB_BUCKET_BITS us are exact; above that each power of two
+    is split into 2^(SUB_BUCKET_BITS - 1) buckets, i.e. under 0.1% error.
+    """
+
+    SUB_BUCKET_BITS = 11
+
+    def __init__(self, counts: dict = None):
+        self.counts = counts or {}   # lowest equivalent value (us) -> count
+        self.total = sum(self.counts.values())
+
+    @classmethod
+    def bucket(cls, value_us: int) -> tuple:
+        """Returns: (lowest equivalent value, bucket width) for a value."""
+        shift = max(0, value_us.bit_length() - cls.SUB_BUCKET_BITS)
+        return (value_us >> shift) << shift, 1 << shift
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        lowest, _ = self.bucket(max(0, int(round(value_ms * 1000))))
+        self.counts[lowest] = self.counts.get(lowest, 0) + count
+        self.total += count
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for lowest, count in other.counts.items():
+            self.counts[lowest] = self.counts.get(lowest, 0) + count
+        self.total += other.total
+
+    def percentile(self, p: float) -> float:
+        """Value (ms) at or below which p% of samples fall (highest equivalent value of its bucket)."""
+        if not self.total:
+            return None
+        target = max(1, math.ceil(p / 100 * self.total))
+        seen = 0
+        for lowest in sorted(self.counts):
+            seen += self.counts[lowest]
+            if seen >= target:
+                _, width = self.bucket(lowest)
+                return (lowest + width - 1) / 1000
+        return self.max()
+
+    def max(self) -> float:
+        if not self.counts:
+            return None
+        lowest = max(self.counts)
+        return (lowest + self.bucket(lowest)[1] - 1) / 1000
+
+    def to_dict(self) -> dict:
+        return {"counts": {str(k): v for k, v in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        return cls({int(k): v for k, v in data.get("counts", {}).items()})
+
+
+# =============================================================================
+# PERSISTENCE
+# =============================================================================
+
+def get_latency_path() -> str:
+    path = CONFIG["latency_file"]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return path
+
+
+def load_histograms(path: str = None) -> dict:
+    """Returns: {interval name: LatencyHistogram} ({} if nothing stored yet)."""
+    try:
+        with open(path or get_latency_path()) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {name: LatencyHistogram.from_dict(h) for name, h in data.get("histograms", {}).items()}
+
+
+def save_histograms(histograms: dict, path: str = None) -> None:
+    data = {"updated": time.time(),
+            "histograms": {name: h.to_dict() for name, h in histograms.items()}}
+    path = path or get_latency_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def record_handoff(message: LevelsMessage) -> dict:
+    """
+    Print this message's stage intervals and merge them into the stored histograms.
+    Returns: {interval name: [ms, ...]}
+    """
+    intervals = message.intervals()
+    if not intervals:
+        return intervals
+
+    parts = [f"{name} {'/'.join(f'{v:.0f}' for v in values)}" for name, values in intervals.items()]
+    print(f"[LATENCY] ms: {', '.join(parts)}")
+
+    with _file_lock:
+        histograms = load_histograms()
+        for name, values in intervals.items():
+            histogram = histograms.setdefault(name, LatencyHistogram())
+            for value in values:
+                histogram.record(value)
+        try:
+            save_histograms(histograms)
+        except OSError as e:
+            print(f"[LATENCY] [WARN] Could not save histograms: {e}")
+    return intervals
+
+
+def print_report(histograms: dict) -> None:
+    """Percentile table, in INTERVALS order."""
+    print("\n" + "="*78)
+    print("         SIGNAL-TO-ORDER LATENCY (ms, all runs)")
+    print("="*78)
+    header = "".join(f"{'P' + format(p, 'g'):>9}" for p in PERCENTILES)
+    print(f"  {'INTERVAL':<22} {'N':>6}{header} {'MAX':>9}")
+    for name in list(INTERVALS) + [n for n in histograms if n not in INTERVALS]:
+        h = histograms.get(name)
+        if not h or not h.total:
+            continue
+        values = "".join(f"{h.percentile(p):>9.0f}" for p in PERCENTILES)
+        print(f"  {name:<22} {h.total:>6}{values} {h.max():>9.0f}")
+    print("="*78)
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    if args and args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    path = get_latency_path()
+    if "--reset" in args:
+        if os.path.exists(path):
+            os.remove(path)
+        print(f"Removed {path}")
+        return
+
+    histograms = load_histograms(path)
+    if not histograms:
+        print(f"No latency data in {path} yet")
+        sys.exit(1)
+    print_report(histograms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Push-based legend observer.
+Installs a MutationObserver on the TradingView chart legend and pushes
+every change of its text to Python through page.expose_binding, where the
+parsed O/H/L/C of the current candle is kept in a thread-safe cell.
+
+extract_prices reads the cell instead of hovering and sleeping. Like the
+websocket feed, sync API bindings are delivered while a Playwright call is
+in progress, so any call on the page (e.g. update_status) flushes them.
+"""
+
+from playwright.sync_api import Page
+import re
+import threading
+import time
+
+from config import CONFIG
+
+
+BINDING_NAME = "__legendUpdate"
+
+# Runs on every navigation. Waits for the legend, observes it, coalesces
+# bursts of mutations into one push per task and only pushes when the text
+# actually changed. Re-attaches if the legend node is replaced.
+LEGEND_OBSERVER_JS = """
+(() => {
+    if (window.__legendObserverInstalled) return;
+    window.__legendObserverInstalled = true;
+
+    let legend = null, observer = null, lastText = null, pending = false;
+
+    const push = () => {
+        pending = false;
+        if (!legend) return;
+        const text = legend.innerText || legend.textContent || '';
+        if (text === lastText) return;
+        lastText = text;
+        window.%(binding)s({ text, ts: Date.now() });
+    };
+    const schedule = () => {
+        if (!pending) {
+            pending = true;
+            setTimeout(push, 0);
+        }
+    };
+    const attach = () => {
+        const found = document.querySelector("div[data-name='legend']");
+        if (!found || found === legend) return;
+        if (observer) observer.disconnect();
+        legend = found;
+        lastText = null;
+        observer = new MutationObserver(schedule);
+        observer.observe(legend, { childList: true, subtree: true, characterData: true });
+        schedule();
+    };
+    setInterval(() => {
+        if (!legend || !legend.isConnected) attach();
+    }, 250);
+})();
+""" % {"binding": BINDING_NAME}
+
+OHLC_PATTERNS = {
+    "open": re.compile(r'O\s*([\d,]+\.?\d*)'),
+    "high": re.compile(r'H\s*([\d,]+\.?\d*)'),
+    "low": re.compile(r'L\s*([\d,]+\.?\d*)'),
+    "close": re.compile(r'C\s*([\d,]+\.?\d*)'),
+}
+
+
+def parse_legend_ohlc(legend_text: str) -> dict:
+    """
+    Parse O/H/L/C out of legend text (same patterns as parse_legend_text).
+    Returns: {"open", "high", "low", "close"} (missing values are None).
+    """
+    values = {}
+    for name, pattern in OHLC_PATTERNS.items():
+        match = pattern.search(legend_text)
+        values[name] = float(match.group(1).replace(',', '')) if match else None
+    return values
+
+
+def legend_shows(legend_text: str, symbol: str = None, interval: str = None) -> bool:
+    """
+    Does the legend text belong to this chart? Same checks as
+    waits.LEGEND_HAS_TEXT_JS / LEGEND_HAS_INTERVAL_JS: the symbol appears in
+    it (OANDA:XAUUSD -> XAUUSD) and the interval stands as its own token.
+    """
+    if symbol and symbol.split(":")[-1].upper() not in legend_text.upper():
+        return False
+    if interval and not re.search(r'(^|[\s\u00b7])' + re.escape(str(interval)) + r'([\s\u00b7]|$)', legend_text):
+        return False
+    return True
+
+
+class LegendCell:
+    """Latest legend candle state, written by the binding, read by any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self.updates = 0
+        self._listeners = []
+
+    def add_listener(self, callback) -> None:
+        """Call callback(state) with every new candle state (on the binding's thread)."""
+        self._listeners.append(callback)
+
+    def on_update(self, source, payload: dict) -> None:
+        """Binding callback: parse and store the pushed legend text."""
+        values = parse_legend_ohlc(payload.get("text", ""))
+        if values["high"] is None or values["low"] is None:
+            return
+        values["text"] = payload.get("text", "")
+        values["page_ts"] = payload.get("ts")
+        values["received"] = time.time()
+        with self._lock:
+            self._state = values
+            self.updates += 1
+        for callback in self._listeners:
+            callback(dict(values))
+
+    def latest(self, symbol: str = None, interval: str = None) -> dict:
+        """
+        Latest candle seen on the legend; with symbol/interval, only if the
+        legend showed that chart (a candle of the previous symbol or interval
+        is never returned).
+        Returns: {"open", "high", "low", "close", "text", "page_ts", "received"} or None.
+        """
+        with self._lock:
+            state = dict(self._state) if self._state else None
+        if state and not legend_shows(state["text"], symbol, interval):
+            return None
+        return state
+
+    def clear(self) -> None:
+        """Drop the stored state (e.g. after switching symbol)."""
+        with self._lock:
+            self._state = None
+
+
+def attach_legend_observer(page: Page) -> LegendCell:
+    """
+    Subscribe to legend updates on a page.
+    Call BEFORE navigating; on an already-loaded page the observer is also
+    installed immediately.
+    """
+    cell = LegendCell()
+    page.expose_binding(BINDING_NAME, cell.on_update)
+    page.add_init_script(LEGEND_OBSERVER_JS)
+    if page.url.startswith("http"):
+        page.evaluate(LEGEND_OBSERVER_JS)
+    return cell
+
+
+def start_legend_observer(page: Page) -> LegendCell:
+    """Attach a legend observer if enabled in config, else None."""
+    if not CONFIG.get("use_legend_observer", False):
+        return None
+    return attach_legend_observer(page)
@@ -0,0 +1,211 @@
+"""
+In-process level bus.
+Publishes Fib level sets (latency.LevelsMessage) to any number of
+subscribers: order placers, loggers, APIs. Replaces the single-consumer
+queue between the TradingView and MT5 workflows.
+
+- Every subscriber gets every event (fan-out), in its own bounded buffer;
+  a slow subscriber loses its oldest events, never blocks the publisher.
+- The bus keeps the latest event, and new subscribers receive it at once,
+  so a late MT5 thread does not wait for the next publish.
+- Failures and invalidation are explicit events (ERROR, STALE) instead of
+  empty dicts.
+
+Publishing is one lock, a counter and a deque append per subscriber, so it
+is cheap enough to run on every legend update (see follow_legend).
+"""
+
+from collections import deque
+import queue
+import threading
+import time
+
+from config import CONFIG
+from latency import LevelsMessage
+from fib_calculator import calculate_fib_levels
+from price_extractor import in_price_range
+from legend_observer import legend_shows
+
+
+LEVELS = "levels"
+ERROR = "error"
+STALE = "stale"
+
+
+class LevelBusError(RuntimeError):
+    """An ERROR event reached a subscriber waiting for levels."""
+
+
+class LevelEvent:
+    """One bus event: a level set, an error or a stale marker."""
+
+    __slots__ = ("seq", "kind", "message", "reason", "published")
+
+    def __init__(self, seq: int, kind: str, message: LevelsMessage = None, reason: str = None):
+        self.seq = seq
+        self.kind = kind
+        self.message = message
+        self.reason = reason
+        self.published = time.monotonic()
+
+    def age(self) -> float:
+        """Seconds since the event was published."""
+        return time.monotonic() - self.published
+
+    def __repr__(self):
+        return f"LevelEvent(#{self.seq} {self.kind}{': ' + self.reason if self.reason else ''})"
+
+
+class Subscription:
+    """A subscriber's bounded view of the bus."""
+
+    def __init__(self, bus: "LevelBus", name: str, max_pending: int):
+        self.bus = bus
+        self.name = name
+        self.dropped = 0
+        self._events = deque(maxlen=max_pending)
+        self._ready = threading.Condition()
+
+    def deliver(self, event: LevelEvent) -> None:
+        """Called by the bus; drops the oldest pending event when full."""
+        with self._ready:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._ready.notify()
+
+    def get(self, timeout: float = None) -> LevelEvent:
+        """
+        Next event for this subscriber.
+        Raises: queue.Empty on timeout (same contract as queue.Queue.get).
+        """
+        with self._ready:
+            if not self._ready.wait_for(lambda: self._events, timeout):
+                raise queue.Empty
+            return self._events.popleft()
+
+    def drain(self) -> list:
+        """All pending events, oldest first."""
+        with self._ready:
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def wait_levels(self, timeout: float = None) -> LevelsMessage:
+        """
+        Wait for a current level set. Pending events are conflated: the
+        newest LEVELS or ERROR wins, and a STALE marker cancels anything before it.
+        Returns: this subscriber's copy of the message, stamped "dequeued".
+        Raises: LevelBusError on an ERROR event, queue.Empty on timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        current = None
+        while True:
+            remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            for event in [self.get(remaining)] + self.drain():
+                current = None if event.kind == STALE else event
+            if current is None:
+                continue
+            if current.kind == ERROR:
+                raise LevelBusError(current.reason)
+            message = current.message.copy()
+            message.stamp("dequeued")
+            return message
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LevelBus:
+    """Fan-out publisher with a retained latest event."""
+
+    def __init__(self, max_pending: int = None):
+        self.max_pending = max_pending or CONFIG["level_bus"]["max_pending"]
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._latest = None
+        self._seq = 0
+
+    def subscribe(self, name: str, replay_latest: bool = True, max_pending: int = None) -> Subscription:
+        """Add a subscriber; it receives the latest event right away unless replay_latest=False."""
+        subscription = Subscription(self, name, max_pending or self.max_pending)
+        with self._lock:
+            self._subscribers.append(subscription)
+            if replay_latest and self._latest is not None:
+                subscription.deliver(self._latest)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _publish(self, kind: str, message: LevelsMessage = None, reason: str = None) -> LevelEvent:
+        with self._lock:
+            self._seq += 1
+            event = LevelEvent(self._seq, kind, message, reason)
+            self._latest = event
+            for subscription in self._subscribers:
+                subscription.deliver(event)
+        return event
+
+    def publish(self, message: LevelsMessage) -> LevelEvent:
+        """Publish a level set (stamped "enqueued")."""
+        message.stamp("enqueued")
+        return self._publish(LEVELS, message)
+
+    def publish_error(self, reason: str) -> LevelEvent:
+        """Tell subscribers the producer failed; waiting consumers raise LevelBusError."""
+        return self._publish(ERROR, reason=reason)
+
+    def mark_stale(self, reason: str) -> LevelEvent:
+        """Invalidate the latest level set (new run, new candle, symbol change)."""
+        return self._publish(STALE, reason=reason)
+
+    def latest(self) -> LevelEvent:
+        """Latest event, or None if nothing was published yet."""
+        with self._lock:
+            return self._latest
+
+    def latest_levels(self, max_age: float = None) -> LevelsMessage:
+        """Latest level set if it is still current (and younger than max_age seconds), else None."""
+        event = self.latest()
+        if event is None or event.kind != LEVELS:
+            return None
+        if max_age is not None and event.age() > max_age:
+            return None
+        return event.message
+
+    def stats(self) -> dict:
+        """Sequence number and per-subscriber backlog / drops."""
+        with self._lock:
+            return {
+                "seq": self._seq,
+                "latest": self._latest.kind if self._latest else None,
+                "subscribers": {s.name: {"pending": len(s._events), "dropped": s.dropped}
+                                for s in self._subscribers},
+            }
+
+
+def follow_legend(bus: LevelBus, legend_cell, symbol: str = None) -> None:
+    """
+    Publish a level set on every legend update of a page.
+    Candles of another symbol / timeframe (while the chart switches) and
+    invalid candles (out of the symbol's price range) are skipped.
+    """
+    def on_candle(state: dict) -> None:
+        if not legend_shows(state["text"], symbol or CONFIG["symbol"], CONFIG["timeframe"]):
+            return
+        if not in_price_range(state["high"], state["low"], symbol):
+            return
+        message = LevelsMessage(calculate_fib_levels(state["high"], state["low"]), state["high"], state["low"])
+        message.stamp("extracted")
+        bus.publish(message)
+
+    legend_cell.add_listener(on_candle)
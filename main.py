@@ -5,20 +5,32 @@ Runs MT5 login + order placement and TradingView Fibonacci automation
 in PARALLEL (two browser windows simultaneously).
 
 Usage:
-    python main.py              # Run both in parallel (TradingView + MT5 with orders)
+    python main.py              # Run both in parallel (TradingView + MT5 with orders);
+                                #   with several CONFIG["mt5_accounts"], same as --accounts
+    python main.py --accounts   # TradingView once, orders on every account (see account_pool.py)
     python main.py --tv-only    # Run only TradingView automation
     python main.py --mt5-only   # Run only MT5 login
     python main.py --sequential # Run one after another (old behavior)
+    python main.py --shared-browser  # Parallel, one Chromium with two contexts
+    python main.py --async      # Parallel on one asyncio loop (async_playwright)
+    python main.py --scan       # Multi-symbol Fib scan (see scanner.py)
+    python main.py --daemon     # Keep warm browsers and serve commands (see daemon.py)
+    python main.py --schedule   # Fire at every candle close from warm browsers (see scheduler.py)
+    python main.py --mt5-signal # MT5 only: candle from Market Watch quotes, one browser (see mt5_signal.py);
+                                #   default when CONFIG["signal_source"] is "mt5"
 """
 
 import sys
+import time
 import threading
 import queue
 from playwright.sync_api import sync_playwright
 
-from browser import setup_browser
+from config import CONFIG
+from browser import setup_browser, launch_shared_browser, connect_browser
+from session_cache import load_session_state
 from mt5_login import login_to_mt5
-from mt5_orders import place_orders, select_gold_symbol
+from mt5_orders import place_orders, select_gold_symbol, open_sell_page, order_stamps
 from chart_steps import (
     navigate_to_tradingview,
     load_symbol,
@@ -29,13 +41,20 @@ from chart_steps import (
     configure_fib_levels,
 )
 from price_extractor import extract_prices
+from network_capture import start_bar_capture
+from legend_observer import start_legend_observer
 from fib_calculator import calculate_fib_levels, print_fib_results, get_trade_levels
-from utils import update_status
+from utils import update_status, get_process_tree_memory_mb
+from tracing import set_workflow, finish_trace
+from latency import LevelsMessage, record_handoff
+from level_bus import LevelBus, LevelBusError
+from waits import get_timeout
 
 
 # Thread-safe print and shared data
 print_lock = threading.Lock()
-fib_levels_queue = queue.Queue()  # To pass levels from TV to MT5
+level_bus = LevelBus()  # Fib levels from TV to MT5 (and any other subscriber)
+startup_times = {}  # Workflow name -> seconds to get a usable page
 
 def safe_print(msg):
     """Thread-safe printing."""
@@ -43,15 +62,40 @@ def safe_print(msg):
         print(msg)
 
 
-def run_mt5_workflow(wait_for_levels=False):
+def record_startup(name: str, started: float, expected: int = 2):
+    """Record how long a workflow took to get its page; report once all are up."""
+    with print_lock:
+        startup_times[name] = time.perf_counter() - started
+        print(f"[{name}] Browser ready in {startup_times[name]:.2f}s")
+        if len(startup_times) < expected:
+            return
+        mem = get_process_tree_memory_mb()
+        mem_str = f"{mem:.0f} MB" if mem is not None else "n/a (pip install psutil)"
+        print(f"[MAIN] Startup: {max(startup_times.values()):.2f}s wall, "
+              f"memory (drivers + browsers): {mem_str}")
+
+
+def open_workflow_browser(playwright, cdp_endpoint=None, storage_state=None) -> tuple:
+    """Launch a dedicated browser, or attach a new context to a shared one."""
+    if cdp_endpoint:
+        return connect_browser(playwright, cdp_endpoint, storage_state)
+    return setup_browser(playwright, storage_state)
+
+
+def run_mt5_workflow(wait_for_levels=False, cdp_endpoint=None, own_levels=False):
     """
     MT5 Login + Order placement workflow.
     If wait_for_levels=True, waits for Fib levels from TradingView before placing orders.
+    If own_levels=True, derives the levels from MT5's own quotes instead (mt5_signal.py).
+    If cdp_endpoint is set, opens a context in that shared browser instead of launching one.
     """
     safe_print("\n[MT5] Starting MT5 workflow...")
+    set_workflow("MT5")
     
     with sync_playwright() as playwright:
-        browser, context, page = setup_browser(playwright)
+        started = time.perf_counter()
+        browser, context, page = open_workflow_browser(playwright, cdp_endpoint, load_session_state())
+        record_startup("MT5", started)
         
         try:    
             # Step 1: Login
@@ -66,51 +110,93 @@ def run_mt5_workflow(wait_for_levels=False):
             # Step 2: Select GOLD symbol
             select_gold_symbol(page)
             
-            # Step 3: Wait for Fib levels if running in parallel
-            if wait_for_levels:
+            outcome = (True, "MT5 workflow complete")
+            
+            # Step 3: Levels from this terminal's quotes (no TradingView)
+            if own_levels:
+                from mt5_signal import attach_quote_feed, read_mt5_levels
+                message = read_mt5_levels(page, attach_quote_feed(page))
+                if message is None:
+                    return False, "No MT5 candle"
+                message.stamp("dequeued")
+                
+                # Step 4: Place orders
+                buy_success, sell_success = place_orders(page, message.levels)
+                message.stamp_orders(order_stamps())
+                record_handoff(message)
+                if not (buy_success and sell_success):
+                    return False, "MT5 order placement failed"
+            
+            # Step 3 (parallel mode): wait for Fib levels from TradingView
+            elif wait_for_levels:
+                # Dual-page mode: get the Sell Stop page ready while TV works
+                sell_page = open_sell_page(page) if CONFIG["mt5_dual_page_orders"] else None
+                
                 safe_print("[MT5] Waiting for Fib levels from TradingView...")
-                try:
-                    fib_levels = fib_levels_queue.get(timeout=120)  # Wait max 2 mins
-                    safe_print("[MT5] [OK] Received Fib levels!")
-                    
-                    # Step 4: Place orders
-                    buy_success, sell_success = place_orders(page, fib_levels)
-                    
-                except queue.Empty:
-                    safe_print("[MT5] [FAIL] Timeout waiting for Fib levels!")
-                    safe_print("[MT5] Browser will stay open for manual trading...")
+                with level_bus.subscribe("mt5-orders") as levels_feed:
+                    try:
+                        message = levels_feed.wait_levels(timeout=get_timeout("levels_wait") / 1000)
+                        safe_print("[MT5] [OK] Received Fib levels!")
+                        
+                        # Step 4: Place orders
+                        buy_success, sell_success = place_orders(page, message.levels, sell_page)
+                        message.stamp_orders(order_stamps())
+                        record_handoff(message)
+                        if not (buy_success and sell_success):
+                            outcome = (False, "MT5 order placement failed")
+                        
+                    except queue.Empty:
+                        safe_print("[MT5] [FAIL] Timeout waiting for Fib levels!")
+                        safe_print("[MT5] Browser will stay open for manual trading...")
+                        outcome = (False, "Timeout waiting for Fib levels")
+                    except LevelBusError as e:
+                        safe_print(f"[MT5] [FAIL] TradingView failed, no orders placed: {e}")
+                        outcome = (False, f"TradingView failed: {e}")
             
             # Keep browser open
-            safe_print("[MT5] Browser will stay open for trading...")
-            page.pause()
+            if CONFIG["interactive"]:
+                safe_print("[MT5] Browser will stay open for trading...")
+                page.pause()
             
-            return True, "MT5 workflow complete"
+            return outcome
             
         except Exception as e:
             safe_print(f"[MT5] [FAIL] Error: {e}")
             return False, str(e)
 
 
-def run_tradingview_workflow(share_levels=False):
+def run_tradingview_workflow(share_levels=False, cdp_endpoint=None):
     """
     TradingView Fibonacci workflow.
-    If share_levels=True, puts calculated levels in queue for MT5.
+    If share_levels=True, publishes calculated levels on level_bus for MT5.
+    If cdp_endpoint is set, opens a context in that shared browser instead of launching one.
     """
     safe_print("\n[TV] Starting TradingView workflow...")
+    set_workflow("TV")
     
     with sync_playwright() as playwright:
-        browser, context, page = setup_browser(playwright)
+        started = time.perf_counter()
+        browser, context, page = open_workflow_browser(playwright, cdp_endpoint)
+        record_startup("TV", started)
         
         try:
             safe_print("[TV] " + "="*50)
             safe_print("[TV] TRADINGVIEW FIBONACCI AUTOMATION")
             safe_print("[TV] " + "="*50)
             
+            bar_feed = start_bar_capture(page)  # Before load: chart websocket opens on navigation
+            legend_cell = start_legend_observer(page)
             navigate_to_tradingview(page)      # Step 1
-            load_symbol(page)                   # Step 2
+            if not load_symbol(page):           # Step 2
+                raise RuntimeError(f"{CONFIG['symbol']} not loaded on the chart")
             set_timeframe(page)                 # Step 3
             select_current_candle(page)         # Step 4
-            high, low = extract_prices(page)    # Step 5
+            # Step 5 (nobody to prompt in unattended runs)
+            high, low = extract_prices(page, bar_feed, legend_cell=legend_cell,
+                                       allow_manual=CONFIG["interactive"])
+            extracted = time.monotonic()
+            if high is None or low is None:
+                raise RuntimeError("Could not read candle High/Low")
             select_fib_tool(page)               # Step 6
             draw_fibonacci(page)                # Step 7
             configure_fib_levels(page)          # Step 8
@@ -122,7 +208,9 @@ def run_tradingview_workflow(share_levels=False):
             
             # Share levels with MT5 if parallel mode
             if share_levels:
-                fib_levels_queue.put(levels)
+                message = LevelsMessage(levels, high, low)
+                message.stamp("extracted", extracted)
+                level_bus.publish(message)
                 safe_print("[TV] [OK] Sent Fib levels to MT5!")
             
             # Update overlay
@@ -133,23 +221,33 @@ def run_tradingview_workflow(share_levels=False):
             update_status(page, status, "")
             
             safe_print("[TV] [OK] TradingView workflow complete!")
-            safe_print("[TV] Browser will stay open...")
             
             # Keep browser open
-            page.pause()
+            if CONFIG["interactive"]:
+                safe_print("[TV] Browser will stay open...")
+                page.pause()
             
             return True, levels
             
         except Exception as e:
             safe_print(f"[TV] [FAIL] Error: {e}")
-            # Still put empty dict so MT5 doesn't hang
+            # Publish the failure so MT5 doesn't hang
             if share_levels:
-                fib_levels_queue.put({})
+                level_bus.publish_error(str(e))
             return False, str(e)
 
 
-def run_parallel():
-    """Run MT5 and TradingView in PARALLEL with order placement."""
+def run_workflow_into(results: dict, name: str, workflow, *args) -> None:
+    """Thread target: keep a workflow's (success, result) under its name."""
+    results[name] = workflow(*args)
+
+
+def run_parallel(cdp_endpoint=None) -> bool:
+    """
+    Run MT5 and TradingView in PARALLEL with order placement.
+    If cdp_endpoint is set, both workflows share that browser (one context each).
+    Returns: True if both workflows succeeded (orders placed).
+    """
     print("="*60)
     print("     GOLD TRADING RPA - PARALLEL MODE")
     print("="*60)
@@ -163,15 +261,19 @@ def run_parallel():
     print("  4. MT5 places Buy Stop + Sell Stop orders")
     print("="*60)
     
+    # Levels from an earlier run in this process must not be replayed
+    level_bus.mark_stale("new run")
+    
     # Create threads - MT5 waits for levels, TV shares levels
+    results = {}
     mt5_thread = threading.Thread(
-        target=run_mt5_workflow, 
-        args=(True,),  # wait_for_levels=True
+        target=run_workflow_into,
+        args=(results, "MT5", run_mt5_workflow, True, cdp_endpoint),  # wait_for_levels=True
         name="MT5-Thread"
     )
     tv_thread = threading.Thread(
-        target=run_tradingview_workflow,
-        args=(True,),  # share_levels=True
+        target=run_workflow_into,
+        args=(results, "TV", run_tradingview_workflow, True, cdp_endpoint),  # share_levels=True
         name="TV-Thread"
     )
     
@@ -190,10 +292,71 @@ def run_parallel():
     print("\n" + "="*60)
     print("     ALL WORKFLOWS COMPLETE")
     print("="*60)
+    
+    # A workflow that died without reporting counts as failed
+    failed = [name for name in ("MT5", "TV") if not results.get(name, (False,))[0]]
+    for name in failed:
+        print(f"[MAIN] [FAIL] {name}: {results.get(name, (False, 'no result'))[1]}")
+    return not failed
+
+
+def run_multi_account():
+    """
+    TradingView on its own thread; every MT5 account in the pool logs in
+    meanwhile and receives the same levels, placed concurrently.
+    """
+    from account_pool import AccountPool
+    
+    print("="*60)
+    print("     GOLD TRADING RPA - MULTI-ACCOUNT MODE")
+    print("="*60)
+    
+    level_bus.mark_stale("new run")
+    tv_thread = threading.Thread(target=run_tradingview_workflow, args=(True,), name="TV-Thread")
+    
+    with level_bus.subscribe("account-pool") as levels_feed, sync_playwright() as playwright:
+        pool = AccountPool()
+        tv_thread.start()
+        try:
+            if pool.start(playwright):
+                safe_print("[POOL] Waiting for Fib levels from TradingView...")
+                try:
+                    message = levels_feed.wait_levels(timeout=get_timeout("levels_wait") / 1000)
+                    safe_print("[POOL] [OK] Received Fib levels, placing on every account...")
+                    pool.place_orders(message)
+                except queue.Empty:
+                    safe_print("[POOL] [FAIL] Timeout waiting for Fib levels!")
+                except LevelBusError as e:
+                    safe_print(f"[POOL] [FAIL] TradingView failed, no orders placed: {e}")
+        finally:
+            pool.close()
+    
+    tv_thread.join()
+
+
+def run_parallel_shared() -> bool:
+    """
+    Parallel mode on ONE Chromium process.
+    The main thread launches the browser; each workflow thread attaches over
+    CDP with its own Playwright connection and its own isolated BrowserContext.
+    Returns: True if both workflows succeeded.
+    """
+    with sync_playwright() as playwright:
+        started = time.perf_counter()
+        browser, cdp_endpoint = launch_shared_browser(playwright)
+        print(f"[MAIN] Shared browser up in {time.perf_counter() - started:.2f}s ({cdp_endpoint})")
+        
+        try:
+            return run_parallel(cdp_endpoint)
+        finally:
+            browser.close()
 
 
-def run_sequential():
-    """Run MT5 first, then TradingView, then place orders (single browser)."""
+def run_sequential() -> bool:
+    """
+    Run MT5 first, then TradingView, then place orders (single browser).
+    Returns: True if both orders were placed.
+    """
     print("="*60)
     print("     GOLD TRADING RPA - SEQUENTIAL MODE")
     print("="*60)
@@ -205,16 +368,27 @@ def run_sequential():
             # Phase 1: MT5 Login
             mt5_success = login_to_mt5(page)
             
-            if mt5_success:
-                print("\n[OK] MT5 login complete. Proceeding to TradingView...")
+            if not mt5_success:
+                print("\n[FAIL] MT5 login failed")
+                return False
+            print("\n[OK] MT5 login complete. Proceeding to TradingView...")
+            if CONFIG["interactive"]:
                 input("\nPress Enter to continue to TradingView...")
             
             # Phase 2: TradingView
+            bar_feed = start_bar_capture(page)
+            legend_cell = start_legend_observer(page)
             navigate_to_tradingview(page)
-            load_symbol(page)
+            if not load_symbol(page):
+                print(f"\n[FAIL] {CONFIG['symbol']} not loaded on the chart, no orders placed")
+                return False
             set_timeframe(page)
             select_current_candle(page)
-            high, low = extract_prices(page)
+            high, low = extract_prices(page, bar_feed, legend_cell=legend_cell,
+                                       allow_manual=CONFIG["interactive"])
+            if high is None or low is None:
+                print("\n[FAIL] Could not read candle High/Low, no orders placed")
+                return False
             select_fib_tool(page)
             draw_fibonacci(page)
             configure_fib_levels(page)
@@ -229,17 +403,21 @@ def run_sequential():
             update_status(page, status, "")
             
             # Phase 3: Go back to MT5 and place orders
-            print("\n[MAIN] Press Enter to go back to MT5 and place orders...")
-            input()
+            if CONFIG["interactive"]:
+                print("\n[MAIN] Press Enter to go back to MT5 and place orders...")
+                input()
             
-            page.goto("https://mt5-6.xm-bz.com/terminal")
+            page.goto(CONFIG["mt5_url"])
             page.wait_for_load_state('networkidle')
             
             select_gold_symbol(page)
-            place_orders(page, levels)
+            buy_success, sell_success = place_orders(page, levels)
             
-            print("\n* Automation complete. Browser will remain open.")
-            page.pause()
+            if CONFIG["interactive"]:
+                print("\n* Automation complete. Browser will remain open.")
+                page.pause()
+            
+            return buy_success and sell_success
             
         finally:
             browser.close()
@@ -265,18 +443,60 @@ def run_mt5_only():
     return success
 
 
+def run_mt5_signal():
+    """MT5 only: candle, levels and orders in one browser, no TradingView."""
+    print("="*60)
+    print("GOLD TRADING RPA - MT5 SIGNAL (single browser)")
+    print("="*60)
+    
+    success, result = run_mt5_workflow(own_levels=True)
+    if not success:
+        print(f"\n[FAIL] {result}")
+    return success
+
+
 def main():
     """Main entry point with command line argument handling."""
     args = sys.argv[1:] if len(sys.argv) > 1 else []
     
+    try:
+        dispatch(args)
+    finally:
+        finish_trace()
+
+
+def dispatch(args: list):
+    """Run the mode selected on the command line."""
     if "--tv-only" in args:
         run_tradingview_only()
     elif "--mt5-only" in args:
         run_mt5_only()
     elif "--sequential" in args:
         run_sequential()
+    elif "--shared-browser" in args:
+        run_parallel_shared()
+    elif "--scan" in args:
+        from scanner import main as run_scanner
+        run_scanner()
+    elif "--async" in args:
+        from async_engine import run_async
+        run_async()
+    elif "--daemon" in args:
+        from daemon import run_daemon
+        run_daemon()
+    elif "--accounts" in args:
+        run_multi_account()
+    elif "--schedule" in args:
+        from scheduler import run_scheduler
+        run_scheduler()
+    elif "--mt5-signal" in args:
+        run_mt5_signal()
     elif "--help" in args or "-h" in args:
         print(__doc__)
+    elif CONFIG["signal_source"] == "mt5":
+        run_mt5_signal()
+    elif len(CONFIG["mt5_accounts"]) > 1:
+        run_multi_account()
     else:
         # Default: run in parallel with order placement
         run_parallel()
@@ -4,65 +4,120 @@ Handles authentication to MT5 trading platform.
 """
 
 from playwright.sync_api import Page
-import time
 
 from config import CONFIG
+from tracing import traced
+from browser import report_page_load
 from utils import update_status, create_status_overlay
+from waits import wait_for_login_form, wait_for_login_form_gone, wait_for_market_watch, get_timeout
+from session_cache import session_enabled, save_session_state, clear_session_state
 
 
-def login_to_mt5(page: Page) -> bool:
+# Shared with the async engine (async_engine.py)
+LOGIN_INPUT = 'input[name="login"]'
+PASSWORD_INPUT = 'input[name="password"]'
+MARKET_WATCH_SEARCH = "input[placeholder*='Search']"
+LOGIN_OR_MARKET_WATCH = f"{LOGIN_INPUT}, {MARKET_WATCH_SEARCH}"
+
+
+def account_settings(account: dict = None) -> dict:
+    """
+    URL, credentials and session name for an account.
+    account: optional entry of CONFIG["mt5_accounts"]; defaults to the
+    single mt5_login / mt5_password.
+    Returns: {"url", "login", "password", "name"}
+    """
+    account = account or {}
+    return {
+        "url": account.get("url") or CONFIG["mt5_url"],
+        "login": account.get("login") or CONFIG["mt5_login"],
+        "password": account.get("password") or CONFIG["mt5_password"],
+        "name": account.get("name"),
+    }
+
+
+def reuse_saved_session(logged_in: bool, name: str = None) -> bool:
+    """
+    Decide on a saved session once the terminal has loaded.
+    Returns: True to skip the login form; an expired session file is
+    deleted so the fresh login replaces it.
+    """
+    if logged_in:
+        print("[MT5] [OK] Saved session valid, skipping login form")
+        return True
+    clear_session_state(name)
+    return False
+
+
+@traced()
+def login_to_mt5(page: Page, account: dict = None) -> bool:
     """
     Login to MT5 Web Terminal.
+    account: optional entry of CONFIG["mt5_accounts"] ({"name", "login",
+    "password", "url"}); defaults to the single mt5_login / mt5_password.
     
     Returns: True if login successful, False otherwise.
     """
-    url = CONFIG["mt5_url"]
-    login = CONFIG["mt5_login"]
-    password = CONFIG["mt5_password"]
+    settings = account_settings(account)
+    url, login, password, name = settings["url"], settings["login"], settings["password"], settings["name"]
     
     print("\n" + "="*60)
     print("MT5 WEB TERMINAL LOGIN")
     print("="*60)
     
     print(f"\n[MT5] Navigating to {url}...")
-    page.goto(url)
+    page.goto(url, wait_until="domcontentloaded")
+    
+    # Saved session: skip the login form if the terminal is already open
+    if session_enabled() and reuse_saved_session(is_mt5_logged_in(page), name):
+        report_page_load(page, "MT5")
+        return True
     
     try:
         # Wait for login form
         print("[MT5] Waiting for login form...")
-        page.wait_for_selector('input[name="login"]', timeout=30000)
+        if not wait_for_login_form(page):
+            raise TimeoutError("login form did not appear")
         
         # Fill credentials
         print("[MT5] Filling credentials...")
-        page.fill('input[name="login"]', login)
-        page.fill('input[name="password"]', password)
+        page.fill(LOGIN_INPUT, login)
+        page.fill(PASSWORD_INPUT, password)
         
         # Submit form
-        page.press('input[name="password"]', 'Enter')
+        page.press(PASSWORD_INPUT, 'Enter')
         print("[MT5] Submitted login form...")
         
-        # Wait for login to complete
+        # Wait for login to complete: form detaches, Market Watch renders
         print("[MT5] Waiting for login to complete...")
-        time.sleep(10)
+        if not wait_for_login_form_gone(page):
+            raise TimeoutError("login form still present after submit")
+        wait_for_market_watch(page)
+        save_session_state(page.context, name)
         
         # Take verification screenshot
-        page.screenshot(path="login_result.png")
-        print("[MT5] Screenshot saved to login_result.png")
+        screenshot = f"login_result_{name}.png" if name else "login_result.png"
+        page.screenshot(path=screenshot)
+        print(f"[MT5] Screenshot saved to {screenshot}")
         print("[MT5] [OK] Login completed!")
+        report_page_load(page, "MT5")
         
         return True
         
     except Exception as e:
         print(f"[MT5] [FAIL] Login error: {e}")
-        page.screenshot(path="login_error.png")
+        page.screenshot(path=f"login_error_{name}.png" if name else "login_error.png")
         return False
 
 
 def is_mt5_logged_in(page: Page) -> bool:
-    """Check if already logged into MT5."""
+    """
+    Check if already logged into MT5.
+    Waits for whichever renders first: the login form or Market Watch.
+    """
     try:
-        # If login form is not visible, we might be logged in
-        page.wait_for_selector('input[name="login"]', timeout=3000)
-        return False  # Login form visible = not logged in
+        page.wait_for_selector(LOGIN_OR_MARKET_WATCH, state="visible", timeout=get_timeout("login_form"))
+        # Login form visible = not logged in
+        return page.locator(LOGIN_INPUT).count() == 0
     except:
-        return True  # No login form = probably logged in
+        return False
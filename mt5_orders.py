@@ -10,50 +10,174 @@ Fixed issues:
 """
 
 from playwright.sync_api import Page
+import threading
 import time
-import os
 
 from config import CONFIG
+from tracing import traced, span
+from waits import get_timeout
+from mt5_login import login_to_mt5, is_mt5_logged_in
+from selector_cache import run_cascade, print_selector_stats
+from screenshots import capture_screenshot, flush_screenshots
+from order_book import attach_order_book, get_order_book, wait_for_order
+from fib_calculator import calculate_trade_prices
 
 
-def take_debug_screenshot(page: Page, name: str):
-    """Take a screenshot for debugging."""
-    screenshot_path = os.path.join(os.path.dirname(__file__), f"debug_{name}.png")
-    page.screenshot(path=screenshot_path)
-    print(f"[MT5] Screenshot saved: {screenshot_path}")
-    return screenshot_path
+# Native <select> values: 0=Market, 2=BuyLimit, 3=SellLimit, 4=BuyStop, 5=SellStop
+ORDER_TYPE_VALUES = {
+    "Market Execution": "0", "Buy Limit": "2", "Sell Limit": "3",
+    "Buy Stop": "4", "Sell Stop": "5", "Buy Stop Limit": "6", "Sell Stop Limit": "7"
+}
+
+# Selector fallbacks, tried in order
+CLOSE_DIALOG_SELECTORS = ["text='OK'", "text='Done'", "text='Close'", "button:has-text('OK')"]
+CLOSE_X_SELECTOR = "[class*='close'], .close-button, button[aria-label='Close']"
+NEW_ORDER_SELECTORS = [
+    "button:has-text('New Order')",
+    "text='New Order'",
+    "[class*='new-order']",
+    "a:has-text('Create New Order')",
+]
+BUY_BUTTON_SELECTORS = [
+    "button:has-text('Buy')",
+    "[class*='buy'] button",
+    "button[class*='buy']",
+    "div[class*='buy']",
+    "text='Buy by Market'",
+    "text='Buy'",
+]
+SELL_BUTTON_SELECTORS = [
+    "button:has-text('Sell')",
+    "[class*='sell'] button",
+    "button[class*='sell']",
+    "div[class*='sell']",
+    "text='Sell by Market'",
+    "text='Sell'",
+]
+VOLUME_LABELS = ["Volume", "Lot", "Lots"]
+SL_LABELS = ["Stop Loss", "S/L", "SL"]
+TP_LABELS = ["Take Profit", "T/P", "TP"]
+VOLUME_PLACEHOLDER_SELECTOR = "input[placeholder*='olume'], input[placeholder*='lot']"
+SUCCESS_TEXTS = ["Done", "Order placed", "Successfully", "executed"]
+ERROR_TEXTS = ["Not enough money", "Invalid", "Error", "Failed", "rejected"]
+NEW_ORDER_TRIGGERS = ["text='Create New Order'"] + NEW_ORDER_SELECTORS
+# Whichever confirmation or error text renders first
+OUTCOME_SELECTOR = ", ".join(f"text='{t}'" for t in SUCCESS_TEXTS + ERROR_TEXTS)
+
+# Order timing, kept per thread: each MT5 page is driven by one thread, and
+# account workers (account_pool.py) place orders concurrently
+_order_times = threading.local()
+
+
+def submitted_at() -> dict:
+    """Order type -> wall-clock time of its last Buy/Sell click on this thread (order went live)."""
+    if not hasattr(_order_times, "submitted"):
+        _order_times.submitted = {}
+    return _order_times.submitted
+
+
+def order_stamps() -> dict:
+    """(order type, stage) -> time.monotonic() of the last "form_filled" / "order_confirmed" on this thread."""
+    if not hasattr(_order_times, "stamps"):
+        _order_times.stamps = {}
+    return _order_times.stamps
+
+# Fills type/volume/SL/TP in one evaluate and reads the form back.
+# Values go through the native setters so framework-bound inputs see the
+# change, followed by input/change/blur events.
+FILL_ORDER_FORM_JS = """
+(order) => {
+    const setValue = (el, value) => {
+        const proto = el.tagName === 'SELECT' ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+        for (const type of ['input', 'change', 'blur']) {
+            el.dispatchEvent(new Event(type, { bubbles: true }));
+        }
+    };
+    const byLabel = (labels) => {
+        for (const label of labels) {
+            const found = document.evaluate(`//*[normalize-space(text())='${label}']`, document, null,
+                                            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (!found) continue;
+            const input = (found.parentElement && found.parentElement.querySelector('input')) ||
+                document.evaluate('following::input[1]', found, null,
+                                  XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (input) return { label, input };
+        }
+        return null;
+    };
+
+    const result = { type: null, type_text: null, missing: [] };
+    const select = document.querySelector('select');
+    if (select) {
+        setValue(select, order.type);
+        result.type = select.value;
+        result.type_text = select.selectedIndex >= 0 ? select.options[select.selectedIndex].text : null;
+    } else {
+        result.missing.push('type');
+    }
+
+    for (const field of ['volume', 'sl', 'tp']) {
+        let match = byLabel(order.labels[field]);
+        if (!match && field === 'volume') {
+            const input = document.querySelector(order.volume_placeholder);
+            if (input) match = { label: 'placeholder', input };
+        }
+        if (!match) {
+            result[field] = null;
+            result.missing.push(field);
+            continue;
+        }
+        setValue(match.input, order[field]);
+        result[field] = match.input.value;
+        result[field + '_label'] = match.label;
+    }
+    return result;
+}
+"""
+
+
+def take_debug_screenshot(page: Page, name: str, order_path: bool = False):
+    """
+    Capture a debug frame into the in-memory ring (written only on failure/flush).
+    order_path: frame between levels arriving and the last submit click ("always" mode only).
+    """
+    return capture_screenshot(page, name, order_path)
+
+
+def click_first_visible(page: Page, selector: str, max_nth: int = 1, dblclick: bool = False) -> bool:
+    """Click the first visible match of a selector (checks up to max_nth matches)."""
+    btn = page.locator(selector)
+    for i in range(min(btn.count(), max_nth)):
+        if btn.nth(i).is_visible():
+            if dblclick:
+                btn.nth(i).dblclick()
+            else:
+                btn.nth(i).click()
+            return True
+    return False
 
 
 def close_any_dialogs(page: Page):
     """Close any open dialogs/popups."""
-    try:
-        # Close OK/Done dialogs
-        close_buttons = ["text='OK'", "text='Done'", "text='Close'", "button:has-text('OK')"]
-        for selector in close_buttons:
-            btn = page.locator(selector)
-            if btn.count() > 0 and btn.first.is_visible():
-                btn.first.click()
-                page.wait_for_timeout(500)
-                print("[MT5] Closed dialog")
-                return True
-        
-        # Try clicking X button
-        x_btn = page.locator("[class*='close'], .close-button, button[aria-label='Close']")
-        if x_btn.count() > 0 and x_btn.first.is_visible():
-            x_btn.first.click()
-            page.wait_for_timeout(500)
-            return True
-            
-    except:
-        pass
+    # OK/Done dialogs first, then the X button
+    strategies = [(sel, lambda sel=sel: click_first_visible(page, sel))
+                  for sel in CLOSE_DIALOG_SELECTORS + [CLOSE_X_SELECTOR]]
+    
+    if run_cascade(page, "close_dialog", strategies):
+        page.wait_for_timeout(500)
+        print("[MT5] Closed dialog")
+        return True
     return False
 
 
-def select_gold_symbol(page: Page) -> bool:
+@traced()
+def select_gold_symbol(page: Page, order_path: bool = False) -> bool:
     """
     Select GOLD.i# symbol in MT5 by searching for it.
     Uses the "Search symbol" input box in the right panel.
     MUST be called before EACH order to ensure correct symbol.
+    order_path: called while placing orders (debug frames only in "always" mode).
     """
     symbol = CONFIG["mt5_symbol"]  # "GOLD.i#"
     print(f"\n[MT5] Selecting {symbol} symbol...")
@@ -77,7 +201,7 @@ def select_gold_symbol(page: Page) -> bool:
             search_box.first.fill("GOLD.i#")
             page.wait_for_timeout(2000)  # Wait for search results
             
-            take_debug_screenshot(page, "02_search_results")
+            take_debug_screenshot(page, "02_search_results", order_path)
             
             # Look for EXACT match first - GOLD.i# specifically
             # Use more specific selector to avoid matching GOLDSACHS, GOLDOCEAN etc
@@ -86,7 +210,7 @@ def select_gold_symbol(page: Page) -> bool:
                 gold_exact.first.click()
                 page.wait_for_timeout(1000)
                 print(f"[MT5] [OK] Selected GOLD.i# (exact match)")
-                take_debug_screenshot(page, "03_symbol_selected")
+                take_debug_screenshot(page, "03_symbol_selected", order_path)
                 return True
             
             # Try with just "GOLD" if exact match fails
@@ -128,6 +252,7 @@ def select_gold_symbol(page: Page) -> bool:
 
 
 
+@traced("order.open_form")
 def open_new_order_form(page: Page) -> bool:
     """
     Open the new order form by clicking "Create New Order" button.
@@ -139,48 +264,23 @@ def open_new_order_form(page: Page) -> bool:
     close_any_dialogs(page)
     page.wait_for_timeout(500)
     
-    try:
-        # Primary method: Click "Create New Order" button
-        create_order_btn = page.locator("text='Create New Order'")
-        
-        if create_order_btn.count() > 0 and create_order_btn.first.is_visible():
-            create_order_btn.click()
-            page.wait_for_timeout(2000)
-            print("[MT5] [OK] Clicked 'Create New Order' button")
-            take_debug_screenshot(page, "04_order_form_open")
-            return True
-        
-        # Fallback: Try variations
-        variations = [
-            "button:has-text('New Order')",
-            "text='New Order'",
-            "[class*='new-order']",
-            "a:has-text('Create New Order')",
-        ]
-        
-        for selector in variations:
-            btn = page.locator(selector)
-            if btn.count() > 0 and btn.first.is_visible():
-                btn.first.click()
-                page.wait_for_timeout(2000)
-                print(f"[MT5] [OK] Opened order form via: {selector}")
-                return True
-        
-        # Last resort: Double-click on symbol to open order
-        print("[MT5] Trying double-click on symbol...")
-        symbol = CONFIG["mt5_symbol"]
-        symbol_el = page.locator(f"text='{symbol}'")
-        if symbol_el.count() > 0:
-            symbol_el.first.dblclick()
-            page.wait_for_timeout(2000)
-            return True
-            
-        print("[MT5] [WARN] Could not open order form")
-        return False
-        
-    except Exception as e:
-        print(f"[MT5] Order form error: {str(e)[:60]}")
-        return False
+    # Primary: "Create New Order" button, then variations,
+    # last resort: double-click on the symbol
+    symbol = CONFIG["mt5_symbol"]
+    strategies = [(sel, lambda sel=sel: click_first_visible(page, sel))
+                  for sel in NEW_ORDER_TRIGGERS]
+    strategies.append(("dblclick-symbol",
+                       lambda: click_first_visible(page, f"text='{symbol}'", dblclick=True)))
+    
+    used = run_cascade(page, "new_order_trigger", strategies)
+    if used:
+        page.wait_for_timeout(2000)
+        print(f"[MT5] [OK] Opened order form via: {used}")
+        take_debug_screenshot(page, "04_order_form_open", order_path=True)
+        return True
+    
+    print("[MT5] [WARN] Could not open order form")
+    return False
 
 
 def select_order_type(page: Page, order_type: str) -> bool:
@@ -192,12 +292,7 @@ def select_order_type(page: Page, order_type: str) -> bool:
     """
     print(f"[MT5] Selecting order type: {order_type}...")
     
-    value_map = {
-        "Market Execution": "0", "Buy Limit": "2", "Sell Limit": "3",
-        "Buy Stop": "4", "Sell Stop": "5", "Buy Stop Limit": "6", "Sell Stop Limit": "7"
-    }
-    
-    val = value_map.get(order_type)
+    val = ORDER_TYPE_VALUES.get(order_type)
     if not val:
         print(f"  [ERROR] Unknown order type: {order_type}")
         return False
@@ -235,38 +330,47 @@ def select_order_type(page: Page, order_type: str) -> bool:
         return False
 
 
-def fill_input_by_label(page: Page, labels: list, value: float) -> bool:
+def fill_via_parent(page: Page, label: str, value_str: str) -> bool:
+    """Fill the input in the same row/container as the label."""
+    label_el = page.locator(f"text='{label}'")
+    if label_el.count() == 0:
+        return False
+    input_el = label_el.first.locator("xpath=ancestor::*[1]").locator("input")
+    if input_el.count() == 0:
+        return False
+    input_el.first.fill(value_str)
+    return True
+
+
+def fill_via_following(page: Page, label: str, value_str: str) -> bool:
+    """Fill the first input following the label."""
+    label_el = page.locator(f"text='{label}'")
+    if label_el.count() == 0:
+        return False
+    input_el = label_el.first.locator("xpath=following::input[1]")
+    if input_el.count() == 0:
+        return False
+    input_el.fill(value_str)
+    return True
+
+
+def fill_input_by_label(page: Page, labels: list, value: float, target: str = None) -> bool:
     """
     Fill an input field by finding it near a label.
     Tries multiple label variations.
+    target: logical name for the selector cache (defaults to the first label).
     """
     value_str = str(round(value, 2))
     
+    strategies = []
     for label in labels:
-        try:
-            # Method 1: Find input following the label text
-            label_el = page.locator(f"text='{label}'")
-            if label_el.count() > 0:
-                # Try to find input in the same row/container
-                parent = label_el.first.locator("xpath=ancestor::*[1]")
-                input_el = parent.locator("input")
-                if input_el.count() > 0:
-                    print(f"[MT5] Filling {label} input...")
-                    input_el.first.fill(value_str)
-                    print(f"[MT5] [OK] Set {label} = {value_str}")
-                    return True
-                
-                # Try xpath following sibling
-                input_el = label_el.first.locator("xpath=following::input[1]")
-                if input_el.count() > 0:
-                    print(f"[MT5] Filling {label} input (sibling)...")
-                    input_el.fill(value_str)
-                    print(f"[MT5] [OK] Set {label} = {value_str}")
-                    return True
-                    
-        except Exception as e:
-            continue
+        strategies.append((f"{label}|parent", lambda label=label: fill_via_parent(page, label, value_str)))
+        strategies.append((f"{label}|following", lambda label=label: fill_via_following(page, label, value_str)))
     
+    used = run_cascade(page, target or f"{labels[0]} input", strategies)
+    if used:
+        print(f"[MT5] [OK] Set {used.split('|')[0]} = {value_str}")
+        return True
     return False
 
 
@@ -278,10 +382,10 @@ def fill_order_form(page: Page, volume: float, sl_price: float, tp_price: float)
     
     # Set Volume/Lot
     print(f"[MT5] Setting volume: {volume}...")
-    vol_set = fill_input_by_label(page, ["Volume", "Lot", "Lots"], volume)
+    vol_set = fill_input_by_label(page, VOLUME_LABELS, volume, "volume_input")
     if not vol_set:
         # Try finding by placeholder
-        vol_input = page.locator("input[placeholder*='olume'], input[placeholder*='lot']")
+        vol_input = page.locator(VOLUME_PLACEHOLDER_SELECTOR)
         if vol_input.count() > 0:
             vol_input.first.fill(str(volume))
             print(f"[MT5] [OK] Set Volume = {volume}")
@@ -291,101 +395,204 @@ def fill_order_form(page: Page, volume: float, sl_price: float, tp_price: float)
     
     # Set Stop Loss
     print(f"[MT5] Setting Stop Loss: {sl_price:.2f}...")
-    sl_set = fill_input_by_label(page, ["Stop Loss", "S/L", "SL"], sl_price)
+    sl_set = fill_input_by_label(page, SL_LABELS, sl_price, "sl_input")
     if not sl_set:
         print(f"[MT5] [WARN] Could not set Stop Loss")
     
     # Set Take Profit
     print(f"[MT5] Setting Take Profit: {tp_price:.2f}...")
-    tp_set = fill_input_by_label(page, ["Take Profit", "T/P", "TP"], tp_price)
+    tp_set = fill_input_by_label(page, TP_LABELS, tp_price, "tp_input")
     if not tp_set:
         print(f"[MT5] [WARN] Could not set Take Profit")
     
     return success
 
 
-def click_order_button(page: Page, order_type: str) -> bool:
+def order_form_payload(order_type: str, volume: float, sl_price: float, tp_price: float) -> dict:
+    """Order intent in the shape FILL_ORDER_FORM_JS expects."""
+    return {
+        "type": ORDER_TYPE_VALUES[order_type],
+        "volume": str(volume),
+        "sl": str(round(sl_price, 2)),
+        "tp": str(round(tp_price, 2)),
+        "labels": {"volume": VOLUME_LABELS, "sl": SL_LABELS, "tp": TP_LABELS},
+        "volume_placeholder": VOLUME_PLACEHOLDER_SELECTOR,
+    }
+
+
+def check_form_readback(readback: dict, payload: dict) -> list:
+    """
+    Compare the form readback with what was requested.
+    Returns: list of fields that are missing or hold a different value.
+    """
+    wrong = list(readback.get("missing", []))
+    for field in ("type", "volume", "sl", "tp"):
+        if field in wrong:
+            continue
+        try:
+            if float(readback[field]) != float(payload[field]):
+                wrong.append(field)
+        except (TypeError, ValueError):
+            wrong.append(field)
+    return wrong
+
+
+def fill_order_form_js(page: Page, order_type: str, volume: float, sl_price: float, tp_price: float) -> dict:
+    """
+    Set order type, volume, SL and TP in a single page.evaluate.
+    Returns: readback of the form (type, type_text, volume, sl, tp, missing, wrong).
+    """
+    payload = order_form_payload(order_type, volume, sl_price, tp_price)
+    readback = page.evaluate(FILL_ORDER_FORM_JS, payload)
+    readback["wrong"] = check_form_readback(readback, payload)
+    print(f"[MT5] Form readback: type={readback['type_text']} volume={readback['volume']} "
+          f"SL={readback['sl']} TP={readback['tp']}")
+    return readback
+
+
+def order_button_selectors(order_type: str) -> list:
+    """Buy or Sell button fallbacks for an order type."""
+    return BUY_BUTTON_SELECTORS if "Buy" in order_type else SELL_BUTTON_SELECTORS
+
+
+def order_outcome(text: str) -> bool:
+    """
+    Classify a confirmation dialog text.
+    Returns: True (confirmed), False (error) or None (neither; not confirmed).
+    """
+    text = (text or "").strip()
+    if text in SUCCESS_TEXTS:
+        return True
+    if text in ERROR_TEXTS:
+        return False
+    return None
+
+
+@traced("order.submit")
+def click_order_button(page: Page, order_type: str, settle_ms: int = 2000) -> bool:
     """
     Click the appropriate order button (Buy/Sell).
     MT5 Web has separate Buy and Sell buttons in the order form.
+    settle_ms: wait after the click (0 when another page submits right after).
     """
     print(f"[MT5] Clicking order button for {order_type}...")
     
-    is_buy = "Buy" in order_type
+    # Buy buttons are typically blue/green, Sell buttons red
+    side = "Buy" if "Buy" in order_type else "Sell"
+    selectors = order_button_selectors(order_type)
+    strategies = [(sel, lambda sel=sel: click_first_visible(page, sel, max_nth=3))
+                  for sel in selectors]
+    
+    if run_cascade(page, f"{side.lower()}_button", strategies):
+        submitted_at()[order_type] = time.time()
+        page.wait_for_timeout(settle_ms)
+        print(f"[MT5] [OK] Clicked {side} button")
+        return True
     
+    print("[MT5] [WARN] Could not find order button")
+    return False
+
+
+def order_book_live(page: Page) -> bool:
+    """True if the page's orders table is indexed (order_book.py)."""
+    book = get_order_book(page)
+    return book is not None and book.live
+
+
+def verify_order_placed(page: Page, order_type: str = None) -> bool:
+    """
+    Verify the order was placed: look it up in the page's orders table index
+    (type, symbol, volume, SL and TP must match a row added after the click).
+    Falls back to confirmation texts if the table is not indexed.
+    """
+    if order_type and order_book_live(page):
+        row = wait_for_order(page, get_order_book(page), order_type)
+        if row is None:
+            print(f"[MT5] [FAIL] {order_type} not in the orders table")
+            return False
+        print(f"[MT5] [OK] Order confirmed: #{row['ticket']} {row.get('type', '')} "
+              f"{row.get('volume', '')} SL={row.get('sl', '')} TP={row.get('tp', '')}")
+        return True
+    return verify_by_text(page)
+
+
+def verify_by_text(page: Page) -> bool:
+    """
+    Verify the order by its confirmation or error text (order_outcome).
+    No text within the dialog timeout means the order is not confirmed.
+    """
+    outcome = page.locator(OUTCOME_SELECTOR).first
     try:
-        if is_buy:
-            # Look for Buy button - typically blue/green
-            buy_selectors = [
-                "button:has-text('Buy')",
-                "[class*='buy'] button",
-                "button[class*='buy']",
-                "div[class*='buy']",
-                "text='Buy by Market'",
-                "text='Buy'",
-            ]
-            for sel in buy_selectors:
-                btn = page.locator(sel)
-                if btn.count() > 0:
-                    # Filter for visible button
-                    for i in range(min(btn.count(), 3)):
-                        if btn.nth(i).is_visible():
-                            btn.nth(i).click()
-                            page.wait_for_timeout(2000)
-                            print(f"[MT5] [OK] Clicked Buy button")
-                            return True
-        else:
-            # Look for Sell button - typically red
-            sell_selectors = [
-                "button:has-text('Sell')",
-                "[class*='sell'] button",
-                "button[class*='sell']",
-                "div[class*='sell']",
-                "text='Sell by Market'",
-                "text='Sell'",
-            ]
-            for sel in sell_selectors:
-                btn = page.locator(sel)
-                if btn.count() > 0:
-                    for i in range(min(btn.count(), 3)):
-                        if btn.nth(i).is_visible():
-                            btn.nth(i).click()
-                            page.wait_for_timeout(2000)
-                            print(f"[MT5] [OK] Clicked Sell button")
-                            return True
-        
-        print("[MT5] [WARN] Could not find order button")
-        return False
-        
-    except Exception as e:
-        print(f"[MT5] Button click error: {str(e)[:50]}")
+        outcome.wait_for(state="visible", timeout=get_timeout("dialog"))
+        text = (outcome.text_content() or "").strip()
+    except Exception:
+        print("[MT5] [FAIL] No order confirmation within the timeout")
         return False
+    if order_outcome(text):
+        print(f"[MT5] [OK] Order confirmed: {text}")
+        return True
+    print(f"[MT5] [FAIL] Order error: {text}")
+    return False
 
 
-def verify_order_placed(page: Page) -> bool:
+def prepare_order(page: Page, order_type: str, tp_price: float, sl_price: float, volume: float) -> None:
     """
-    Verify if order was placed successfully by checking for confirmation.
+    Open the order form and fill it, stopping just before submit.
     """
-    try:
-        # Check for success indicators
-        success_texts = ["Done", "Order placed", "Successfully", "executed"]
-        for text in success_texts:
-            if page.locator(f"text='{text}'").count() > 0:
-                print(f"[MT5] [OK] Order confirmed: {text}")
-                return True
-        
-        # Check for error indicators
-        error_texts = ["Not enough money", "Invalid", "Error", "Failed", "rejected"]
-        for text in error_texts:
-            if page.locator(f"text='{text}'").count() > 0:
-                print(f"[MT5] [FAIL] Order error: {text}")
-                return False
+    if CONFIG["use_order_book"]:
+        attach_order_book(page).expect(order_type, volume, sl_price, tp_price)
+    
+    # Step 1: Open new order form
+    if not open_new_order_form(page):
+        print("[MT5] [WARN] Could not confirm order form opened")
+    
+    page.wait_for_timeout(1000)
+    
+    with span("order.fill", order_type=order_type):
+        # Steps 2+3: one round-trip for type, volume, SL and TP
+        readback = None
+        if CONFIG["mt5_js_form_fill"]:
+            try:
+                page.locator("select").first.wait_for(state="visible", timeout=get_timeout("dialog"))
+                readback = fill_order_form_js(page, order_type, volume, sl_price, tp_price)
+                if readback["wrong"]:
+                    print(f"[MT5] [WARN] Fast fill incomplete ({', '.join(readback['wrong'])}), using step-by-step fill")
+            except Exception as e:
+                print(f"[MT5] [WARN] Fast fill failed ({str(e)[:60]}), using step-by-step fill")
         
-        # If no clear indicator, consider it placed
-        return True
+        if readback is None or readback["wrong"]:
+            # Step 2: Try to select order type (may not work on all MT5 versions)
+            select_order_type(page, order_type)
+            page.wait_for_timeout(500)
         
-    except:
-        return True
+            # Step 3: Fill the form
+            fill_order_form(page, volume, sl_price, tp_price)
+            page.wait_for_timeout(500)
+    order_stamps()[(order_type, "form_filled")] = time.monotonic()
+    
+    # Screenshot before submit: "always" mode only; ring mode relies on the
+    # frame place_orders takes once both orders are submitted
+    take_debug_screenshot(page, f"{order_type.replace(' ', '_')}_before_submit", order_path=True)
+
+
+@traced("order.verify")
+def finish_order(page: Page, order_type: str) -> bool:
+    """
+    After submit: verify the result and close the confirmation dialog.
+    """
+    # Step 5: Verify (waits for the order row or confirmation text) and close confirmation
+    success = verify_order_placed(page, order_type)
+    # The other order may still be waiting for its click: ring mode relies on
+    # the frame place_orders takes once both are submitted
+    take_debug_screenshot(page, f"{order_type.replace(' ', '_')}_after_submit", order_path=True)
+    if success:
+        order_stamps()[(order_type, "order_confirmed")] = time.monotonic()
+    
+    # Close any confirmation dialog
+    close_any_dialogs(page)
+    page.wait_for_timeout(500)
+    
+    return success
 
 
 def place_single_order(page: Page, order_type: str, tp_price: float, sl_price: float, volume: float) -> bool:
@@ -400,54 +607,42 @@ def place_single_order(page: Page, order_type: str, tp_price: float, sl_price: f
     print(f"  Volume: {volume}")
     
     try:
-        # Step 1: Open new order form
-        if not open_new_order_form(page):
-            print("[MT5] [WARN] Could not confirm order form opened")
-        
-        page.wait_for_timeout(1000)
-        
-        # Step 2: Try to select order type (may not work on all MT5 versions)
-        select_order_type(page, order_type)
-        page.wait_for_timeout(500)
-        
-        # Step 3: Fill the form
-        fill_order_form(page, volume, sl_price, tp_price)
-        page.wait_for_timeout(500)
-        
-        # Take screenshot before submit
-        take_debug_screenshot(page, f"{order_type.replace(' ', '_')}_before_submit")
-        
-        # Step 4: Click the order button
-        clicked = click_order_button(page, order_type)
-        
-        if clicked:
-            page.wait_for_timeout(2000)
-            take_debug_screenshot(page, f"{order_type.replace(' ', '_')}_after_submit")
+        with span("place_single_order", order_type=order_type):
+            prepare_order(page, order_type, tp_price, sl_price, volume)
             
-            # Step 5: Verify and close confirmation
-            success = verify_order_placed(page)
+            # Step 4: Click the order button (the index waits for the order itself)
+            clicked = click_order_button(page, order_type, settle_ms=0 if order_book_live(page) else 2000)
             
-            # Close any confirmation dialog
-            close_any_dialogs(page)
-            page.wait_for_timeout(500)
+            if clicked:
+                return finish_order(page, order_type)
             
-            return success
-        
-        return False
+            return False
         
     except Exception as e:
         print(f"[MT5] Order placement error: {str(e)[:60]}")
         take_debug_screenshot(page, f"{order_type.replace(' ', '_')}_error")
+        flush_screenshots(f"{order_type} error")
         return False
 
 
+def buy_stop_prices(fib_levels: dict) -> tuple:
+    """Buy Stop TP / SL at CONFIG["buy_stop"] levels (same maths as the backtest). Returns: (tp, sl)"""
+    prices = calculate_trade_prices(fib_levels)
+    return prices["buy_tp"], prices["buy_sl"]
+
+
+def sell_stop_prices(fib_levels: dict) -> tuple:
+    """Sell Stop TP / SL at CONFIG["sell_stop"] levels (same maths as the backtest). Returns: (tp, sl)"""
+    prices = calculate_trade_prices(fib_levels)
+    return prices["sell_tp"], prices["sell_sl"]
+
+
 def place_buy_stop(page: Page, fib_levels: dict) -> bool:
     """
     Place a Buy Stop order.
-    TP = 1.5 level, SL = 0.5 level
+    TP / SL from CONFIG["buy_stop"] (default TP = 1.5 level, SL = 0.5 level)
     """
-    tp_price = fib_levels["1.5 (Above/Green)"]
-    sl_price = fib_levels["0.5 (Entry/Red)"]
+    tp_price, sl_price = buy_stop_prices(fib_levels)
     volume = CONFIG["mt5_lot_size"]
     
     return place_single_order(page, "Buy Stop", tp_price, sl_price, volume)
@@ -456,18 +651,90 @@ def place_buy_stop(page: Page, fib_levels: dict) -> bool:
 def place_sell_stop(page: Page, fib_levels: dict) -> bool:
     """
     Place a Sell Stop order.
-    TP = -0.5 level, SL = 0.5 level
+    TP / SL from CONFIG["sell_stop"] (default TP = -0.5 level, SL = 0.5 level)
     """
-    tp_price = fib_levels["-0.5 (Below/Green)"]
-    sl_price = fib_levels["0.5 (Entry/Red)"]
+    tp_price, sl_price = sell_stop_prices(fib_levels)
     volume = CONFIG["mt5_lot_size"]
     
     return place_single_order(page, "Sell Stop", tp_price, sl_price, volume)
 
 
-def place_orders(page: Page, fib_levels: dict) -> tuple:
+def open_sell_page(page: Page, account: dict = None) -> Page:
+    """
+    Open a second MT5 page in the same logged-in context for the Sell Stop.
+    Each page keeps its own symbol focus, so no re-selection is needed
+    between orders. Call it ahead of time (e.g. while waiting for levels).
+    account: the CONFIG["mt5_accounts"] entry the page belongs to, if any.
+    """
+    print("\n[MT5] Opening second page for Sell Stop...")
+    sell_page = page.context.new_page()
+    sell_page.goto((account or {}).get("url") or CONFIG["mt5_url"], wait_until="domcontentloaded")
+    
+    if not is_mt5_logged_in(sell_page):
+        login_to_mt5(sell_page, account)
+    
+    select_gold_symbol(sell_page)
+    return sell_page
+
+
+def print_order_summary(buy_success: bool, sell_success: bool) -> None:
+    """Print the order placement summary."""
+    print("\n" + "="*50)
+    print("[MT5] ORDER PLACEMENT SUMMARY")
+    print("="*50)
+    print(f"  Buy Stop:  {'[OK] Placed' if buy_success else '[FAIL]'}")
+    print(f"  Sell Stop: {'[OK] Placed' if sell_success else '[FAIL]'}")
+    print_selector_stats()
+    print("="*50)
+    if not (buy_success and sell_success):
+        flush_screenshots("order failed")
+
+
+def place_orders_dual_page(buy_page: Page, sell_page: Page, fib_levels: dict) -> tuple:
+    """
+    Place Buy Stop and Sell Stop on two pages of the same MT5 context.
+    Both forms are filled first, then submitted back to back, so the two
+    orders go live within one click of each other.
+    Returns: (buy_success, sell_success)
+    """
+    volume = CONFIG["mt5_lot_size"]
+    buy_tp, buy_sl = buy_stop_prices(fib_levels)
+    sell_tp, sell_sl = sell_stop_prices(fib_levels)
+    
+    # Phase 1: fill both forms (lockstep on this thread)
+    ready = {}
+    for page, order_type, tp, sl in ((buy_page, "Buy Stop", buy_tp, buy_sl),
+                                     (sell_page, "Sell Stop", sell_tp, sell_sl)):
+        try:
+            prepare_order(page, order_type, tp, sl, volume)
+            ready[order_type] = True
+        except Exception as e:
+            print(f"[MT5] {order_type} preparation error: {str(e)[:60]}")
+            take_debug_screenshot(page, f"{order_type.replace(' ', '_')}_error")
+            ready[order_type] = False
+    
+    # Phase 2: submit both with no settle wait in between
+    started = time.perf_counter()
+    buy_clicked = ready["Buy Stop"] and click_order_button(buy_page, "Buy Stop", settle_ms=0)
+    buy_live = time.perf_counter()
+    sell_clicked = ready["Sell Stop"] and click_order_button(sell_page, "Sell Stop", settle_ms=0)
+    sell_live = time.perf_counter()
+    if buy_clicked and sell_clicked:
+        print(f"[MT5] Orders submitted {(sell_live - buy_live) * 1000:.0f} ms apart "
+              f"({(sell_live - started) * 1000:.0f} ms for both)")
+    
+    # Phase 3: verify both
+    buy_success = buy_clicked and finish_order(buy_page, "Buy Stop")
+    sell_success = sell_clicked and finish_order(sell_page, "Sell Stop")
+    return buy_success, sell_success
+
+
+@traced()
+def place_orders(page: Page, fib_levels: dict, sell_page: Page = None) -> tuple:
     """
     Place both Buy Stop and Sell Stop orders.
+    sell_page: optional second page from open_sell_page(); if given, both
+    orders are placed in dual-page mode (no symbol re-selection between them).
     Returns: (buy_success, sell_success)
     """
     print("\n[MT5] Starting order placement...")
@@ -475,12 +742,20 @@ def place_orders(page: Page, fib_levels: dict) -> tuple:
     for level, price in fib_levels.items():
         print(f"  {level}: {price:.2f}")
     
+    if sell_page is not None:
+        buy_success, sell_success = place_orders_dual_page(page, sell_page, fib_levels)
+        take_debug_screenshot(page, "05_orders_submitted")
+        take_debug_screenshot(sell_page, "05_orders_submitted")
+        print_order_summary(buy_success, sell_success)
+        return buy_success, sell_success
+    
     # Step 1: Take initial screenshot
-    take_debug_screenshot(page, "00_initial")
+    take_debug_screenshot(page, "00_initial", order_path=True)
     
     # Step 2: Select GOLD.i# symbol first
-    if not select_gold_symbol(page):
+    if not select_gold_symbol(page, order_path=True):
         print("[MT5] [FAIL] Could not select GOLD symbol for first order")
+        flush_screenshots("symbol not selected")
         return False, False
     
     # Step 3: Place Buy Stop order
@@ -494,19 +769,16 @@ def place_orders(page: Page, fib_levels: dict) -> tuple:
     # Step 4: Select symbol AGAIN to ensure focus hasn't shifted
     # (Fixes issue where it might switch to CHFSGD or other symbols)
     print("\n[MT5] Re-confirming symbol selection for second order...")
-    if not select_gold_symbol(page):
+    if not select_gold_symbol(page, order_path=True):
         print("[MT5] [WARN] Could not re-select GOLD symbol")
     
     # Step 5: Place Sell Stop order
     sell_success = place_sell_stop(page, fib_levels)
     
+    # Debug frame once both orders are submitted (off the order path)
+    take_debug_screenshot(page, "05_orders_submitted")
+    
     # Summary
-    print("\n" + "="*50)
-    print("[MT5] ORDER PLACEMENT SUMMARY")
-    print("="*50)
-    print(f"  Buy Stop:  {'[OK] Placed' if buy_success else '[FAIL]'}")
-    print(f"  Sell Stop: {'[OK] Placed' if sell_success else '[FAIL]'}")
-    print("="*50)
-    print(f"\n[MT5] Debug screenshots saved in: {os.path.dirname(__file__)}")
+    print_order_summary(buy_success, sell_success)
     
     return buy_success, sell_success
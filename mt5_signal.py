@@ -0,0 +1,274 @@
+"""
+MT5-only signal source.
+Derives the reference candle's High/Low from the MT5 Web Terminal itself,
+so the whole run needs one browser and no TradingView window.
+
+A MutationObserver on the symbol's Market Watch row pushes every Bid/Ask
+change to Python (page.expose_binding, like legend_observer.py), where the
+quotes are aggregated into CONFIG["timeframe"] bars on server time
+(scheduler.measure_clock_offset). Bars are built from the quotes seen while
+the page is open: a bar is "complete" only if the feed was running when it
+opened. Partial bars are refused (no orders) unless allow_partial is set.
+
+A one-shot run therefore waits for the first "last_closed" candle it saw
+from its open (up to two timeframes). The daemon and the scheduler keep the
+feed running on their resident MT5 page, so their candles are complete as
+soon as the feed has run for a full bar, "current" ones included.
+
+Settings: CONFIG["mt5_signal"].
+"""
+
+from playwright.sync_api import Page
+import json
+import re
+import threading
+import time
+
+from config import CONFIG
+from tracing import span
+from latency import LevelsMessage
+from price_extractor import in_price_range
+from fib_calculator import calculate_fib_levels, print_fib_results
+from scheduler import measure_clock_offset, next_boundary, timeframe_seconds, format_boundary
+
+
+BINDING_NAME = "__mt5Quote"
+
+# Runs on every navigation. Finds the Market Watch row whose cell text is
+# exactly the symbol, observes it and pushes its text on change (coalesced
+# per task). Re-attaches when the list re-renders and the row is replaced.
+QUOTE_OBSERVER_JS = """
+(symbol) => {
+    if (window.__mt5QuoteObserver) {
+        window.__mt5QuoteObserver.symbol = symbol;
+        return;
+    }
+    const state = window.__mt5QuoteObserver = { symbol };
+
+    let row = null, observer = null, lastText = null, pending = false;
+
+    const push = () => {
+        pending = false;
+        if (!row) return;
+        const text = row.innerText || row.textContent || '';
+        if (text === lastText) return;
+        lastText = text;
+        window.%(binding)s({ symbol: state.symbol, text, ts: Date.now() });
+    };
+    const schedule = () => {
+        if (!pending) {
+            pending = true;
+            setTimeout(push, 0);
+        }
+    };
+    const findRow = () => {
+        for (const el of document.querySelectorAll('td, span, div')) {
+            if (el.childElementCount === 0 && el.textContent.trim() === state.symbol) {
+                return el.closest('tr, [role="row"]') || el.parentElement;
+            }
+        }
+        return null;
+    };
+    const attach = () => {
+        const found = findRow();
+        if (!found || found === row) return;
+        if (observer) observer.disconnect();
+        row = found;
+        lastText = null;
+        observer = new MutationObserver(schedule);
+        observer.observe(row, { childList: true, subtree: true, characterData: true });
+        schedule();
+    };
+    setInterval(() => {
+        if (!row || !row.isConnected) attach();
+    }, 250);
+    attach();
+}
+""" % {"binding": BINDING_NAME}
+
+NUMBER = re.compile(r'-?\d[\d,]*\.?\d*')
+
+
+def parse_quote(text: str, symbol: str) -> tuple:
+    """
+    Bid/Ask out of a Market Watch row ("GOLD.i#  2650.12  2650.40 ...").
+    Returns: (bid, ask) or (None, None).
+    """
+    numbers = [float(n.replace(",", "")) for n in NUMBER.findall(text.replace(symbol, " "))]
+    if len(numbers) < 2:
+        return None, None
+    return numbers[0], numbers[1]
+
+
+class QuoteBars:
+    """Market Watch quotes aggregated into timeframe bars (thread-safe)."""
+
+    def __init__(self, symbol: str = None, timeframe: str = None, offset: float = 0.0):
+        self.symbol = symbol or CONFIG["mt5_symbol"]
+        self.timeframe = str(timeframe or CONFIG["timeframe"])
+        self.step = timeframe_seconds(self.timeframe)
+        self.offset = offset
+        self.max_bars = CONFIG["mt5_signal"]["max_bars"]
+        self._lock = threading.Lock()
+        self.bars = {}        # open time (server epoch) -> [open, high, low, close, ticks]
+        self.started = None   # server time of the first quote
+        self.last_quote = None
+        self.quotes = 0
+
+    def bar_open(self, t: float) -> int:
+        return int(next_boundary(t, self.timeframe) - self.step)
+
+    def on_quote(self, source, payload: dict) -> None:
+        """Binding callback: parse one row push and merge it into its bar."""
+        bid, ask = parse_quote(payload.get("text", ""), self.symbol)
+        if bid is None:
+            return
+        price = (bid + ask) / 2 if CONFIG["mt5_signal"]["price"] == "mid" else bid
+        now = time.time() + self.offset
+        opened = self.bar_open(now)
+        with self._lock:
+            if self.started is None:
+                self.started = now
+            bar = self.bars.get(opened)
+            if bar is None:
+                self.bars[opened] = [price, price, price, price, 1]
+                for stale in sorted(self.bars)[:-self.max_bars]:
+                    del self.bars[stale]
+            else:
+                bar[1] = max(bar[1], price)
+                bar[2] = min(bar[2], price)
+                bar[3] = price
+                bar[4] += 1
+            self.last_quote = {"bid": bid, "ask": ask, "time": now}
+            self.quotes += 1
+
+    def _bar(self, opened: int) -> dict:
+        o, h, l, c, ticks = self.bars[opened]
+        return {"time": opened, "open": o, "high": h, "low": l, "close": c, "ticks": ticks,
+                "complete": self.started is not None and self.started <= opened}
+
+    def reference_bar(self, candle: str = None) -> dict:
+        """
+        The candle to trade: "current" (still forming) or "last_closed".
+        Returns: {"time", "open", "high", "low", "close", "ticks", "complete"} or None.
+        """
+        candle = candle or reference_candle()
+        with self._lock:
+            if not self.bars:
+                return None
+            current = self.bar_open(time.time() + self.offset)
+            if candle == "current":
+                opened = current if current in self.bars else None
+            else:
+                opened = max((t for t in self.bars if t < current), default=None)
+            return self._bar(opened) if opened is not None else None
+
+    def bar_at(self, opened: int) -> dict:
+        """The bar that opened at `opened` (server epoch seconds), or None."""
+        with self._lock:
+            return self._bar(opened) if opened in self.bars else None
+
+    def complete_at(self, candle: str = None) -> float:
+        """
+        Local time from which the reference candle is one the feed saw
+        from its open. Returns: epoch seconds, or None before the first quote.
+        """
+        candle = candle or reference_candle()
+        with self._lock:
+            if self.started is None:
+                return None
+            first = self.bar_open(self.started)
+            if first < self.started:
+                first += self.step  # First bar that opened while the feed was running
+        ready = first if candle == "current" else first + self.step
+        return ready - self.offset
+
+
+def reference_candle() -> str:
+    """CONFIG["mt5_signal"]["candle"], or the one use_current_candle implies."""
+    return CONFIG["mt5_signal"]["candle"] or ("current" if CONFIG["use_current_candle"] else "last_closed")
+
+
+def attach_quote_feed(page: Page, symbol: str = None, offset: float = None) -> QuoteBars:
+    """Subscribe to the symbol's Market Watch quotes (works on an already-loaded terminal)."""
+    if offset is None:
+        offset = measure_clock_offset() if CONFIG["mt5_signal"]["server_clock"] else 0.0
+    feed = QuoteBars(symbol, offset=offset)
+    page.expose_binding(BINDING_NAME, feed.on_quote)
+    page.add_init_script(f"({QUOTE_OBSERVER_JS})({json.dumps(feed.symbol)})")
+    if page.url.startswith("http"):
+        page.evaluate(QUOTE_OBSERVER_JS, feed.symbol)
+    return feed
+
+
+def read_reference_bar(page: Page, feed: QuoteBars) -> dict:
+    """
+    The reference candle from the quote feed.
+    Waits for the first quotes (timeouts["quote_feed"]), and up to
+    max_wait_s for a candle the feed saw from its open. A candle that
+    opened before the feed started only covers part of its real range,
+    so it is refused unless allow_partial is set.
+    Returns: the bar (see QuoteBars.reference_bar), or None.
+    """
+    settings = CONFIG["mt5_signal"]
+    candle = reference_candle()
+    print(f"\n[MT5] Reading {feed.symbol} {feed.timeframe} candle from Market Watch quotes...")
+
+    deadline = time.perf_counter() + CONFIG["timeouts"]["quote_feed"] / 1000
+    while feed.quotes < settings["min_quotes"] and time.perf_counter() < deadline:
+        page.wait_for_timeout(50)
+
+    # A closed candle seen from its open is at most two timeframes away; a
+    # forming one only becomes complete as a just-opened bar, so never wait for it
+    bar = feed.reference_bar(candle)
+    ready = feed.complete_at(candle)
+    if (bar is None or not bar["complete"]) and ready is not None and candle == "last_closed":
+        wait_s = ready - time.time()
+        if settings["max_wait_s"] is not None:
+            wait_s = min(wait_s, settings["max_wait_s"])
+        if wait_s > 0:
+            print(f"  Waiting {wait_s:.0f}s for a candle seen from its open "
+                  f"(closes {format_boundary(ready + feed.offset)})")
+            deadline = time.time() + wait_s
+            while time.time() < deadline:
+                page.wait_for_timeout(min(1000, max(1, int((deadline - time.time()) * 1000))))
+        bar = feed.reference_bar(candle)
+
+    if bar is None:
+        print("[MT5] [FAIL] No quotes for the reference candle")
+        return None
+
+    print(f"  {candle.replace('_', ' ')} bar {format_boundary(bar['time'])}: "
+          f"O={bar['open']} H={bar['high']} L={bar['low']} C={bar['close']} ({bar['ticks']} quotes)")
+    if not bar["complete"]:
+        if not settings["allow_partial"]:
+            print(f"[MT5] [FAIL] Partial candle: quotes only since {format_boundary(feed.started)}, "
+                  f"its real High/Low is unknown (use the last_closed candle, the daemon or "
+                  f"scheduler, or set allow_partial)")
+            return None
+        print(f"  [WARN] Partial candle: quotes only since {format_boundary(feed.started)}")
+    return bar
+
+
+def read_mt5_levels(page: Page, feed: QuoteBars) -> LevelsMessage:
+    """
+    Fib levels from the MT5 quote feed, ready for place_orders.
+    Returns: LevelsMessage stamped "extracted" (and "candle_close" for a
+    closed candle), or None if no usable candle was seen.
+    """
+    with span("extract_prices.mt5"):
+        bar = read_reference_bar(page, feed)
+    extracted = time.monotonic()
+    if bar is None:
+        return None
+    high, low = bar["high"], bar["low"]
+    if not in_price_range(high, low):
+        print(f"[MT5] [FAIL] No valid candle (High={high}, Low={low})")
+        return None
+
+    levels = calculate_fib_levels(high, low)
+    print_fib_results(high, low, levels)
+    closed = bar["time"] + feed.step - feed.offset if reference_candle() == "last_closed" else None
+    message = LevelsMessage(levels, high, low, candle_close=closed)
+    message.stamp("extracted", extracted)
+    return message
@@ -0,0 +1,211 @@
+"""
+Network capture of TradingView bar data.
+Decodes the chart websocket's OHLC series into memory so the current
+candle's High/Low is available without hovering or parsing the DOM.
+
+Wire format (socket.io style framing):
+    ~m~<len>~m~{"m": "<method>", "p": [...]}
+    ~h~<n>                                   (heartbeat, ignored)
+
+Messages used:
+    client -> create_series / modify_series  [cs, series_id, turnaround, sym_ref, interval, ...]
+    client -> resolve_symbol                 [cs, sym_ref, "={\"symbol\": \"OANDA:XAUUSD\", ...}"]
+    server -> symbol_resolved                [cs, sym_ref, {"pro_name": ..., "name": ...}]
+    server -> timescale_update / du          [cs, {series_id: {"s": [{"i": n, "v": [t, o, h, l, c, vol]}]}}]
+"""
+
+from playwright.sync_api import Page
+import json
+import re
+import threading
+import time
+
+from config import CONFIG
+
+
+FRAME_HEADER = re.compile(r'~m~(\d+)~m~')
+
+
+def split_frames(payload) -> list:
+    """Split one websocket payload into its JSON message strings."""
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8", errors="replace")
+
+    messages = []
+    pos = 0
+    while True:
+        header = FRAME_HEADER.match(payload, pos)
+        if not header:
+            break
+        start = header.end()
+        end = start + int(header.group(1))
+        body = payload[start:end]
+        if body.startswith("{"):
+            messages.append(body)
+        pos = end
+    return messages
+
+
+class BarFeed:
+    """Thread-safe in-memory OHLC series keyed by chart series id."""
+
+    def __init__(self, max_bars: int = None):
+        self.max_bars = max_bars or CONFIG["capture_max_bars"]
+        self._lock = threading.Lock()
+        self.symbols = {}   # sym_ref -> resolved symbol name
+        self.series = {}    # series_id -> {"sym_ref", "interval", "bars": {time: [o, h, l, c, v]}}
+        self.last_update = None
+
+    # -------------------------------------------------------------------------
+    # Frame handlers
+    # -------------------------------------------------------------------------
+
+    def on_frame_sent(self, payload) -> None:
+        """Track which series id belongs to which symbol/interval."""
+        for raw in split_frames(payload):
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+            method, params = msg.get("m"), msg.get("p", [])
+
+            with self._lock:
+                if method in ("create_series", "modify_series") and len(params) >= 5:
+                    # New symbol/interval on an existing series = fresh bars
+                    self.series[params[1]] = {"sym_ref": params[3], "interval": str(params[4]), "bars": {}}
+                elif method == "resolve_symbol" and len(params) >= 3:
+                    self.symbols[params[1]] = self.parse_symbol_ref(params[2])
+
+    def on_frame_received(self, payload) -> None:
+        """Merge bar updates into the in-memory series."""
+        for raw in split_frames(payload):
+            if '"timescale_update"' not in raw and '"du"' not in raw and '"symbol_resolved"' not in raw:
+                continue
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+            method, params = msg.get("m"), msg.get("p", [])
+
+            with self._lock:
+                if method == "symbol_resolved" and len(params) >= 3:
+                    info = params[2] or {}
+                    self.symbols[params[1]] = info.get("pro_name") or info.get("name") or self.symbols.get(params[1])
+                elif method in ("timescale_update", "du") and len(params) >= 2:
+                    self.merge_bars(params[1])
+
+    @staticmethod
+    def parse_symbol_ref(ref: str) -> str:
+        """resolve_symbol passes either a plain name or '=' + JSON."""
+        if isinstance(ref, str) and ref.startswith("="):
+            try:
+                return json.loads(ref[1:]).get("symbol", ref)
+            except ValueError:
+                return ref
+        return ref
+
+    def merge_bars(self, update: dict) -> None:
+        """Apply {series_id: {"s": [{"v": [t, o, h, l, c, vol]}]}} (lock held)."""
+        for series_id, data in update.items():
+            series = self.series.get(series_id)
+            if series is None or not isinstance(data, dict):
+                continue
+            bars = series["bars"]
+            for row in data.get("s", []):
+                values = row.get("v", [])
+                if len(values) >= 5:
+                    bars[values[0]] = values[1:6]
+            if len(bars) > self.max_bars:
+                for stale in sorted(bars)[:len(bars) - self.max_bars]:
+                    del bars[stale]
+            self.last_update = time.time()
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def find_series(self, symbol: str, interval: str) -> dict:
+        """Find the series for a symbol (e.g. XAUUSD matches OANDA:XAUUSD) and interval."""
+        symbol = symbol.upper()
+        for series in self.series.values():
+            name = (self.symbols.get(series["sym_ref"]) or "").upper()
+            if series["interval"] == str(interval) and (name == symbol or name.endswith(":" + symbol)):
+                return series
+        return None
+
+    def latest_bar(self, symbol: str = None, interval: str = None) -> dict:
+        """
+        Get the newest (current) candle.
+        Returns: {"time", "open", "high", "low", "close", "volume"} or None.
+        """
+        with self._lock:
+            series = self.find_series(symbol or CONFIG["symbol"], interval or CONFIG["timeframe"])
+            if not series or not series["bars"]:
+                return None
+            t = max(series["bars"])
+            o, h, l, c = series["bars"][t][:4]
+            v = series["bars"][t][4] if len(series["bars"][t]) > 4 else None
+            return {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v}
+
+    def bar_at(self, bar_time: int, symbol: str = None, interval: str = None) -> dict:
+        """
+        Get the candle that opened at bar_time (epoch seconds).
+        Returns: {"time", "open", "high", "low", "close", "volume"} or None.
+        """
+        with self._lock:
+            series = self.find_series(symbol or CONFIG["symbol"], interval or CONFIG["timeframe"])
+            values = series["bars"].get(bar_time) if series else None
+            if not values:
+                return None
+            o, h, l, c = values[:4]
+            return {"time": bar_time, "open": o, "high": h, "low": l, "close": c,
+                    "volume": values[4] if len(values) > 4 else None}
+
+    def get_bars(self, symbol: str = None, interval: str = None) -> list:
+        """Get all captured bars, oldest first, as (time, o, h, l, c, v) tuples."""
+        with self._lock:
+            series = self.find_series(symbol or CONFIG["symbol"], interval or CONFIG["timeframe"])
+            if not series:
+                return []
+            return [(t, *series["bars"][t]) for t in sorted(series["bars"])]
+
+
+def attach_bar_feed(page: Page) -> BarFeed:
+    """
+    Start capturing chart bar data on a page.
+    Must be called BEFORE navigating, since the chart websocket opens on load.
+    """
+    feed = BarFeed()
+
+    def on_websocket(ws):
+        if "tradingview.com" not in ws.url:
+            return
+        ws.on("framesent", feed.on_frame_sent)
+        ws.on("framereceived", feed.on_frame_received)
+
+    page.on("websocket", on_websocket)
+    return feed
+
+
+def start_bar_capture(page: Page) -> BarFeed:
+    """Attach a bar feed if network capture is enabled in config, else None."""
+    if not CONFIG.get("use_network_capture", False):
+        return None
+    return attach_bar_feed(page)
+
+
+def wait_for_bar(page: Page, feed: BarFeed, timeout: int = None,
+                 symbol: str = None, interval: str = None) -> dict:
+    """
+    Wait for the current candle to arrive on the feed.
+    Pumps Playwright events with short page waits: sync API callbacks
+    only fire while a Playwright call is in progress.
+    Returns: latest bar dict, or None on timeout.
+    """
+    timeout = timeout if timeout is not None else CONFIG["timeouts"]["symbol_change"]
+    deadline = time.perf_counter() + timeout / 1000
+    while True:
+        bar = feed.latest_bar(symbol, interval)
+        if bar or time.perf_counter() >= deadline:
+            return bar
+        page.wait_for_timeout(50)
@@ -0,0 +1,148 @@
+"""
+OHLC CSV reader.
+Streams broker / MT5-exported candle files in fixed-size chunks of NumPy
+arrays, so large histories never sit in memory as Python rows.
+
+Supported layouts (comma, semicolon or tab separated, header optional):
+    <DATE>  <TIME>  <OPEN>  <HIGH>  <LOW>  <CLOSE>  <TICKVOL>  <VOL>  <SPREAD>   (MT5 export)
+    time,open,high,low,close,volume                                           (generic)
+    2024.01.02,00:00,2063.50,2065.10,2061.20,2064.00,1234                     (headerless)
+
+Times are returned as int64 UTC epoch seconds.
+"""
+
+import csv
+import numpy as np
+
+
+COLUMN_ALIASES = {
+    "date": "date",
+    "time": "time",
+    "datetime": "time",
+    "timestamp": "time",
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "volume": "volume",
+    "tickvol": "tickvol",
+    "tick_volume": "tickvol",
+    "vol": "vol",
+    "real_volume": "vol",
+}
+
+# Headerless files: column layout by column count
+HEADERLESS_LAYOUTS = {
+    5: ["time", "open", "high", "low", "close"],
+    6: ["time", "open", "high", "low", "close", "volume"],
+    7: ["date", "time", "open", "high", "low", "close", "volume"],
+}
+
+FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+
+def sniff_delimiter(line: str) -> str:
+    """Pick the most frequent of tab / semicolon / comma."""
+    return max(["\t", ";", ","], key=line.count)
+
+
+def map_header(header: list) -> dict:
+    """Map normalised column names (e.g. '<TICKVOL>' -> 'tickvol') to indexes."""
+    columns = {}
+    for i, name in enumerate(header):
+        key = COLUMN_ALIASES.get(name.strip().strip("<>").lower())
+        if key and key not in columns:
+            columns[key] = i
+    return columns
+
+
+def resolve_columns(first_row: list) -> tuple:
+    """
+    Work out the column layout from the first row.
+    Returns: (columns dict, has_header)
+    """
+    if first_row and first_row[0].strip()[:1].isdigit():
+        layout = HEADERLESS_LAYOUTS.get(len(first_row))
+        if not layout:
+            raise ValueError(f"Cannot infer layout of headerless row with {len(first_row)} columns")
+        return {name: i for i, name in enumerate(layout)}, False
+
+    columns = map_header(first_row)
+    missing = [c for c in ("open", "high", "low", "close") if c not in columns]
+    if "time" not in columns and "date" not in columns:
+        missing.append("time")
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    return columns, True
+
+
+def parse_times(dates: list, times: list) -> np.ndarray:
+    """Parse date/time strings (or epoch seconds) to int64 epoch seconds."""
+    if dates is None and times and times[0].strip().isdigit():
+        return np.array(times, dtype=np.int64)
+
+    if dates is None:
+        stamps = [t.strip().replace(".", "-", 2).replace("/", "-", 2).replace(" ", "T", 1) for t in times]
+    else:
+        stamps = [d.strip().replace(".", "-").replace("/", "-") + "T" + t.strip()
+                  for d, t in zip(dates, times)]
+    return np.array(stamps, dtype="datetime64[s]").astype(np.int64)
+
+
+def rows_to_arrays(rows: list, columns: dict) -> dict:
+    """Convert a chunk of raw CSV rows into typed column arrays."""
+    def column(name):
+        i = columns[name]
+        return [row[i] for row in rows]
+
+    dates = column("date") if "date" in columns else None
+    times = column("time") if "time" in columns else ["00:00:00"] * len(rows)
+
+    volume_key = next((k for k in ("volume", "tickvol", "vol") if k in columns), None)
+    return {
+        "time": parse_times(dates, times),
+        "open": np.array(column("open"), dtype=np.float64),
+        "high": np.array(column("high"), dtype=np.float64),
+        "low": np.array(column("low"), dtype=np.float64),
+        "close": np.array(column("close"), dtype=np.float64),
+        "volume": (np.array(column(volume_key), dtype=np.float64) if volume_key
+                   else np.zeros(len(rows), dtype=np.float64)),
+    }
+
+
+def iter_ohlc_chunks(path: str, chunk_size: int = 100_000):
+    """
+    Stream a candle CSV as chunks of column arrays.
+    Yields: dict with FIELDS as keys, each a NumPy array of up to chunk_size rows.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        first_line = f.readline()
+        if not first_line.strip():
+            return
+        delimiter = sniff_delimiter(first_line)
+        first_row = next(csv.reader([first_line], delimiter=delimiter))
+        columns, has_header = resolve_columns(first_row)
+
+        rows = [] if has_header else [first_row]
+        for row in csv.reader(f, delimiter=delimiter):
+            if not row:
+                continue
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                yield rows_to_arrays(rows, columns)
+                rows = []
+        if rows:
+            yield rows_to_arrays(rows, columns)
+
+
+def load_ohlc_csv(path: str) -> dict:
+    """Load a whole candle CSV into column arrays (sorted by time)."""
+    chunks = list(iter_ohlc_chunks(path))
+    if not chunks:
+        return {name: np.array([], dtype=np.int64 if name == "time" else np.float64) for name in FIELDS}
+
+    data = {name: np.concatenate([c[name] for c in chunks]) for name in FIELDS}
+    order = np.argsort(data["time"], kind="stable")
+    if not np.all(order == np.arange(len(order))):
+        data = {name: arr[order] for name, arr in data.items()}
+    return data
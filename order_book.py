@@ -0,0 +1,286 @@
+"""
+Live index of the MT5 orders table.
+A MutationObserver on the terminal's Trade table pushes only the rows that
+changed (and the tickets that disappeared) to Python through
+page.expose_binding. Rows are kept by ticket with their type, symbol,
+volume, price, SL and TP, plus an index on (type, symbol, volume, SL, TP),
+so confirming an order is a dict lookup instead of looking for "Done" /
+"Error" texts on the page.
+
+Columns are mapped from the table header, and the ticket comes from a
+row's data-ticket attribute or its Ticket column.
+Rows already in the table when the index is attached are never taken as
+confirmation of a new order.
+"""
+
+from playwright.sync_api import Page
+import json
+import threading
+import time
+import weakref
+
+from config import CONFIG
+
+
+BINDING_NAME = "__ordersUpdate"
+
+# Candidate <tbody> elements of the orders table, tried in order
+ORDERS_BODY_SELECTORS = ["tbody#orders", "[class*='trade'] table tbody", "[class*='toolbox'] table tbody"]
+
+# Runs on every navigation. Finds the orders table, maps its header cells to
+# fields, and pushes changed rows (coalesced per task). Re-attaches, with a
+# full snapshot, when the table body is replaced.
+ORDER_BOOK_JS = """
+(selectors) => {
+    if (window.__orderBookInstalled) return;
+    window.__orderBookInstalled = true;
+
+    const FIELDS = [
+        ['ticket', /^(ticket|order|#)$/],
+        ['symbol', /^symbol$/],
+        ['type', /^type$/],
+        ['volume', /^(volume|lots?|size)$/],
+        ['price', /^(open )?price$/],
+        ['sl', /^(s ?\\/ ?l|sl|stop loss)$/],
+        ['tp', /^(t ?\\/ ?p|tp|take profit)$/],
+    ];
+    let body = null, columns = [], observer = null, pending = false, snapshot = false;
+    let rowTicket = new WeakMap();
+    const dirty = new Set(), gone = new Set();
+
+    const readColumns = (table) => {
+        const heads = table ? table.querySelectorAll('thead th, thead td') : [];
+        return Array.from(heads, (th) => {
+            const label = th.textContent.trim().toLowerCase();
+            const match = FIELDS.find(([, re]) => re.test(label));
+            return match ? match[0] : null;
+        });
+    };
+    const readRow = (tr) => {
+        const row = {};
+        columns.forEach((field, i) => {
+            if (field && tr.cells[i]) row[field] = tr.cells[i].textContent.trim();
+        });
+        row.ticket = tr.dataset.ticket || row.ticket;
+        return row.ticket ? row : null;
+    };
+    const push = () => {
+        pending = false;
+        if (!body) return;
+        const upserts = [];
+        for (const tr of snapshot ? Array.from(body.rows) : dirty) {
+            if (!tr.isConnected || tr.parentNode !== body) continue;
+            const row = readRow(tr);
+            const old = rowTicket.get(tr);
+            if (old && (!row || old !== row.ticket)) gone.add(old);
+            if (!row) continue;
+            rowTicket.set(tr, row.ticket);
+            gone.delete(row.ticket);
+            upserts.push(row);
+        }
+        const payload = { upserts, removed: Array.from(gone), snapshot, ts: Date.now() };
+        dirty.clear();
+        gone.clear();
+        if (snapshot || upserts.length || payload.removed.length) {
+            snapshot = false;
+            window.%(binding)s(payload);
+        }
+    };
+    const schedule = () => {
+        if (!pending) {
+            pending = true;
+            setTimeout(push, 0);
+        }
+    };
+    const onMutations = (records) => {
+        for (const record of records) {
+            if (record.target === body) {
+                record.addedNodes.forEach((n) => n.nodeType === 1 && dirty.add(n));
+                record.removedNodes.forEach((n) => rowTicket.has(n) && gone.add(rowTicket.get(n)));
+            } else {
+                const el = record.target.nodeType === 1 ? record.target : record.target.parentElement;
+                const tr = el && el.closest('tr');
+                if (tr) dirty.add(tr);
+            }
+        }
+        schedule();
+    };
+    const attach = () => {
+        const found = selectors.map((s) => document.querySelector(s)).find(Boolean);
+        if (!found || found === body) return;
+        if (observer) observer.disconnect();
+        body = found;
+        columns = readColumns(body.closest('table'));
+        rowTicket = new WeakMap();
+        snapshot = true;
+        observer = new MutationObserver(onMutations);
+        observer.observe(body, { childList: true, subtree: true, characterData: true });
+        schedule();
+    };
+    setInterval(() => {
+        if (!body || !body.isConnected) attach();
+    }, 250);
+    attach();
+}
+""" % {"binding": BINDING_NAME}
+
+
+def to_number(text) -> float:
+    """Cell text -> float rounded like the order form ("2,650.10" -> 2650.1); None if empty."""
+    try:
+        return round(float(str(text).replace(",", "").replace(" ", "")), 2)
+    except (TypeError, ValueError):
+        return None
+
+
+def order_key(order_type: str, symbol: str, volume, sl, tp) -> tuple:
+    return (str(order_type).strip().lower(), str(symbol).strip().lower(),
+            to_number(volume), to_number(sl), to_number(tp))
+
+
+class OrderBook:
+    """Orders table rows by ticket, written by the binding, read by any thread."""
+
+    def __init__(self, symbol: str = None):
+        self.symbol = symbol or CONFIG["mt5_symbol"]
+        self._lock = threading.Lock()
+        self._orders = {}      # ticket -> row
+        self._by_key = {}      # order_key -> {ticket, ...}
+        self._expected = {}    # order type -> (key, wall time the order was prepared)
+        self.live = False      # The table was found and snapshotted
+        self.updates = 0
+
+    def _remove(self, ticket: str) -> None:
+        row = self._orders.pop(ticket, None)
+        if row is not None:
+            tickets = self._by_key.get(row["key"])
+            if tickets:
+                tickets.discard(ticket)
+                if not tickets:
+                    del self._by_key[row["key"]]
+
+    def on_update(self, source, payload: dict) -> None:
+        """Binding callback: apply changed rows and removed tickets."""
+        now = time.time()
+        with self._lock:
+            first = not self.live
+            if payload.get("snapshot"):
+                present = {row["ticket"] for row in payload.get("upserts", [])}
+                for ticket in [t for t in self._orders if t not in present]:
+                    self._remove(ticket)
+            for ticket in payload.get("removed", []):
+                self._remove(ticket)
+            for row in payload.get("upserts", []):
+                previous = self._orders.get(row["ticket"])
+                self._remove(row["ticket"])
+                row = dict(row, key=order_key(row.get("type", ""), row.get("symbol", ""),
+                                              row.get("volume"), row.get("sl"), row.get("tp")))
+                # Rows present before the index was live are never "new"
+                row["seen"] = previous["seen"] if previous else (0.0 if first else now)
+                self._orders[row["ticket"]] = row
+                self._by_key.setdefault(row["key"], set()).add(row["ticket"])
+            self.live = True
+            self.updates += 1
+
+    def expect(self, order_type: str, volume, sl, tp) -> None:
+        """Remember the order about to be submitted (call before the click)."""
+        with self._lock:
+            self._expected[order_type] = (order_key(order_type, self.symbol, volume, sl, tp), time.time())
+
+    def find(self, order_type: str, volume, sl, tp, since: float = 0.0) -> dict:
+        """
+        Order matching type, symbol, volume, SL and TP that appeared after `since` (wall time).
+        Returns: the row, or None.
+        """
+        with self._lock:
+            return self._find(order_key(order_type, self.symbol, volume, sl, tp), since)
+
+    def _find(self, key: tuple, since: float) -> dict:
+        for ticket in self._by_key.get(key, ()):
+            row = self._orders[ticket]
+            if row["seen"] and row["seen"] >= since:
+                return dict(row)
+        return None
+
+    def confirmed(self, order_type: str) -> dict:
+        """Row of the order last passed to expect() for this type, once it is in the table; else None."""
+        with self._lock:
+            if order_type not in self._expected:
+                return None
+            key, since = self._expected[order_type]
+            return self._find(key, since)
+
+    def get(self, ticket: str) -> dict:
+        with self._lock:
+            row = self._orders.get(str(ticket))
+            return dict(row) if row else None
+
+    def orders(self) -> list:
+        """All rows, by ticket."""
+        with self._lock:
+            return [dict(self._orders[t]) for t in sorted(self._orders)]
+
+
+_books = weakref.WeakKeyDictionary()  # Page -> OrderBook
+_books_lock = threading.Lock()
+
+
+def attach_order_book(page: Page) -> OrderBook:
+    """
+    Index the orders table of a page (also installed on later navigations).
+    Returns the existing index if the page already has one.
+    """
+    with _books_lock:
+        book = _books.get(page)
+        if book is not None:
+            return book
+        book = _books[page] = OrderBook()
+    page.expose_binding(BINDING_NAME, book.on_update)
+    page.add_init_script(f"({ORDER_BOOK_JS})({json.dumps(ORDERS_BODY_SELECTORS)})")
+    if page.url.startswith("http"):
+        page.evaluate(ORDER_BOOK_JS, ORDERS_BODY_SELECTORS)
+    return book
+
+
+async def attach_order_book_async(page) -> OrderBook:
+    """attach_order_book for an async_playwright page."""
+    with _books_lock:
+        book = _books.get(page)
+        if book is not None:
+            return book
+        book = _books[page] = OrderBook()
+    await page.expose_binding(BINDING_NAME, book.on_update)
+    await page.add_init_script(f"({ORDER_BOOK_JS})({json.dumps(ORDERS_BODY_SELECTORS)})")
+    if page.url.startswith("http"):
+        await page.evaluate(ORDER_BOOK_JS, ORDERS_BODY_SELECTORS)
+    return book
+
+
+def get_order_book(page) -> OrderBook:
+    """The page's index, or None if none was attached."""
+    with _books_lock:
+        return _books.get(page)
+
+
+def wait_for_order(page: Page, book: OrderBook, order_type: str, timeout_ms: int = None) -> dict:
+    """
+    Wait for the expected order to show up in the table.
+    Waits through page.wait_for_timeout so binding pushes keep being delivered.
+    Returns: the order row, or None if it did not appear within the timeout.
+    """
+    deadline = time.perf_counter() + (timeout_ms or CONFIG["timeouts"]["order_confirm"]) / 1000
+    while True:
+        row = book.confirmed(order_type)
+        if row is not None or time.perf_counter() >= deadline:
+            return row
+        page.wait_for_timeout(25)
+
+
+async def wait_for_order_async(page, book: OrderBook, order_type: str, timeout_ms: int = None) -> dict:
+    """wait_for_order for an async_playwright page."""
+    deadline = time.perf_counter() + (timeout_ms or CONFIG["timeouts"]["order_confirm"]) / 1000
+    while True:
+        row = book.confirmed(order_type)
+        if row is not None or time.perf_counter() >= deadline:
+            return row
+        await page.wait_for_timeout(25)
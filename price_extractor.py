@@ -4,11 +4,120 @@ Extracts High/Low prices from TradingView chart.
 """
 
 from playwright.sync_api import Page
+import json
 import re
 import time
 
 from config import CONFIG
+from tracing import traced
 from utils import update_status, get_viewport_center
+from network_capture import wait_for_bar
+
+
+# One evaluate scoped to the legend and data-window nodes. Returns typed
+# O/H/L/C per source plus the bar's date/time (data window only) and the
+# number of characters read, instead of shipping the whole body text.
+SCOPED_OHLC_JS = r"""
+() => {
+    const num = (s) => {
+        const v = parseFloat(String(s).replace(/[,\u202f\s]/g, '').replace('\u2212', '-'));
+        return Number.isFinite(v) ? v : null;
+    };
+    const result = { legend: null, data_window: null, chars: 0 };
+
+    const legend = document.querySelector("div[data-name='legend']");
+    if (legend) {
+        const item = legend.querySelector("[data-name='legend-series-item']") || legend;
+        const text = item.textContent || '';
+        result.chars += text.length;
+        const pick = (k) => {
+            const m = text.match(new RegExp(k + '\\s*([\\d,]+\\.?\\d*)'));
+            return m ? num(m[1]) : null;
+        };
+        result.legend = { open: pick('O'), high: pick('H'), low: pick('L'), close: pick('C') };
+    }
+
+    const dw = document.querySelector("[data-name='data-window'], div[class*='dataWindow'], div[class*='widgetbar-widget-datawindow']");
+    if (dw) {
+        const lines = (dw.innerText || '').split('\n').map(s => s.trim()).filter(Boolean);
+        result.chars += lines.reduce((n, s) => n + s.length, 0);
+        const rows = {};
+        for (let i = 0; i + 1 < lines.length; i++) {
+            const key = lines[i].toLowerCase();
+            if (['date', 'time', 'open', 'high', 'low', 'close'].includes(key) && !(key in rows)) {
+                rows[key] = lines[i + 1];
+            }
+        }
+        result.data_window = {
+            open: num(rows.open), high: num(rows.high), low: num(rows.low), close: num(rows.close),
+            date: rows.date || null, time: rows.time || null,
+        };
+    }
+    return result;
+}
+"""
+
+def get_price_range(symbol: str = None) -> tuple:
+    """Get the valid (min, max) price range for a symbol."""
+    ranges = CONFIG["price_ranges"]
+    return ranges.get((symbol or CONFIG["symbol"]).upper(), ranges["default"])
+
+
+def get_price_digits(symbol: str = None) -> int:
+    """Get the number of decimal places a symbol is quoted with."""
+    digits = CONFIG["price_digits"]
+    return digits.get((symbol or CONFIG["symbol"]).upper(), digits["default"])
+
+
+def has_price_range(symbol: str = None) -> bool:
+    """True if the symbol has its own range (not just the default)."""
+    return (symbol or CONFIG["symbol"]).upper() in CONFIG["price_ranges"]
+
+
+def in_price_range(high: float, low: float, symbol: str = None) -> bool:
+    """Check a High/Low pair against the symbol's valid range."""
+    if high is None or low is None:
+        return False
+    min_price, max_price = get_price_range(symbol)
+    return min_price < low <= high < max_price
+
+
+def parse_legend_text(legend_text: str) -> tuple:
+    """
+    Parse High/Low out of legend text.
+    Returns: (high_price, low_price) or (None, None) if not found.
+    """
+    h_match = re.search(r'H\s*([\d,]+\.?\d*)', legend_text)
+    l_match = re.search(r'L\s*([\d,]+\.?\d*)', legend_text)
+    
+    if h_match and l_match:
+        high = float(h_match.group(1).replace(',', ''))
+        low = float(l_match.group(1).replace(',', ''))
+        return high, low
+    return None, None
+
+
+def parse_page_scan(body_text: str, symbol: str = None) -> tuple:
+    """
+    Find the widest valid High/Low pair in arbitrary page text.
+    Returns: (high_price, low_price) or (None, None) if not found.
+    """
+    min_price, max_price = get_price_range(symbol)
+    
+    # Single pass: convert each match once and keep the running max/min
+    high = low = None
+    for match in re.finditer(r'(?:([Hh])|[Ll])[\s:]([\d,]+\.\d+)', body_text):
+        value = float(match.group(2).replace(',', ''))
+        if not min_price < value < max_price:
+            continue
+        if match.group(1):
+            high = value if high is None or value > high else high
+        else:
+            low = value if low is None or value < low else low
+    
+    if high is not None and low is not None:
+        return high, low
+    return None, None
 
 
 def extract_from_legend(page: Page) -> tuple:
@@ -19,43 +128,135 @@ def extract_from_legend(page: Page) -> tuple:
     try:
         page.wait_for_selector("div[data-name='legend']", timeout=3000)
         legend_text = page.locator("div[data-name='legend']").text_content()
-        
-        h_match = re.search(r'H\s*([\d,]+\.?\d*)', legend_text)
-        l_match = re.search(r'L\s*([\d,]+\.?\d*)', legend_text)
-        
-        if h_match and l_match:
-            high = float(h_match.group(1).replace(',', ''))
-            low = float(l_match.group(1).replace(',', ''))
-            return high, low
+        return parse_legend_text(legend_text)
     except:
         pass
     return None, None
 
 
-def extract_from_page_scan(page: Page) -> tuple:
+def validate_ohlc(values: dict, symbol: str = None) -> bool:
+    """Check O/H/L/C against the symbol's range and each other in one pass."""
+    if not values or values.get("high") is None or values.get("low") is None:
+        return False
+    min_price, max_price = get_price_range(symbol)
+    high, low = values["high"], values["low"]
+    for name in ("open", "high", "low", "close"):
+        value = values.get(name)
+        if value is None:
+            continue
+        if not (min_price < value < max_price and low <= value <= high):
+            return False
+    return True
+
+
+def read_scoped_ohlc(page: Page) -> dict:
+    """
+    Run SCOPED_OHLC_JS once.
+    Returns: {"legend": {...} or None, "data_window": {...} or None, "chars": n}
+    """
+    return page.evaluate(SCOPED_OHLC_JS)
+
+
+def pick_scoped_candle(scoped: dict, symbol: str = None) -> dict:
+    """
+    Choose the first valid candle from a SCOPED_OHLC_JS result (data window first).
+    Returns: {"open", "high", "low", "close", "date", "time", "source"} or None.
+    """
+    for source in ("data_window", "legend"):
+        values = scoped.get(source)
+        if validate_ohlc(values, symbol):
+            return {"date": None, "time": None, **values, "source": source}
+    return None
+
+
+def extract_scoped(page: Page, symbol: str = None) -> dict:
+    """
+    Read the current candle from the legend / data window in one evaluate.
+    Returns: {"open", "high", "low", "close", "date", "time", "source"} or None.
+    """
+    try:
+        scoped = read_scoped_ohlc(page)
+    except Exception:
+        return None
+    return pick_scoped_candle(scoped, symbol)
+
+
+def extract_from_page_scan(page: Page, symbol: str = None) -> tuple:
     """
     Scan page content for price patterns.
     Returns: (high_price, low_price) or (None, None) if failed.
     """
-    min_price, max_price = CONFIG["gold_price_range"]
-    
     try:
         body_text = page.locator("body").inner_text()
-        h_vals = re.findall(r'[Hh][\s:]([\d,]+\.\d+)', body_text)
-        l_vals = re.findall(r'[Ll][\s:]([\d,]+\.\d+)', body_text)
-        
-        valid_h = [float(x.replace(',', '')) for x in h_vals 
-                   if min_price < float(x.replace(',', '')) < max_price]
-        valid_l = [float(x.replace(',', '')) for x in l_vals 
-                   if min_price < float(x.replace(',', '')) < max_price]
-        
-        if valid_h and valid_l:
-            return max(valid_h), min(valid_l)
+        return parse_page_scan(body_text, symbol)
     except:
         pass
     return None, None
 
 
+def extract_from_network(page: Page, bar_feed, symbol: str = None, timeframe: str = None) -> tuple:
+    """
+    Read the current candle from captured websocket bar data.
+    Returns: (high_price, low_price) or (None, None) if no valid bar arrived.
+    """
+    bar = wait_for_bar(page, bar_feed, CONFIG["timeouts"]["bar_capture"], symbol, timeframe)
+    if bar and in_price_range(float(bar["high"]), float(bar["low"]), symbol):
+        return float(bar["high"]), float(bar["low"])
+    return None, None
+
+
+def extract_from_legend_cell(legend_cell, symbol: str = None, timeframe: str = None) -> tuple:
+    """
+    Read the candle pushed by the legend observer (no hover, no wait).
+    Only a legend showing this symbol and timeframe counts.
+    Returns: (high_price, low_price) or (None, None) if nothing valid yet.
+    """
+    state = legend_cell.latest(symbol or CONFIG["symbol"], timeframe or CONFIG["timeframe"])
+    if state and in_price_range(state["high"], state["low"], symbol):
+        return state["high"], state["low"]
+    return None, None
+
+
+def benchmark_extractors(page: Page, symbol: str = None, runs: int = 10) -> dict:
+    """
+    Compare the scoped evaluate with the body-text scan on a loaded chart.
+    Returns: {name: {"bytes", "fetch_ms", "parse_ms", "high", "low"}} (per-run averages).
+    """
+    results = {}
+    
+    fetch = parse = 0.0
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        body_text = page.locator("body").inner_text()
+        t1 = time.perf_counter()
+        high, low = parse_page_scan(body_text, symbol)
+        t2 = time.perf_counter()
+        fetch, parse = fetch + t1 - t0, parse + t2 - t1
+    results["page_scan"] = {"bytes": len(body_text.encode("utf-8")), "fetch_ms": fetch / runs * 1000,
+                            "parse_ms": parse / runs * 1000, "high": high, "low": low}
+    
+    fetch = parse = 0.0
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        scoped = read_scoped_ohlc(page)
+        t1 = time.perf_counter()
+        candle = next((scoped[s] for s in ("data_window", "legend") if validate_ohlc(scoped.get(s), symbol)), None)
+        t2 = time.perf_counter()
+        fetch, parse = fetch + t1 - t0, parse + t2 - t1
+    results["scoped"] = {"bytes": len(json.dumps(scoped).encode("utf-8")), "fetch_ms": fetch / runs * 1000,
+                         "parse_ms": parse / runs * 1000,
+                         "high": candle["high"] if candle else None, "low": candle["low"] if candle else None}
+    return results
+
+
+def print_benchmark(results: dict) -> None:
+    """Print benchmark_extractors output."""
+    print(f"\n  {'METHOD':<10} {'BYTES':>9} {'FETCH ms':>9} {'PARSE ms':>9} {'HIGH':>10} {'LOW':>10}")
+    for name, r in results.items():
+        print(f"  {name:<10} {r['bytes']:>9} {r['fetch_ms']:>9.2f} {r['parse_ms']:>9.3f} "
+              f"{str(r['high']):>10} {str(r['low']):>10}")
+
+
 def get_manual_input() -> tuple:
     """
     Prompt user for manual price input.
@@ -79,33 +280,61 @@ def get_manual_input() -> tuple:
         return 2750.00, 2740.00
 
 
-def extract_prices(page: Page) -> tuple:
+@traced()
+def extract_prices(page: Page, bar_feed=None, symbol: str = None, timeframe: str = None,
+                   allow_manual: bool = True, legend_cell=None) -> tuple:
     """
     Main function to extract High/Low prices.
     Tries multiple methods with fallbacks.
+    bar_feed: optional network_capture.BarFeed attached before navigation.
+    symbol/timeframe: chart being read (defaults to CONFIG).
+    allow_manual: False returns (None, None) instead of prompting (unattended runs).
+    legend_cell: optional legend_observer.LegendCell attached before navigation.
     Returns: (high_price, low_price)
     """
     print("\n[5/9] Reading candle High/Low prices...")
     update_status(page, "Reading candle data...", "Step 5/9")
     
+    # Try captured bar data (no hover, no DOM parsing). The feed's newest bar
+    # is the forming one, so a selected target candle is read from the chart
+    if bar_feed is not None and CONFIG.get("use_current_candle", True):
+        high, low = extract_from_network(page, bar_feed, symbol, timeframe)
+        if high and low:
+            update_status(page, f"Captured H={high} L={low}", "Step 5/9")
+            return high, low
+    
+    # Try the legend observer (already pushed; any Playwright call delivers
+    # queued binding calls, update_status may skip its evaluate when lean)
+    if legend_cell is not None:
+        page.wait_for_timeout(0)
+        high, low = extract_from_legend_cell(legend_cell, symbol, timeframe)
+        if high and low:
+            update_status(page, f"Legend H={high} L={low}", "Step 5/9")
+            return high, low
+    
     cx, cy = get_viewport_center(page)
     page.mouse.move(cx, cy)
     time.sleep(3)
     
-    # Try legend extraction
-    high, low = extract_from_legend(page)
-    if high and low:
+    # Try legend / data window (one scoped evaluate)
+    candle = extract_scoped(page, symbol)
+    if candle:
+        high, low = candle["high"], candle["low"]
+        stamp = f" @ {candle['date']} {candle['time'] or ''}" if candle["date"] else ""
+        print(f"  Read from {candle['source']}{stamp}")
         update_status(page, f"Found H={high} L={low}", "Step 5/9")
         return high, low
     
-    # Try page scan
-    high, low = extract_from_page_scan(page)
+    # Try page scan (whole body text, last automatic fallback)
+    high, low = extract_from_page_scan(page, symbol)
     if high and low:
         update_status(page, f"Scanned H={high} L={low}", "Step 5/9")
         return high, low
     
     # Fall back to manual input
     update_status(page, "Auto-extraction failed. Check console.", "Step 5/9")
+    if not allow_manual:
+        return None, None
     high, low = get_manual_input()
     update_status(page, f"Manual H={high} L={low}", "Step 5/9")
     return high, low
@@ -0,0 +1,189 @@
+"""
+Multi-Symbol Fibonacci Scanner
+==============================
+Runs load_symbol -> set_timeframe -> select_current_candle ->
+extract_prices -> calculate_fib_levels for every (symbol, timeframe) pair
+across a bounded pool of TradingView pages, and collects one result table.
+
+The pool shares ONE Chromium (see --shared-browser): each worker thread
+attaches over CDP with its own Playwright connection and its own context,
+navigates once, then reuses its page for every job it pulls off the queue.
+
+Usage:
+    python main.py --scan                              # CONFIG["scanner"] symbols/timeframes
+    python scanner.py XAUUSD,XAGUSD,EURUSD 15,30 --pool 3 [--out scan.csv]
+"""
+
+import sys
+import time
+import queue
+import threading
+from playwright.sync_api import sync_playwright
+
+from config import CONFIG
+from browser import launch_shared_browser, connect_browser
+from chart_steps import navigate_to_tradingview, load_symbol, set_timeframe, select_current_candle
+from price_extractor import extract_prices, in_price_range, has_price_range, get_price_digits
+from network_capture import start_bar_capture
+from legend_observer import start_legend_observer
+from fib_calculator import calculate_fib_levels, get_trade_levels
+
+
+print_lock = threading.Lock()
+
+
+def safe_print(msg):
+    """Thread-safe printing."""
+    with print_lock:
+        print(msg)
+
+
+def scan_one(page, bar_feed, legend_cell, symbol: str, timeframe: str) -> dict:
+    """Run the chart pipeline for one symbol/timeframe on an already-open page."""
+    started = time.perf_counter()
+    row = {"symbol": symbol, "timeframe": timeframe, "ok": False, "error": ""}
+    try:
+        if legend_cell is not None:
+            legend_cell.clear()  # Previous symbol's candle must not be read
+        if not load_symbol(page, symbol):
+            raise RuntimeError("symbol not loaded")
+        set_timeframe(page, timeframe)
+        select_current_candle(page)
+        high, low = extract_prices(page, bar_feed, symbol, timeframe, allow_manual=False,
+                                   legend_cell=legend_cell)
+        if not in_price_range(high, low, symbol):
+            raise RuntimeError(f"prices out of range: H={high} L={low}")
+
+        row.update({"ok": True, "high": high, "low": low})
+        row.update(get_trade_levels(calculate_fib_levels(high, low)))
+    except Exception as e:
+        row["error"] = str(e)[:80]
+    row["latency_s"] = time.perf_counter() - started
+    return row
+
+
+def scan_worker(worker_id: int, jobs: queue.Queue, results: list, cdp_endpoint: str) -> None:
+    """Pull jobs until the queue is empty, reusing one page."""
+    name = f"SCAN-{worker_id}"
+    with sync_playwright() as playwright:
+        browser, context, page = connect_browser(playwright, cdp_endpoint)
+        try:
+            bar_feed = start_bar_capture(page)
+            legend_cell = start_legend_observer(page)
+            navigate_to_tradingview(page)
+
+            while True:
+                try:
+                    symbol, timeframe = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                row = scan_one(page, bar_feed, legend_cell, symbol, timeframe)
+                row["worker"] = name
+                with print_lock:
+                    results.append(row)
+                    status = "[OK]" if row["ok"] else f"[FAIL] {row['error']}"
+                    print(f"[{name}] {symbol} {timeframe}: {status} ({row['latency_s']:.1f}s)")
+        except Exception as e:
+            safe_print(f"[{name}] [FAIL] Worker error: {e}")
+        finally:
+            context.close()
+
+
+def run_scan(symbols: list, timeframes: list, pool_size: int) -> list:
+    """
+    Scan every symbol x timeframe with a bounded page pool.
+    Symbols without their own CONFIG["price_ranges"] entry are skipped:
+    their prices could not be validated.
+    Returns: list of result rows (dicts), in completion order.
+    """
+    for symbol in [s for s in symbols if not has_price_range(s)]:
+        print(f"[SCAN] [WARN] No price range configured for {symbol}, skipping")
+    symbols = [s for s in symbols if has_price_range(s)]
+    if not symbols:
+        return []
+
+    jobs = queue.Queue()
+    for symbol in symbols:
+        for timeframe in timeframes:
+            jobs.put((symbol, str(timeframe)))
+    pool_size = max(1, min(pool_size, jobs.qsize()))
+
+    results = []
+    with sync_playwright() as playwright:
+        browser, cdp_endpoint = launch_shared_browser(playwright)
+        started = time.perf_counter()
+        try:
+            workers = [
+                threading.Thread(target=scan_worker, args=(i + 1, jobs, results, cdp_endpoint),
+                                 name=f"SCAN-{i + 1}")
+                for i in range(pool_size)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            browser.close()
+        elapsed = time.perf_counter() - started
+
+    print_scan_results(results, elapsed, pool_size)
+    return results
+
+
+def print_scan_results(results: list, elapsed: float, pool_size: int) -> None:
+    """Print the result table, throughput and per-page latency."""
+    print("\n" + "="*78)
+    print("         SCAN RESULTS")
+    print("="*78)
+    print(f"  {'SYMBOL':<10} {'TF':>4} {'HIGH':>10} {'LOW':>10} {'ENTRY':>10} {'ABOVE':>10} {'BELOW':>10}  STATUS")
+    for row in sorted(results, key=lambda r: (r["symbol"], r["timeframe"])):
+        if row["ok"]:
+            digits = get_price_digits(row["symbol"])
+            prices = " ".join(f"{row[k]:>10.{digits}f}" for k in ("high", "low", "entry", "above", "below"))
+            print(f"  {row['symbol']:<10} {row['timeframe']:>4} {prices}  OK")
+        else:
+            print(f"  {row['symbol']:<10} {row['timeframe']:>4} {'':>54}  FAIL: {row['error']}")
+
+    print("\n  " + "-"*40)
+    done = len(results)
+    rate = done / elapsed * 60 if elapsed > 0 else 0.0
+    print(f"  {done} scans in {elapsed:.1f}s with {pool_size} pages: {rate:.1f} symbols/min")
+    print(f"  {'PAGE':<10} {'SCANS':>5} {'AVG s':>7} {'MAX s':>7}")
+    for worker in sorted({r["worker"] for r in results}):
+        latencies = [r["latency_s"] for r in results if r["worker"] == worker]
+        print(f"  {worker:<10} {len(latencies):>5} {sum(latencies) / len(latencies):>7.1f} {max(latencies):>7.1f}")
+    print("="*78)
+
+
+def write_scan_csv(results: list, path: str) -> None:
+    """Write scan results to CSV."""
+    columns = ["symbol", "timeframe", "ok", "high", "low", "entry", "above", "below",
+               "latency_s", "worker", "error"]
+    with open(path, "w") as f:
+        f.write(",".join(columns) + "\n")
+        for row in results:
+            f.write(",".join(str(row.get(c, "")) for c in columns) + "\n")
+    print(f"Scan results written to {path}")
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    if args and args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    settings = CONFIG["scanner"]
+    positional = [a for i, a in enumerate(args)
+                  if not a.startswith("--") and (i == 0 or args[i - 1] not in ("--pool", "--out"))]
+    symbols = positional[0].split(",") if len(positional) > 0 else settings["symbols"]
+    timeframes = positional[1].split(",") if len(positional) > 1 else settings["timeframes"]
+    pool_size = int(args[args.index("--pool") + 1]) if "--pool" in args else settings["pool_size"]
+
+    results = run_scan(symbols, timeframes, pool_size)
+    if "--out" in args:
+        write_scan_csv(results, args[args.index("--out") + 1])
+
+
+if __name__ == "__main__":
+    main()
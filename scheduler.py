@@ -0,0 +1,389 @@
+"""
+Candle-Close Scheduler
+======================
+Fires the pipeline right after each CONFIG["timeframe"] candle closes,
+so the reference candle is always the one that just closed instead of
+whatever was live when someone started the run.
+
+Boundaries are computed on broker/server time: the offset between the
+local clock and the server is measured from HTTP Date headers before
+every cycle. The browsers stay open between cycles (see daemon.WarmSession);
+CONFIG["schedule"]["prewarm_s"] before each close the MT5 session,
+symbol and chart are re-checked so nothing but extraction and order
+entry happens after the close. Each cycle records how many milliseconds
+after the boundary each order went live (Buy/Sell click).
+
+Usage:
+    python main.py --schedule          # Run until Ctrl+C
+    python scheduler.py                # Same
+    python scheduler.py --cycles 2     # Stop after two candles
+    python scheduler.py --offset       # Only measure the server clock offset
+    python scheduler.py --report       # Order-live latency from the schedule log
+"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import json
+import os
+import sys
+import time
+import urllib.request
+import numpy as np
+from playwright.sync_api import sync_playwright
+
+from config import CONFIG
+from tracing import span, set_workflow, finish_trace
+from browser import setup_browser
+from session_cache import load_session_state
+from mt5_login import login_to_mt5, is_mt5_logged_in
+from mt5_orders import place_orders, select_gold_symbol, close_any_dialogs, submitted_at, order_stamps
+from chart_steps import select_current_candle
+from price_extractor import extract_prices, in_price_range
+from fib_calculator import calculate_fib_levels, print_fib_results
+from daemon import WarmSession
+from latency import LevelsMessage, record_handoff
+
+
+ORDER_TYPES = ("Buy Stop", "Sell Stop")
+
+
+# =============================================================================
+# CLOCK
+# =============================================================================
+
+def read_server_date(url: str) -> tuple:
+    """
+    One HEAD request.
+    Returns: (local_sent, local_received, server_epoch_seconds) — the Date
+    header has whole-second resolution.
+    """
+    request = urllib.request.Request(url, method="HEAD")
+    sent = time.time()
+    with urllib.request.urlopen(request, timeout=5) as response:
+        received = time.time()
+        date = response.headers.get("Date")
+    if not date:
+        raise ValueError("no Date header")
+    return sent, received, parsedate_to_datetime(date).timestamp()
+
+
+def measure_clock_offset(url: str = None, samples: int = None) -> float:
+    """
+    Estimate server time minus local time, in seconds.
+    Each sample bounds the offset to [D - received, D + 1 - sent]; the
+    samples are spread over a few seconds so the whole-second Date values
+    roll over between them, and the bounds are intersected.
+    A fixed CONFIG["schedule"]["clock_offset_ms"] skips the measurement.
+    Returns: offset in seconds (0.0 if the server could not be reached).
+    """
+    settings = CONFIG["schedule"]
+    if settings["clock_offset_ms"] is not None:
+        return settings["clock_offset_ms"] / 1000
+    url = url or settings["clock_url"] or CONFIG["mt5_url"]
+    samples = samples or settings["clock_samples"]
+
+    low, high, mids = float("-inf"), float("inf"), []
+    for i in range(samples):
+        try:
+            sent, received, server = read_server_date(url)
+        except Exception as e:
+            print(f"[SCHED] [WARN] Clock sample failed: {str(e)[:60]}")
+            continue
+        low, high = max(low, server - received), min(high, server + 1 - sent)
+        mids.append(server + 0.5 - (sent + received) / 2)
+        if i + 1 < samples:
+            time.sleep(0.37)  # Not a whole second: samples land on different sub-second phases
+
+    if not mids:
+        print("[SCHED] [WARN] Clock offset unknown, using the local clock")
+        return 0.0
+    if low <= high:
+        return (low + high) / 2
+    return float(np.median(mids))  # Network jitter made the bounds disagree
+
+
+def server_time(offset: float) -> float:
+    """Current server time (epoch seconds) given a measured offset."""
+    return time.time() + offset
+
+
+# =============================================================================
+# BOUNDARIES
+# =============================================================================
+
+def timeframe_seconds(timeframe: str = None) -> int:
+    """TradingView interval ("30", "240", "1D", "1W", "1H") -> seconds."""
+    tf = str(timeframe or CONFIG["timeframe"]).upper()
+    units = {"S": 1, "H": 3600, "D": 86400, "W": 604800}
+    if tf[-1] in units:
+        return int(tf[:-1] or 1) * units[tf[-1]]
+    return int(tf) * 60
+
+
+def next_boundary(now: float, timeframe: str = None) -> float:
+    """
+    Next candle close after `now` (server epoch seconds).
+    Candles are aligned to the broker day, CONFIG["schedule"]["utc_offset_hours"]
+    (only matters for 4H and daily candles).
+    """
+    step = timeframe_seconds(timeframe)
+    shift = CONFIG["schedule"]["utc_offset_hours"] * 3600
+    return (int((now + shift) // step) + 1) * step - shift
+
+
+def format_boundary(boundary: float) -> str:
+    return datetime.fromtimestamp(boundary, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def wait_until(page, deadline: float, offset: float, on_tick=None) -> None:
+    """
+    Block until server time reaches `deadline`.
+    Waits through page.wait_for_timeout so Playwright events (websocket
+    frames, legend bindings) keep being delivered; the last few ms are slept.
+    """
+    while True:
+        remaining = deadline - server_time(offset)
+        if on_tick:
+            on_tick()
+        if remaining <= 0.02:
+            break
+        page.wait_for_timeout(min(remaining - 0.015, 0.25) * 1000)
+    remaining = deadline - server_time(offset)
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+# =============================================================================
+# CYCLE
+# =============================================================================
+
+def prewarm(session: WarmSession) -> None:
+    """Ahead of the close: MT5 logged in, no dialogs, symbol selected, chart at the latest bar."""
+    page = session.mt5_page
+    if not is_mt5_logged_in(page):
+        print("[SCHED] MT5 session dropped, logging in again...")
+        login_to_mt5(page)
+    for mt5_page in (page, session.sell_page):
+        if mt5_page is not None:
+            close_any_dialogs(mt5_page)
+            select_gold_symbol(mt5_page)
+    select_current_candle(session.tv_page)
+    session.tv_page.mouse.move(0, 0)  # Off the chart: the legend follows the live bar, not the cursor
+
+
+class CloseWatcher:
+    """Keeps the last legend candle seen before the boundary (legend fallback)."""
+
+    def __init__(self, legend_cell, boundary: float, offset: float):
+        self.legend_cell = legend_cell
+        self.boundary = boundary
+        self.offset = offset
+        self.candle = None
+
+    def tick(self) -> None:
+        if self.legend_cell is None:
+            return
+        state = self.legend_cell.latest(CONFIG["symbol"], CONFIG["timeframe"])
+        if state and state["received"] + self.offset < self.boundary:
+            self.candle = state
+
+
+def read_closed_candle(session: WarmSession, boundary: float, watcher: CloseWatcher) -> tuple:
+    """
+    High/Low of the candle that closed at `boundary`.
+    Order of preference: the MT5 quote feed's bar (signal_source "mt5"),
+    the captured websocket bar that opened at boundary - timeframe (once
+    the next bar has started), the last legend state seen before the
+    boundary, then a normal extract_prices read.
+    Returns: (high, low, source)
+    """
+    page, feed = session.tv_page, session.bar_feed
+    opened = int(boundary - timeframe_seconds())
+
+    if session.quote_feed is not None:
+        bar = session.quote_feed.bar_at(opened)
+        if bar and bar["complete"] and in_price_range(bar["high"], bar["low"]):
+            return bar["high"], bar["low"], "mt5 quotes"
+        print("[SCHED] [WARN] MT5 quote feed did not see the whole candle")
+
+    if feed is not None:
+        deadline = time.perf_counter() + CONFIG["schedule"]["new_bar_wait_ms"] / 1000
+        while time.perf_counter() < deadline:
+            latest = feed.latest_bar()
+            if latest and latest["time"] >= boundary:
+                break
+            page.wait_for_timeout(20)
+        bar = feed.bar_at(opened)
+        if bar and in_price_range(bar["high"], bar["low"]):
+            return float(bar["high"]), float(bar["low"]), "websocket"
+
+    if watcher.candle:
+        return watcher.candle["high"], watcher.candle["low"], "legend (pre-close)"
+
+    print("[SCHED] [WARN] Closed candle not captured, reading the chart as is")
+    high, low = extract_prices(page, feed, legend_cell=session.legend_cell, allow_manual=False)
+    return high, low, "chart"
+
+
+def run_cycle(session: WarmSession, offset: float) -> dict:
+    """Wait for the next close, pre-warm ahead of it, then extract and place orders."""
+    settings = CONFIG["schedule"]
+    boundary = next_boundary(server_time(offset))
+    print(f"\n[SCHED] Next close {format_boundary(boundary)} "
+          f"(in {boundary - server_time(offset):.0f}s, clock offset {offset * 1000:+.0f} ms)")
+
+    with span("schedule.wait"):
+        wait_until(session.tv_page, boundary - settings["prewarm_s"], offset)
+    with span("schedule.prewarm"):
+        prewarm(session)
+
+    watcher = CloseWatcher(session.legend_cell, boundary, offset)
+    with span("schedule.wait"):
+        wait_until(session.tv_page, boundary + settings["fire_delay_ms"] / 1000, offset, watcher.tick)
+    fired = server_time(offset)
+    session.live_levels.mark_stale("candle closed")
+
+    record = {
+        "boundary": boundary,
+        "boundary_utc": format_boundary(boundary),
+        "timeframe": str(CONFIG["timeframe"]),
+        "offset_ms": round(offset * 1000, 1),
+        "fired_ms": round((fired - boundary) * 1000, 1),
+    }
+    with span("schedule.cycle", boundary=record["boundary_utc"]):
+        high, low, source = read_closed_candle(session, boundary, watcher)
+        record.update({"high": high, "low": low, "source": source,
+                       "levels_ms": round((server_time(offset) - boundary) * 1000, 1)})
+        if not (high and low):
+            print("[SCHED] [FAIL] No High/Low for the closed candle, skipping orders")
+            record["ok"] = False
+            return record
+
+        message = LevelsMessage(calculate_fib_levels(high, low), high, low, candle_close=boundary - offset)
+        message.stamp("extracted")
+        print_fib_results(high, low, message.levels)
+        session.last_levels, session.last_levels_at = message.levels, time.time()
+
+        fire_local = time.time()
+        buy_ok, sell_ok = place_orders(session.mt5_page, message.levels, session.sell_page)
+        message.stamp_orders(order_stamps())
+        record_handoff(message)
+
+    record.update({"ok": buy_ok and sell_ok, "buy_stop": buy_ok, "sell_stop": sell_ok})
+    for order_type in ORDER_TYPES:
+        clicked = submitted_at().get(order_type)
+        live = clicked is not None and clicked >= fire_local
+        record[f"{order_type.lower().replace(' ', '_')}_live_ms"] = (
+            round((clicked + offset - boundary) * 1000, 1) if live else None)
+    return record
+
+
+def print_cycle(record: dict) -> None:
+    """One-line result of a cycle."""
+    def ms(value):
+        return f"+{value:.0f} ms" if value is not None else "-"
+    print(f"[SCHED] {record['boundary_utc']}: H={record.get('high')} L={record.get('low')} "
+          f"({record.get('source', '-')}), levels {ms(record.get('levels_ms'))}, "
+          f"Buy Stop live {ms(record.get('buy_stop_live_ms'))}, "
+          f"Sell Stop live {ms(record.get('sell_stop_live_ms'))} after close")
+
+
+# =============================================================================
+# LOG
+# =============================================================================
+
+def get_log_path() -> str:
+    path = CONFIG["schedule"]["log_file"]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return path
+
+
+def append_log(record: dict) -> None:
+    try:
+        with open(get_log_path(), "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"[SCHED] [WARN] Could not write schedule log: {e}")
+
+
+def print_report() -> None:
+    """p50/p95/max of ms-after-close per order type across the log."""
+    with open(get_log_path()) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    print("\n" + "="*60)
+    print(f"         ORDER LIVE AFTER CANDLE CLOSE ({len(records)} cycles)")
+    print("="*60)
+    print(f"  {'METRIC':<20} {'N':>5} {'P50 ms':>10} {'P95 ms':>10} {'MAX ms':>10}")
+    for key in ("fired_ms", "levels_ms", "buy_stop_live_ms", "sell_stop_live_ms"):
+        values = np.array([r[key] for r in records if r.get(key) is not None])
+        if len(values):
+            print(f"  {key:<20} {len(values):>5} {np.percentile(values, 50):>10.0f} "
+                  f"{np.percentile(values, 95):>10.0f} {values.max():>10.0f}")
+    print("="*60)
+
+
+# =============================================================================
+# ENTRY POINTS
+# =============================================================================
+
+def run_scheduler(cycles: int = None) -> None:
+    """Open both browsers once, then run one cycle per candle close."""
+    print("="*60)
+    print("     GOLD TRADING RPA - CANDLE-CLOSE SCHEDULER")
+    print("="*60)
+    set_workflow("SCHED")
+    cycles = cycles if cycles is not None else CONFIG["schedule"]["max_cycles"]
+
+    with sync_playwright() as playwright:
+        mt5_browser, mt5_context, mt5_page = setup_browser(playwright, load_session_state())
+        tv_browser, tv_context, tv_page = setup_browser(playwright)
+
+        try:
+            session = WarmSession(mt5_page, tv_page)
+            if not session.warm_up():
+                return
+            done = 0
+            while not cycles or done < cycles:
+                offset = measure_clock_offset()
+                record = run_cycle(session, offset)
+                print_cycle(record)
+                append_log(record)
+                finish_trace()
+                done += 1
+        except KeyboardInterrupt:
+            print("\n[SCHED] Stopped")
+        finally:
+            mt5_browser.close()
+            tv_browser.close()
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    if args and args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    if "--offset" in args:
+        offset = measure_clock_offset()
+        url = CONFIG["schedule"]["clock_url"] or CONFIG["mt5_url"]
+        print(f"Server clock offset: {offset * 1000:+.0f} ms ({url})")
+        print(f"Next {CONFIG['timeframe']} close: {format_boundary(next_boundary(server_time(offset)))}")
+        return
+
+    if "--report" in args:
+        try:
+            print_report()
+        except OSError as e:
+            print(f"Could not read schedule log: {e}")
+            sys.exit(1)
+        return
+
+    cycles = int(args[args.index("--cycles") + 1]) if "--cycles" in args else None
+    run_scheduler(cycles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Debug screenshot ring buffer.
+Keeps the last N screenshots in memory and only writes them to disk when
+an order fails or on demand, using a background writer thread so the
+order path never waits on file I/O.
+
+Modes (CONFIG["debug_screenshots"]["mode"]):
+    "ring"   - capture into memory, write on failure / flush (default)
+    "always" - write every frame (via the writer thread)
+    "off"    - no screenshots
+
+page.screenshot itself runs on the Playwright thread, so frames on the
+order path (between levels arriving and the last submit click) are only
+taken in "always" mode; in ring mode place_orders takes one frame per
+page once both orders are submitted.
+"""
+
+from collections import deque
+from datetime import datetime
+import atexit
+import os
+import queue
+import threading
+import time
+
+from config import CONFIG
+
+
+class ScreenshotRing:
+    """Bounded in-memory screenshot buffer with a background disk writer."""
+
+    def __init__(self, settings: dict = None):
+        self.settings = {**CONFIG["debug_screenshots"], **(settings or {})}
+        directory = self.settings["dir"]
+        if not os.path.isabs(directory):
+            directory = os.path.join(os.path.dirname(__file__), directory)
+        self.directory = directory
+        self.frames = deque(maxlen=self.settings["frames"])
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="screenshot-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # -------------------------------------------------------------------------
+    # Capture (Playwright thread)
+    # -------------------------------------------------------------------------
+
+    def capture(self, page, name: str, order_path: bool = False) -> bool:
+        """
+        Grab a frame into the ring. Returns False if disabled, skipped or failed.
+        order_path: frame taken before the last submit click (skipped unless "always").
+        """
+        mode = self.settings["mode"]
+        if mode == "off" or (order_path and mode != "always"):
+            return False
+        options = {"type": self.settings["format"]}
+        if self.settings["format"] == "jpeg":
+            options["quality"] = self.settings["quality"]
+        try:
+            data = page.screenshot(**options)
+        except Exception as e:
+            print(f"[MT5] [WARN] Screenshot failed: {str(e)[:60]}")
+            return False
+
+        with self._lock:
+            self._seq += 1
+            frame = (time.time(), self._seq, name, data)
+            self.frames.append(frame)
+        if mode == "always":
+            self._writes.put([frame])
+        return True
+
+    def flush(self, reason: str = "") -> int:
+        """
+        Hand every buffered frame to the writer and empty the ring.
+        Returns: number of frames queued for writing.
+        """
+        with self._lock:
+            frames = list(self.frames)
+            self.frames.clear()
+        if frames and self.settings["mode"] == "ring":
+            self._writes.put(frames)
+            note = f" ({reason})" if reason else ""
+            print(f"[MT5] Flushing {len(frames)} debug screenshots to {self.directory}{note}")
+            return len(frames)
+        return 0
+
+    # -------------------------------------------------------------------------
+    # Writer thread
+    # -------------------------------------------------------------------------
+
+    def _write_loop(self) -> None:
+        while True:
+            frames = self._writes.get()
+            try:
+                if frames is None:
+                    return
+                os.makedirs(self.directory, exist_ok=True)
+                ext = "jpg" if self.settings["format"] == "jpeg" else "png"
+                for stamp, seq, name, data in frames:
+                    when = datetime.fromtimestamp(stamp).strftime("%Y%m%d-%H%M%S")
+                    path = os.path.join(self.directory, f"{when}_{seq:04d}_{name}.{ext}")
+                    with open(path, "wb") as f:
+                        f.write(data)
+            except OSError as e:
+                print(f"[MT5] [WARN] Could not write screenshots: {e}")
+            finally:
+                self._writes.task_done()
+
+    def wait_for_writes(self) -> None:
+        """Block until everything queued so far is on disk."""
+        self._writes.join()
+
+    def close(self) -> None:
+        """Finish pending writes and stop the writer."""
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join(timeout=10)
+
+
+_ring = None
+_ring_lock = threading.Lock()
+
+
+def get_screenshot_ring() -> ScreenshotRing:
+    """Shared ring for the process."""
+    global _ring
+    with _ring_lock:
+        if _ring is None:
+            _ring = ScreenshotRing()
+        return _ring
+
+
+def capture_screenshot(page, name: str, order_path: bool = False) -> bool:
+    """Capture a debug frame into the shared ring."""
+    return get_screenshot_ring().capture(page, name, order_path)
+
+
+def flush_screenshots(reason: str = "") -> int:
+    """Write the shared ring to disk (on failure or on demand)."""
+    return get_screenshot_ring().flush(reason)
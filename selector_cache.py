@@ -0,0 +1,136 @@
+"""
+Learned selector cache for the MT5 fallback cascades.
+Remembers which selector/strategy worked for each logical target
+(volume input, Buy button, new-order trigger, ...) per terminal URL, tries
+it first next time, and re-learns automatically when it stops matching.
+"""
+
+from urllib.parse import urlsplit
+import json
+import os
+import threading
+
+from config import CONFIG
+
+
+class SelectorCache:
+    """Persisted {terminal: {target: strategy}} map with hit/miss counters."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.strategies = {}
+        self.stats = {}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.strategies = data.get("strategies", {})
+            self.stats = data.get("stats", {})
+        except (OSError, ValueError):
+            self.strategies, self.stats = {}, {}
+
+    def save(self) -> None:
+        try:
+            with self._lock, open(self.path, "w") as f:
+                json.dump({"strategies": self.strategies, "stats": self.stats}, f, indent=2)
+        except OSError as e:
+            print(f"[MT5] [WARN] Could not save selector cache: {e}")
+
+    def get(self, scope: str, target: str) -> str:
+        with self._lock:
+            return self.strategies.get(scope, {}).get(target)
+
+    def record(self, target: str, outcome: str, probes: int = 0, skipped: int = 0) -> None:
+        """Count a hit/miss/learn, the probes spent and the probes skipped."""
+        with self._lock:
+            entry = self.stats.setdefault(target, {"hit": 0, "miss": 0, "learn": 0, "probes": 0, "saved": 0})
+            entry[outcome] += 1
+            entry["probes"] += probes
+            entry["saved"] += skipped
+
+    def learn(self, scope: str, target: str, strategy: str) -> None:
+        with self._lock:
+            self.strategies.setdefault(scope, {})[target] = strategy
+        self.save()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_selector_cache() -> SelectorCache:
+    """Shared cache instance (None if disabled in config)."""
+    global _cache
+    if not CONFIG.get("selector_cache", False):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = CONFIG["selector_cache_file"]
+            if not os.path.isabs(path):
+                path = os.path.join(os.path.dirname(__file__), path)
+            _cache = SelectorCache(path)
+    return _cache
+
+
+def terminal_key(url: str) -> str:
+    """Cache scope for a terminal page: host + path, no query/fragment."""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}" or url
+
+
+def attempt(fn) -> bool:
+    try:
+        return bool(fn())
+    except Exception:
+        return False
+
+
+def run_cascade(page, target: str, strategies: list) -> str:
+    """
+    Try (key, fn) strategies in order until one returns True.
+    With the cache on, the learned strategy for this terminal goes first;
+    if it misses, the rest are tried and the winner is learned.
+    Returns: key of the strategy that worked, or None.
+    """
+    cache = get_selector_cache()
+    if cache is None:
+        for key, fn in strategies:
+            if attempt(fn):
+                return key
+        return None
+
+    scope = terminal_key(page.url)
+    cached = cache.get(scope, target)
+    keys = [key for key, _ in strategies]
+
+    if cached in keys:
+        position = keys.index(cached)
+        if attempt(strategies[position][1]):
+            cache.record(target, "hit", probes=1, skipped=position)
+            return cached
+        cache.record(target, "miss", probes=1)
+        strategies = [s for s in strategies if s[0] != cached]
+
+    for probes, (key, fn) in enumerate(strategies, start=1):
+        if attempt(fn):
+            cache.record(target, "learn", probes=probes)
+            cache.learn(scope, target, key)
+            return key
+    return None
+
+
+def print_selector_stats() -> None:
+    """Print per-target hit/miss counts and probes saved."""
+    cache = get_selector_cache()
+    if cache is None or not cache.stats:
+        return
+    cache.save()
+    print("\n  " + "-"*58)
+    print("  SELECTOR CACHE")
+    print("  " + "-"*58)
+    print(f"  {'TARGET':<20} {'HIT':>5} {'MISS':>5} {'LEARN':>6} {'PROBES':>7} {'SAVED':>6}")
+    for target, s in sorted(cache.stats.items()):
+        print(f"  {target:<20} {s['hit']:>5} {s['miss']:>5} {s['learn']:>6} {s['probes']:>7} {s['saved']:>6}")
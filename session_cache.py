@@ -0,0 +1,65 @@
+"""
+MT5 session cache.
+Persists the browser context's storage state (cookies + localStorage)
+after a successful login so the next run can skip the login form.
+Each account in CONFIG["mt5_accounts"] gets its own file.
+"""
+
+from playwright.sync_api import BrowserContext
+import os
+
+from config import CONFIG
+
+
+def session_enabled() -> bool:
+    """Check if the opt-in session cache is turned on."""
+    return bool(CONFIG.get("mt5_session_cache", False))
+
+
+def get_session_path(account: str = None) -> str:
+    """Get the absolute path of the session file (mt5_session_<account>.json per account)."""
+    path = CONFIG["mt5_session_file"]
+    if account:
+        root, ext = os.path.splitext(path)
+        path = f"{root}_{account}{ext}"
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return path
+
+
+def load_session_state(account: str = None):
+    """
+    Get the saved storage state for a new context.
+    Returns: path to the session file, or None if disabled/missing.
+    """
+    if not session_enabled():
+        return None
+    path = get_session_path(account)
+    if os.path.exists(path):
+        print(f"[MT5] Reusing saved session: {path}")
+        return path
+    return None
+
+
+def save_session_state(context: BrowserContext, account: str = None) -> bool:
+    """Save the context's storage state after a successful login."""
+    if not session_enabled():
+        return False
+    path = get_session_path(account)
+    try:
+        context.storage_state(path=path)
+        print(f"[MT5] Session saved to {path}")
+        return True
+    except Exception as e:
+        print(f"[MT5] [WARN] Could not save session: {str(e)[:60]}")
+        return False
+
+
+def clear_session_state(account: str = None) -> None:
+    """Delete an expired session file."""
+    path = get_session_path(account)
+    try:
+        os.remove(path)
+        print("[MT5] Expired session cleared")
+    except OSError:
+        pass
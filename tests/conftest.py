@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+# Modules live at the repository root (no package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeLocator:
+    """Locator over the selectors a FakePage shows."""
+
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    def count(self):
+        return self.page.reply(lambda: 1 if self.selector in self.page.visible else 0)
+
+    def wait_for(self, state="visible", timeout=None):
+        def wait():
+            if self.selector not in self.page.visible:
+                raise TimeoutError(self.selector)
+        return self.page.reply(wait)
+
+    def text_content(self):
+        return self.page.reply(lambda: self.page.visible[self.selector])
+
+
+class FakePage:
+    """
+    Page showing a fixed set of selectors ({selector: text}).
+    With is_async=True every call returns a coroutine, like async_playwright.
+    """
+
+    def __init__(self, visible=None, is_async=False):
+        self.visible = visible or {}
+        self.is_async = is_async
+
+    def reply(self, func):
+        if not self.is_async:
+            return func()
+
+        async def call():
+            return func()
+        return call()
+
+    def goto(self, url, wait_until=None):
+        return self.reply(lambda: None)
+
+    def wait_for_selector(self, selector, state="visible", timeout=None):
+        def wait():
+            if not any(part.strip() in self.visible for part in selector.split(", ")):
+                raise TimeoutError(selector)
+        return self.reply(wait)
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+
+@pytest.fixture
+def fake_page():
+    """Factory: fake_page({selector: text}, is_async=False)."""
+    return FakePage
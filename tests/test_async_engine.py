@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+import async_engine
+import mt5_orders
+from config import CONFIG
+from mt5_orders import order_outcome
+
+
+@pytest.fixture
+def session_file(monkeypatch, tmp_path):
+    path = tmp_path / "mt5_session.json"
+    path.write_text("{}")
+    monkeypatch.setitem(CONFIG, "mt5_session_cache", True)
+    monkeypatch.setitem(CONFIG, "mt5_session_file", str(path))
+    monkeypatch.setitem(CONFIG, "timeouts", dict(CONFIG["timeouts"], login_form=0, login_complete=0))
+    return path
+
+
+def test_order_outcome():
+    assert order_outcome(" Order placed ") is True
+    assert order_outcome("Not enough money") is False
+    assert order_outcome("") is None
+
+
+def test_login_keeps_valid_session(session_file, fake_page):
+    page = fake_page({async_engine.MARKET_WATCH_SEARCH: ""}, is_async=True)
+    assert asyncio.run(async_engine.login_to_mt5(page)) is True
+    assert session_file.exists()
+
+
+def test_login_clears_expired_session(session_file, fake_page):
+    # Login form shown although a session was loaded: it expired
+    page = fake_page({async_engine.LOGIN_INPUT: ""}, is_async=True)
+    page.fill = page.press = lambda *args: asyncio.sleep(0)
+    assert asyncio.run(async_engine.login_to_mt5(page)) is False  # Market Watch never renders
+    assert not session_file.exists()
+
+
+def verify_sync(page):
+    return mt5_orders.verify_by_text(page)
+
+
+def verify_async(page):
+    return asyncio.run(async_engine.verify_by_text(page))
+
+
+@pytest.mark.parametrize("verify, is_async", [(verify_sync, False), (verify_async, True)],
+                         ids=["sync", "async"])
+@pytest.mark.parametrize("text, confirmed", [
+    (None, False),  # No confirmation within the timeout
+    ("Not enough money", False),
+    ("Invalid", False),
+    ("Order placed", True),
+    ("Done", True),
+])
+def test_confirmation_texts(monkeypatch, fake_page, verify, is_async, text, confirmed):
+    monkeypatch.setitem(CONFIG, "timeouts", dict(CONFIG["timeouts"], dialog=0))
+    page = fake_page({} if text is None else {mt5_orders.OUTCOME_SELECTOR: text}, is_async=is_async)
+    assert verify(page) is confirmed
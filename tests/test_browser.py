@@ -0,0 +1,37 @@
+import pytest
+
+from browser import read_devtools_port
+
+
+class FakeSession:
+    def __init__(self, arguments):
+        self.arguments = arguments
+        self.detached = False
+
+    def send(self, method):
+        assert method == "Browser.getBrowserCommandLine"
+        return {"arguments": self.arguments}
+
+    def detach(self):
+        self.detached = True
+
+
+class FakeBrowser:
+    def __init__(self, arguments):
+        self.session = FakeSession(arguments)
+
+    def new_browser_cdp_session(self):
+        return self.session
+
+
+def test_reads_port_bound_by_browser(tmp_path):
+    (tmp_path / "DevToolsActivePort").write_text("41234\n/devtools/browser/abc\n")
+    browser = FakeBrowser(["--enable-automation", f"--user-data-dir={tmp_path}", "--remote-debugging-port=0"])
+    assert read_devtools_port(browser) == 41234
+    assert browser.session.detached
+
+
+def test_missing_port_file_times_out(tmp_path):
+    browser = FakeBrowser([f"--user-data-dir={tmp_path}"])
+    with pytest.raises(RuntimeError):
+        read_devtools_port(browser, timeout=0.1)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from candle_store import CandleSeries, COLUMNS, WRITE_ORDER
+
+
+def bars(times):
+    times = np.asarray(times, dtype=np.int64)
+    prices = times.astype(np.float64)
+    return {"time": times, "open": prices, "high": prices + 0.5, "low": prices - 0.5,
+            "close": prices, "volume": np.ones(len(times))}
+
+
+def test_append_skips_old_and_duplicate_bars(tmp_path):
+    series = CandleSeries(str(tmp_path), "XAUUSD", "30")
+    assert series.append(bars([3, 1, 2, 2])) == 3
+    assert series.append(bars([2, 3, 4])) == 1
+    assert list(series.columns()["time"]) == [1, 2, 3, 4]
+
+
+def test_interrupted_append_does_not_misalign_columns(tmp_path):
+    series = CandleSeries(str(tmp_path), "XAUUSD", "30")
+    series.append(bars([1, 2, 3]))
+
+    # Crash after every column but time was written for bar 4
+    partial = bars([4])
+    for name in WRITE_ORDER[:-1]:
+        with open(series.column_path(name), "ab") as f:
+            f.write(np.asarray(partial[name], dtype=COLUMNS[name]).tobytes())
+    assert len(series) == 3
+
+    series.append(bars([5, 6]))
+    cols = series.columns()
+    assert list(cols["time"]) == [1, 2, 3, 5, 6]
+    assert list(cols["open"]) == [1.0, 2.0, 3.0, 5.0, 6.0]
+    assert list(cols["volume"]) == [1.0] * 5
@@ -0,0 +1,65 @@
+import json
+import socket
+
+import pytest
+
+import daemon
+from daemon import WarmSession, serve_connection
+
+
+class FakePage:
+    url = "about:blank"
+
+    def is_closed(self):
+        return False
+
+
+def request(session, payload: bytes) -> tuple:
+    server, client = socket.socketpair()
+    client.sendall(payload)
+    stop = serve_connection(session, server)
+    response = json.loads(client.makefile().readline())
+    client.close()
+    return stop, response
+
+
+def test_non_object_request_is_rejected():
+    session = WarmSession(FakePage(), FakePage())
+    for payload in (b"[1, 2]\n", b"42\n", b"not json\n", b'{"cmd": ["status"]}\n'):
+        stop, response = request(session, payload)
+        assert stop is False
+        assert response["ok"] is False
+
+
+def test_status_and_stop():
+    session = WarmSession(FakePage(), FakePage())
+    stop, response = request(session, b'{"cmd": "status"}\n')
+    assert not stop and response["ok"]
+    stop, response = request(session, b'{"cmd": "stop"}\n')
+    assert stop and response["stopping"]
+
+
+def test_unreadable_candle_places_no_orders(monkeypatch):
+    calls = []
+    monkeypatch.setattr(daemon, "select_current_candle", lambda page: None)
+    monkeypatch.setattr(daemon, "extract_prices",
+                        lambda *a, **kw: calls.append(kw) or (None, None))
+    monkeypatch.setattr(daemon, "place_orders", lambda *a: pytest.fail("orders placed"))
+
+    result = WarmSession(FakePage(), FakePage()).place()
+    assert result["ok"] is False
+    assert calls[0]["allow_manual"] is False
+
+
+def test_levels_from_resident_quote_feed(monkeypatch):
+    import mt5_signal
+    from latency import LevelsMessage
+
+    levels = {"0.5 (Entry/Red)": 2651.0}
+    monkeypatch.setattr(mt5_signal, "read_mt5_levels",
+                        lambda page, feed: LevelsMessage(levels, 2652.0, 2650.0))
+    monkeypatch.setattr(daemon, "extract_prices", lambda *a, **kw: pytest.fail("chart read"))
+    session = WarmSession(FakePage(), FakePage())
+    session.quote_feed = object()
+    result = session.compute_levels()
+    assert result["ok"] and (result["high"], result["low"], result["levels"]) == (2652.0, 2650.0, levels)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from config import CONFIG
+from fib_calculator import calculate_fib_levels, calculate_trade_arrays
+from mt5_orders import buy_stop_prices, sell_stop_prices
+
+
+def live_and_batch(high, low):
+    arrays = calculate_trade_arrays(np.array([high]), np.array([low]))
+    levels = calculate_fib_levels(high, low)
+    live = buy_stop_prices(levels) + sell_stop_prices(levels)
+    batch = tuple(float(arrays[k][0]) for k in ("buy_tp", "buy_sl", "sell_tp", "sell_sl"))
+    return live, batch
+
+
+def test_live_prices_match_batch_engine():
+    live, batch = live_and_batch(2652.40, 2641.10)
+    assert live == batch
+    assert live == pytest.approx((2658.05, 2646.75, 2635.45, 2646.75))
+
+
+def test_live_prices_follow_config(monkeypatch):
+    monkeypatch.setitem(CONFIG, "buy_stop", dict(CONFIG["buy_stop"], tp_level="2", sl_level="0"))
+    monkeypatch.setitem(CONFIG, "sell_stop", dict(CONFIG["sell_stop"], tp_level="-1", sl_level="1"))
+    live, batch = live_and_batch(2652.40, 2641.10)
+    assert live == batch
+    assert live == pytest.approx((2663.70, 2641.10, 2629.80, 2652.40))
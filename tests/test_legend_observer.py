@@ -0,0 +1,31 @@
+from legend_observer import LegendCell, legend_shows
+from price_extractor import extract_from_legend_cell
+
+
+def push(cell, symbol, interval, high, low):
+    cell.on_update(None, {"text": f"{symbol} · {interval} · OANDA O{low} H{high} L{low} C{high}", "ts": 0})
+
+
+def test_legend_shows():
+    text = "XAUUSD · 30 · OANDA O2650.1 H2655.0 L2648.2 C2651.0"
+    assert legend_shows(text, "OANDA:XAUUSD", "30")
+    assert not legend_shows(text, "EURUSD", "30")
+    assert not legend_shows(text, "XAUUSD", "3")
+    assert not legend_shows(text, "XAUUSD", "60")
+
+
+def test_previous_interval_is_not_read_as_new_candle():
+    cell = LegendCell()
+    push(cell, "XAUUSD", "30", 2655.0, 2648.0)
+    assert extract_from_legend_cell(cell, "XAUUSD", "30") == (2655.0, 2648.0)
+    # Chart switched to 60 but the legend has not updated yet
+    assert extract_from_legend_cell(cell, "XAUUSD", "60") == (None, None)
+    push(cell, "XAUUSD", "60", 2660.0, 2640.0)
+    assert extract_from_legend_cell(cell, "XAUUSD", "60") == (2660.0, 2640.0)
+
+
+def test_previous_symbol_is_not_read():
+    cell = LegendCell()
+    push(cell, "XAUUSD", "30", 2655.0, 2648.0)
+    assert cell.latest("XAGUSD", "30") is None
+    assert cell.latest()["high"] == 2655.0
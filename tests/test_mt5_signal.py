@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+import mt5_signal
+from config import CONFIG
+from mt5_signal import QuoteBars, attach_quote_feed, parse_quote, read_mt5_levels
+
+
+class FakePage:
+    def wait_for_timeout(self, ms):
+        pass
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setitem(CONFIG, "mt5_signal", dict(CONFIG["mt5_signal"], candle="current", max_wait_s=0))
+    monkeypatch.setitem(CONFIG, "timeouts", dict(CONFIG["timeouts"], quote_feed=0))
+    return CONFIG["mt5_signal"]
+
+
+def quote(feed, bid):
+    feed.on_quote(None, {"text": f"{feed.symbol} {bid:.2f} {bid + 0.3:.2f}"})
+
+
+def test_parse_quote():
+    assert parse_quote("GOLD.i#\t2650.12\t2650.40", "GOLD.i#") == (2650.12, 2650.40)
+    assert parse_quote("US30Cash 42,000.5 42,001.0", "US30Cash") == (42000.5, 42001.0)
+    assert parse_quote("GOLD.i#", "GOLD.i#") == (None, None)
+
+
+def test_bar_aggregates_quotes(settings):
+    feed = QuoteBars("GOLD.i#", "30")
+    for bid in (2650.0, 2652.0, 2649.0):
+        quote(feed, bid)
+    bar = feed.reference_bar()
+    assert (bar["open"], bar["high"], bar["low"], bar["close"], bar["ticks"]) == (2650.0, 2652.0, 2649.0, 2649.0, 3)
+    assert bar["complete"] is False  # Feed started after the bar opened
+
+
+def test_partial_candle_is_refused_by_default(settings):
+    feed = QuoteBars("GOLD.i#", "30")
+    quote(feed, 2650.0)
+    quote(feed, 2652.0)
+    assert read_mt5_levels(FakePage(), feed) is None
+
+
+def test_partial_candle_allowed_on_opt_in(settings):
+    settings["allow_partial"] = True
+    feed = QuoteBars("GOLD.i#", "30")
+    quote(feed, 2650.0)
+    quote(feed, 2652.0)
+    message = read_mt5_levels(FakePage(), feed)
+    assert (message.high, message.low) == (2652.0, 2650.0)
+
+
+def test_complete_candle_is_used(settings):
+    feed = QuoteBars("GOLD.i#", "30")
+    quote(feed, 2650.0)
+    quote(feed, 2652.0)
+    feed.started = feed.bar_open(time.time()) - 1  # Resident feed (daemon/scheduler) running since before the bar opened
+    message = read_mt5_levels(FakePage(), feed)
+    assert message is not None and "extracted" in message.stamps
+
+
+class FakeClock:
+    """time.time / perf_counter / monotonic that only move when the page waits."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    perf_counter = monotonic = time
+
+
+class QuotingPage:
+    """Terminal page whose Market Watch row ticks on every wait."""
+
+    url = "https://mt5.example/terminal"
+
+    def __init__(self, clock, symbol="GOLD.i#"):
+        self.clock = clock
+        self.symbol = symbol
+        self.binding = None
+        self.bid = 2650.0
+
+    def expose_binding(self, name, callback):
+        self.binding = callback
+
+    def add_init_script(self, script):
+        pass
+
+    def evaluate(self, script, arg=None):
+        pass
+
+    def wait_for_timeout(self, ms):
+        self.clock.now += ms / 1000
+        self.bid += 0.01
+        self.binding(None, {"text": f"{self.symbol} {self.bid:.2f} {self.bid + 0.3:.2f}"})
+
+
+def test_feed_attached_at_run_start_yields_a_complete_candle(monkeypatch):
+    # Default candle ("last_closed") and max_wait_s, as shipped
+    monkeypatch.setitem(CONFIG, "mt5_signal", dict(CONFIG["mt5_signal"], server_clock=False))
+    clock = FakeClock(1_700_000_000 + 600.0)  # 10 minutes into a 30-minute bar
+    monkeypatch.setattr(mt5_signal, "time", clock)
+    page = QuotingPage(clock)
+
+    feed = attach_quote_feed(page)
+    message = read_mt5_levels(page, feed)
+    assert message is not None
+    bar_open = feed.bar_open(1_700_000_600.0) + feed.step  # First bar seen from its open
+    bar = feed.bar_at(bar_open)
+    assert bar["complete"] and (message.high, message.low) == (bar["high"], bar["low"])
+    assert clock.now >= bar_open + feed.step  # Read only after that bar closed
@@ -0,0 +1,58 @@
+import pytest
+
+from order_book import OrderBook
+
+
+def row(ticket, type_="Buy Stop", volume="0.01", sl="2640.00", tp="2660.00", symbol="GOLD.i#"):
+    return {"ticket": ticket, "type": type_, "symbol": symbol, "volume": volume, "sl": sl, "tp": tp}
+
+
+@pytest.fixture
+def book():
+    book = OrderBook("GOLD.i#")
+    book.on_update(None, {"upserts": [row("100")], "removed": [], "snapshot": True})
+    return book
+
+
+def test_snapshot_marks_book_live(book):
+    assert book.live
+    assert [r["ticket"] for r in book.orders()] == ["100"]
+
+
+def test_pre_existing_row_is_not_a_confirmation(book):
+    # Same order as a row that was already in the table when the index attached
+    book.expect("Buy Stop", 0.01, 2640.0, 2660.0)
+    assert book.confirmed("Buy Stop") is None
+
+
+def test_new_row_confirms_expected_order(book):
+    book.expect("Buy Stop", 0.01, 2640.0, 2660.0)
+    book.on_update(None, {"upserts": [row("101", volume="0.01", sl="2,640.0", tp="2660")], "removed": []})
+    assert book.confirmed("Buy Stop")["ticket"] == "101"
+    assert book.confirmed("Sell Stop") is None
+
+
+def test_mismatched_row_does_not_confirm(book):
+    book.expect("Buy Stop", 0.01, 2640.0, 2660.0)
+    book.on_update(None, {"upserts": [row("101", sl="2639.00")], "removed": []})
+    assert book.confirmed("Buy Stop") is None
+
+
+def test_edited_pre_existing_row_stays_old(book):
+    book.on_update(None, {"upserts": [row("100", tp="2670.00")], "removed": []})
+    book.expect("Buy Stop", 0.01, 2640.0, 2670.0)
+    assert book.confirmed("Buy Stop") is None
+
+
+def test_removed_ticket_is_dropped(book):
+    book.expect("Buy Stop", 0.01, 2640.0, 2660.0)
+    book.on_update(None, {"upserts": [row("101")], "removed": []})
+    book.on_update(None, {"upserts": [], "removed": ["101"]})
+    assert book.get("101") is None
+    assert book.confirmed("Buy Stop") is None
+
+
+def test_snapshot_drops_missing_tickets(book):
+    book.on_update(None, {"upserts": [row("101")], "removed": []})
+    book.on_update(None, {"upserts": [row("101")], "removed": [], "snapshot": True})
+    assert [r["ticket"] for r in book.orders()] == ["101"]
@@ -0,0 +1,53 @@
+import pytest
+
+import price_extractor
+from config import CONFIG
+from price_extractor import extract_prices
+
+
+class FakeMouse:
+    def move(self, x, y):
+        pass
+
+
+class FakePage:
+    viewport_size = None
+    mouse = FakeMouse()
+
+    def evaluate(self, script, arg=None):
+        return None
+
+    def wait_for_timeout(self, ms):
+        pass
+
+
+class FakeBarFeed:
+    def __init__(self, bar):
+        self.bar = bar
+
+    def latest_bar(self, symbol=None, interval=None):
+        return self.bar
+
+
+@pytest.fixture
+def chart(monkeypatch):
+    """Chart legend/data window reads H=2652 L=2650."""
+    monkeypatch.setattr(price_extractor.time, "sleep", lambda s: None)
+    monkeypatch.setattr(price_extractor, "extract_scoped", lambda page, symbol=None: {
+        "high": 2652.0, "low": 2650.0, "date": None, "time": None, "source": "legend"})
+
+
+def test_network_bar_used_for_current_candle(chart):
+    feed = FakeBarFeed({"time": 0, "high": 2660.0, "low": 2655.0})
+    assert extract_prices(FakePage(), feed) == (2660.0, 2655.0)
+
+
+def test_target_candle_is_not_read_from_network(chart, monkeypatch):
+    monkeypatch.setitem(CONFIG, "use_current_candle", False)
+    feed = FakeBarFeed({"time": 0, "high": 2660.0, "low": 2655.0})
+    assert extract_prices(FakePage(), feed) == (2652.0, 2650.0)
+
+
+def test_out_of_range_network_bar_is_rejected(chart):
+    feed = FakeBarFeed({"time": 0, "high": 26.6, "low": 26.5})  # e.g. another symbol's series
+    assert extract_prices(FakePage(), feed) == (2652.0, 2650.0)
@@ -0,0 +1,30 @@
+import pytest
+
+import scanner
+from config import CONFIG
+from price_extractor import has_price_range, in_price_range
+
+
+def test_configured_symbols_have_ranges():
+    for symbol in CONFIG["scanner"]["symbols"]:
+        assert has_price_range(symbol), symbol
+    assert in_price_range(1.0850, 1.0810, "EURUSD")
+    assert not in_price_range(2650.0, 2640.0, "EURUSD")
+
+
+def test_symbols_without_range_are_skipped(monkeypatch):
+    monkeypatch.setattr(scanner, "sync_playwright", lambda: pytest.fail("browser launched"))
+    assert scanner.run_scan(["US30", "btcusd"], ["30"], 2) == []
+
+
+def test_results_keep_each_symbols_digits(capsys):
+    rows = [
+        {"symbol": "EURUSD", "timeframe": "30", "ok": True, "high": 1.08534, "low": 1.08112,
+         "entry": 1.08112, "above": 1.08745, "below": 1.07901, "worker": "SCAN-1", "latency_s": 1.0},
+        {"symbol": "XAUUSD", "timeframe": "30", "ok": True, "high": 2651.4, "low": 2640.0,
+         "entry": 2640.0, "above": 2657.1, "below": 2634.3, "worker": "SCAN-1", "latency_s": 1.0},
+    ]
+    scanner.print_scan_results(rows, 2.0, 1)
+    out = capsys.readouterr().out
+    assert "1.08534" in out and "1.07901" in out
+    assert "2651.40" in out and "2651.400" not in out
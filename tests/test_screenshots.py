@@ -0,0 +1,56 @@
+from screenshots import ScreenshotRing
+
+
+class FakePage:
+    def __init__(self):
+        self.shots = 0
+
+    def screenshot(self, **options):
+        self.shots += 1
+        return b"frame"
+
+
+def test_ring_skips_order_path_frames(tmp_path):
+    ring = ScreenshotRing({"mode": "ring", "dir": str(tmp_path)})
+    page = FakePage()
+    assert ring.capture(page, "Buy_Stop_before_submit", order_path=True) is False
+    assert ring.capture(page, "Buy_Stop_after_submit") is True
+    assert page.shots == 1
+    assert [frame[2] for frame in ring.frames] == ["Buy_Stop_after_submit"]
+    ring.close()
+
+
+def test_always_captures_order_path_frames(tmp_path):
+    ring = ScreenshotRing({"mode": "always", "dir": str(tmp_path)})
+    page = FakePage()
+    assert ring.capture(page, "Buy_Stop_before_submit", order_path=True) is True
+    ring.wait_for_writes()
+    assert len(list(tmp_path.iterdir())) == 1
+    ring.close()
+
+
+def test_no_screenshot_before_last_submit(monkeypatch, tmp_path):
+    import mt5_orders
+    import screenshots
+
+    events = []
+    page = FakePage()
+    page.screenshot = lambda **options: events.append("screenshot") or b"frame"
+    page.wait_for_timeout = lambda ms: None
+    ring = ScreenshotRing({"mode": "ring", "dir": str(tmp_path)})
+    monkeypatch.setattr(screenshots, "_ring", ring)
+    def select_gold_symbol(page, order_path=False):
+        mt5_orders.take_debug_screenshot(page, "03_symbol_selected", order_path)
+        return True
+    monkeypatch.setattr(mt5_orders, "select_gold_symbol", select_gold_symbol)
+    monkeypatch.setattr(mt5_orders, "close_any_dialogs", lambda page: False)
+    for name in ("place_buy_stop", "place_sell_stop"):
+        def place(page, levels, name=name):
+            mt5_orders.take_debug_screenshot(page, f"{name}_after_submit", order_path=True)
+            events.append(name)
+            return True
+        monkeypatch.setattr(mt5_orders, name, place)
+
+    assert mt5_orders.place_orders(page, {"level": 1.0}) == (True, True)
+    assert events == ["place_buy_stop", "place_sell_stop", "screenshot"]
+    ring.close()
@@ -0,0 +1,38 @@
+import json
+from collections import deque
+
+import tracing
+from config import CONFIG
+from daemon import WarmSession
+from tracing import span, get_spans
+
+
+class FakePage:
+    url = "about:blank"
+
+    def is_closed(self):
+        return False
+
+
+def test_buffer_is_bounded(monkeypatch):
+    monkeypatch.setitem(CONFIG, "tracing", True)
+    monkeypatch.setattr(tracing, "_spans", deque(maxlen=3))
+    for i in range(5):
+        with span(f"step{i}"):
+            pass
+    assert [r["name"] for r in get_spans()] == ["step2", "step3", "step4"]
+
+
+def test_daemon_exports_per_command(monkeypatch, tmp_path):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setitem(CONFIG, "tracing", True)
+    monkeypatch.setitem(CONFIG, "trace_file", str(path))
+    monkeypatch.setattr(tracing, "_spans", deque(maxlen=100))
+
+    session = WarmSession(FakePage(), FakePage())
+    for _ in range(2):
+        with span("command"):
+            pass
+        session.handle({"cmd": "status"})
+        assert get_spans() == []
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["command", "command"]
@@ -0,0 +1,232 @@
+"""
+Step Timing Spans
+=================
+Lightweight tracing for the TradingView and MT5 workflows. Each traced
+step records a span with wall-clock start/end, duration, thread and
+workflow labels, and its parent span (spans nest per thread / asyncio task).
+
+At the end of a run (per cycle for the scheduler, per command for the
+daemon) the spans are appended to a JSONL trace file (CONFIG["trace_file"]),
+one span per line, tagged with a run id. Until then at most
+CONFIG["trace_max_spans"] are buffered; the oldest are dropped first.
+
+Usage:
+    python tracing.py                 # p50/p95 per step across all runs in the trace file
+    python tracing.py traces.jsonl    # same, for another file
+    python tracing.py --last          # only the most recent run
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+import numpy as np
+
+from config import CONFIG
+
+
+RUN_ID = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+_spans = deque(maxlen=CONFIG["trace_max_spans"])
+_spans_lock = threading.Lock()
+_ids = itertools.count(1)
+_stack = ContextVar("trace_stack", default=())
+_workflow = ContextVar("trace_workflow", default=None)
+
+
+def tracing_enabled() -> bool:
+    return CONFIG.get("tracing", False)
+
+
+def set_workflow(name: str) -> None:
+    """Label every span started from here on (this thread / task) with a workflow."""
+    _workflow.set(name)
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Time a block as a span; nested spans record their parent."""
+    if not tracing_enabled():
+        yield None
+        return
+
+    with _spans_lock:
+        span_id = next(_ids)
+    stack = _stack.get()
+    record = {
+        "run": RUN_ID,
+        "id": span_id,
+        "parent": stack[-1] if stack else None,
+        "depth": len(stack),
+        "name": name,
+        "thread": threading.current_thread().name,
+        "workflow": _workflow.get() or threading.current_thread().name,
+        "start": time.time(),
+        "ok": True,
+    }
+    if labels:
+        record["labels"] = labels
+    token = _stack.set(stack + (span_id,))
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record["ok"] = False
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        record["end"] = record["start"] + record["duration_ms"] / 1000
+        _stack.reset(token)
+        with _spans_lock:
+            _spans.append(record)
+
+
+def traced(name: str = None):
+    """Decorator: run the function inside a span named after it."""
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def get_spans() -> list:
+    """Spans finished so far in this process."""
+    with _spans_lock:
+        return list(_spans)
+
+
+def get_trace_path(path: str = None) -> str:
+    path = path or CONFIG["trace_file"]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return path
+
+
+def export_trace(path: str = None) -> int:
+    """
+    Append this run's finished spans to the JSONL trace and clear them.
+    Returns: number of spans written.
+    """
+    with _spans_lock:
+        spans = list(_spans)
+        _spans.clear()
+    if not spans:
+        return 0
+    path = get_trace_path(path)
+    try:
+        with open(path, "a") as f:
+            for record in sorted(spans, key=lambda r: r["start"]):
+                f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"[TRACE] [WARN] Could not write trace: {e}")
+        return 0
+    return len(spans)
+
+
+def load_trace(path: str = None) -> list:
+    """Read every span from a JSONL trace."""
+    spans = []
+    with open(get_trace_path(path)) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    return spans
+
+
+def summarize(spans: list) -> list:
+    """
+    Per-step duration stats.
+    Returns: rows of {"name", "count", "runs", "p50", "p95", "max", "total"} (ms),
+    slowest p95 first.
+    """
+    by_name = {}
+    for record in spans:
+        by_name.setdefault(record["name"], []).append(record)
+
+    rows = []
+    for name, records in by_name.items():
+        durations = np.array([r["duration_ms"] for r in records])
+        rows.append({
+            "name": name,
+            "count": len(durations),
+            "runs": len({r["run"] for r in records}),
+            "p50": float(np.percentile(durations, 50)),
+            "p95": float(np.percentile(durations, 95)),
+            "max": float(durations.max()),
+            "total": float(durations.sum()),
+        })
+    return sorted(rows, key=lambda r: r["p95"], reverse=True)
+
+
+def print_summary(spans: list, title: str = "STEP TIMINGS") -> None:
+    """Print the p50/p95 table for a set of spans."""
+    rows = summarize(spans)
+    if not rows:
+        return
+    print("\n" + "="*78)
+    print(f"         {title}")
+    print("="*78)
+    print(f"  {'STEP':<28} {'N':>5} {'RUNS':>5} {'P50 ms':>10} {'P95 ms':>10} {'MAX ms':>10}")
+    for row in rows:
+        print(f"  {row['name']:<28} {row['count']:>5} {row['runs']:>5} "
+              f"{row['p50']:>10.1f} {row['p95']:>10.1f} {row['max']:>10.1f}")
+    print("="*78)
+
+
+def finish_trace(summary: bool = True) -> None:
+    """
+    End of run: print this run's step table and append it to the trace file.
+    summary: False skips the table (daemon commands).
+    """
+    if not tracing_enabled():
+        return
+    spans = get_spans()
+    if not spans:
+        return
+    if summary:
+        print_summary(spans, f"STEP TIMINGS (run {RUN_ID})")
+    written = export_trace()
+    if written:
+        print(f"[TRACE] {written} spans appended to {get_trace_path()}")
+
+
+def main():
+    """Command line entry point."""
+    args = sys.argv[1:]
+    if args and args[0] in ("--help", "-h"):
+        print(__doc__)
+        return
+
+    files = [a for a in args if not a.startswith("--")]
+    try:
+        spans = load_trace(files[0] if files else None)
+    except OSError as e:
+        print(f"Could not read trace: {e}")
+        sys.exit(1)
+
+    if "--last" in args and spans:
+        last_run = max(spans, key=lambda r: r["start"])["run"]
+        spans = [r for r in spans if r["run"] == last_run]
+
+    runs = len({r["run"] for r in spans})
+    print_summary(spans, f"STEP TIMINGS ({runs} runs, {len(spans)} spans)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,43 +4,66 @@ Reusable across different automation scripts.
 """
 
 from playwright.sync_api import Page
-import time
+
+from config import CONFIG
+from waits import wait_for_chart_focus
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+STATUS_OVERLAY_JS = """
+    const box = document.createElement('div');
+    box.id = 'rpa-status';
+    box.style.cssText = `
+        position: fixed;
+        top: 10px;
+        right: 10px;
+        padding: 15px 20px;
+        background: rgba(0, 0, 0, 0.9);
+        color: #00ff00;
+        z-index: 99999;
+        font-family: 'Courier New', monospace;
+        font-size: 13px;
+        border-radius: 8px;
+        border: 2px solid #00ff00;
+        box-shadow: 0 0 15px rgba(0,255,0,0.3);
+        min-width: 300px;
+    `;
+    box.innerText = 'RPA Automation Starting...';
+    document.body.appendChild(box);
+"""
+
+
+def overlay_enabled() -> bool:
+    """The lean profile skips the on-screen overlay (one evaluate per status update)."""
+    profile = CONFIG["lean_profile"]
+    return not (profile["enabled"] and profile["skip_overlay"])
 
 
 def create_status_overlay(page: Page) -> None:
     """Create an on-screen status overlay for visual feedback."""
-    page.evaluate("""
-        const box = document.createElement('div');
-        box.id = 'rpa-status';
-        box.style.cssText = `
-            position: fixed;
-            top: 10px;
-            right: 10px;
-            padding: 15px 20px;
-            background: rgba(0, 0, 0, 0.9);
-            color: #00ff00;
-            z-index: 99999;
-            font-family: 'Courier New', monospace;
-            font-size: 13px;
-            border-radius: 8px;
-            border: 2px solid #00ff00;
-            box-shadow: 0 0 15px rgba(0,255,0,0.3);
-            min-width: 300px;
-        `;
-        box.innerText = 'RPA Automation Starting...';
-        document.body.appendChild(box);
-    """)
+    if overlay_enabled():
+        page.evaluate(STATUS_OVERLAY_JS)
 
 
-def update_status(page: Page, msg: str, step: str = "") -> None:
-    """Update the on-screen status overlay and print to console."""
+def status_script(msg: str, step: str = "") -> str:
+    """Build the JS that sets the overlay text."""
     safe_msg = str(msg).replace("'", "\\'").replace('"', '\\"').replace('\n', '\\n')
     if step:
         safe_msg = f"{step}\\n{safe_msg}"
-    try:
-        page.evaluate(f"document.getElementById('rpa-status').innerText = '{safe_msg}';")
-    except:
-        pass
+    return f"document.getElementById('rpa-status').innerText = '{safe_msg}';"
+
+
+def update_status(page: Page, msg: str, step: str = "") -> None:
+    """Update the on-screen status overlay and print to console."""
+    if overlay_enabled():
+        try:
+            page.evaluate(status_script(msg, step))
+        except:
+            pass
     print(f"  {msg}")
 
 
@@ -53,7 +76,7 @@ def get_viewport_center(page: Page) -> tuple:
 def click_chart(page: Page, x: int = 500, y: int = 400) -> None:
     """Click on the chart to ensure focus."""
     page.mouse.click(x, y)
-    time.sleep(0.5)
+    wait_for_chart_focus(page)
 
 
 def safe_click(page: Page, selector: str, timeout: int = 3000) -> bool:
@@ -68,3 +91,20 @@ def safe_click(page: Page, selector: str, timeout: int = 3000) -> bool:
 def wait_and_type(page: Page, text: str, delay: int = 100) -> None:
     """Type text with a delay between keystrokes."""
     page.keyboard.type(text, delay=delay)
+
+
+def get_process_tree_memory_mb() -> float:
+    """
+    Total RSS of this process and its children (drivers + browsers) in MB.
+    Returns: None if psutil is not installed.
+    """
+    if psutil is None:
+        return None
+    proc = psutil.Process()
+    total = proc.memory_info().rss
+    for child in proc.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
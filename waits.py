@@ -0,0 +1,205 @@
+"""
+Readiness wait helpers.
+Wait on concrete page conditions (with a deadline) instead of fixed sleeps,
+and report how long each condition took to become true.
+"""
+
+from playwright.sync_api import Page
+import itertools
+import time
+
+from config import CONFIG
+
+
+# JavaScript predicates, kept as strings so other page drivers can reuse them
+LEGEND_HAS_TEXT_JS = """
+    (needle) => {
+        const legend = document.querySelector("div[data-name='legend']");
+        return !!legend && legend.textContent.toUpperCase().includes(needle.toUpperCase());
+    }
+"""
+
+LEGEND_HAS_INTERVAL_JS = """
+    (tf) => {
+        const legend = document.querySelector("div[data-name='legend']");
+        if (!legend) return false;
+        const re = new RegExp('(^|[\\\\s\\u00b7])' + tf + '([\\\\s\\u00b7]|$)');
+        return re.test(legend.textContent);
+    }
+"""
+
+INPUT_FOCUSED_JS = """
+    () => {
+        const el = document.activeElement;
+        return !!el && (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA');
+    }
+"""
+
+INPUT_BLURRED_JS = """
+    () => {
+        const el = document.activeElement;
+        return !el || (el.tagName !== 'INPUT' && el.tagName !== 'TEXTAREA');
+    }
+"""
+
+LEGEND_HAS_OHLC_JS = """
+    () => {
+        const item = document.querySelector("div[data-name='legend'] [data-name='legend-series-item']");
+        return !!item && /H\\s*[\\d.,]+/.test(item.textContent) && /L\\s*[\\d.,]+/.test(item.textContent);
+    }
+"""
+
+# A leaf element next to the focused search box shows the query (search results rendered)
+SEARCH_RESULT_LISTED_JS = """
+    (query) => {
+        const needle = query.toLowerCase();
+        let scope = document.activeElement;
+        for (let depth = 0; scope && scope !== document.body && depth < 8; depth++) {
+            scope = scope.parentElement;
+            if (!scope) return false;
+            for (const el of scope.querySelectorAll('*')) {
+                if (el.children.length === 0 && el.tagName !== 'INPUT'
+                        && el.textContent.trim().toLowerCase() === needle) return true;
+            }
+        }
+        return false;
+    }
+"""
+
+# wait_for_function polls on requestAnimationFrame: the first call only stores the
+# token, so the predicate turns true once the page has rendered the next frame
+FRAME_RENDERED_JS = """
+    (token) => {
+        const seen = window.__rpaFrameToken === token;
+        window.__rpaFrameToken = token;
+        return seen;
+    }
+"""
+
+FIB_SETTINGS = "div[data-name='tab-content-style']"
+
+_frame_tokens = itertools.count()
+
+
+def get_timeout(name: str) -> int:
+    """Get a readiness timeout (ms) from config."""
+    return CONFIG["timeouts"][name]
+
+
+def report_wait(label: str, ok: bool, started: float) -> None:
+    """Print how long a readiness condition took."""
+    elapsed = time.perf_counter() - started
+    state = "ready" if ok else "TIMEOUT"
+    print(f"  [WAIT] {label}: {state} after {elapsed:.2f}s")
+
+
+def wait_for_js(page: Page, expression: str, label: str, timeout: int, arg=None) -> bool:
+    """
+    Wait until a JavaScript predicate returns truthy.
+    Returns: True if the condition was met before the deadline.
+    """
+    started = time.perf_counter()
+    try:
+        page.wait_for_function(expression, arg=arg, timeout=timeout)
+        ok = True
+    except Exception:
+        ok = False
+    report_wait(label, ok, started)
+    return ok
+
+
+def wait_for_state(page: Page, selector: str, state: str, label: str, timeout: int) -> bool:
+    """
+    Wait until a selector reaches a state (attached/detached/visible/hidden).
+    Returns: True if the condition was met before the deadline.
+    """
+    started = time.perf_counter()
+    try:
+        page.wait_for_selector(selector, state=state, timeout=timeout)
+        ok = True
+    except Exception:
+        ok = False
+    report_wait(label, ok, started)
+    return ok
+
+
+# =============================================================================
+# TRADINGVIEW CONDITIONS
+# =============================================================================
+
+def wait_for_chart_ready(page: Page) -> bool:
+    """Wait for the chart legend to render."""
+    return wait_for_state(page, "div[data-name='legend']", "attached",
+                          "chart legend", get_timeout("chart_ready"))
+
+
+def wait_for_input_focus(page: Page, label: str) -> bool:
+    """Wait for a text input (search box, interval dialog) to take focus."""
+    return wait_for_js(page, INPUT_FOCUSED_JS, label, get_timeout("dialog"))
+
+
+def wait_for_legend_symbol(page: Page, symbol: str) -> bool:
+    """Wait for the legend to show the requested symbol."""
+    return wait_for_js(page, LEGEND_HAS_TEXT_JS, f"legend shows {symbol}",
+                       get_timeout("symbol_change"), arg=symbol)
+
+
+def wait_for_legend_interval(page: Page, timeframe: str) -> bool:
+    """Wait for the legend to show the requested interval."""
+    return wait_for_js(page, LEGEND_HAS_INTERVAL_JS, f"legend shows {timeframe}",
+                       get_timeout("symbol_change"), arg=timeframe)
+
+
+def wait_for_chart_focus(page: Page) -> bool:
+    """Wait for focus to leave text inputs, so keys reach the chart shortcuts."""
+    return wait_for_js(page, INPUT_BLURRED_JS, "chart focused", get_timeout("dialog"))
+
+
+def wait_for_legend_ohlc(page: Page) -> bool:
+    """Wait for the legend to show the High/Low of the candle on screen."""
+    return wait_for_js(page, LEGEND_HAS_OHLC_JS, "legend shows OHLC", get_timeout("symbol_change"))
+
+
+def wait_for_search_result(page: Page, query: str) -> bool:
+    """Wait for the search dialog to list a result matching the query."""
+    return wait_for_js(page, SEARCH_RESULT_LISTED_JS, f"search lists {query}",
+                       get_timeout("dialog"), arg=query)
+
+
+def wait_for_frame(page: Page, label: str) -> bool:
+    """Wait for the page to render a frame (the chart has drawn the last pointer input)."""
+    return wait_for_js(page, FRAME_RENDERED_JS, label, get_timeout("dialog"),
+                       arg=f"frame-{next(_frame_tokens)}")
+
+
+def wait_for_fib_settings(page: Page, state: str = "visible") -> bool:
+    """Wait for the Fib settings dialog to open (visible) or close (detached)."""
+    label = "Fib settings open" if state == "visible" else "Fib settings closed"
+    return wait_for_state(page, FIB_SETTINGS, state, label, get_timeout("dialog"))
+
+
+def wait_for_goto_dialog(page: Page) -> bool:
+    """Wait for the go-to-date dialog inputs to show."""
+    return wait_for_state(page, "input:visible", "visible", "go-to dialog", get_timeout("dialog"))
+
+
+# =============================================================================
+# MT5 CONDITIONS
+# =============================================================================
+
+def wait_for_login_form(page: Page) -> bool:
+    """Wait for the MT5 login form to appear."""
+    return wait_for_state(page, 'input[name="login"]', "visible",
+                          "MT5 login form", get_timeout("login_form"))
+
+
+def wait_for_login_form_gone(page: Page) -> bool:
+    """Wait for the MT5 login form to detach after submit."""
+    return wait_for_state(page, 'input[name="login"]', "detached",
+                          "MT5 login form detached", get_timeout("login_complete"))
+
+
+def wait_for_market_watch(page: Page) -> bool:
+    """Wait for the MT5 Market Watch symbol search to render."""
+    return wait_for_state(page, "input[placeholder*='Search']", "visible",
+                          "MT5 Market Watch", get_timeout("login_complete"))